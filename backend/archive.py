@@ -0,0 +1,86 @@
+"""
+Sıcak/soğuk (hot/cold) veri katmanları.
+
+Tamamlanmış inşaatlara ait ya da belirli bir tarihten eski kayıtlar ana koleksiyondan
+`<koleksiyon>_archive` koleksiyonuna partiler halinde taşınır. Her parti önce arşive
+_id ile upsert edilir, sonra kaynaktan silinir; bu yüzden yarıda kesilen bir taşıma
+aynı parametrelerle yeniden çalıştırıldığında kaldığı yerden devam eder (idempotent).
+"""
+import heapq
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ReplaceOne
+
+ARCHIVE_SUFFIX = "_archive"
+ARCHIVED_COLLECTIONS = ("site_inspections", "work_plans", "activity_logs", "mesajlar")
+DEFAULT_BATCH_SIZE = 500
+
+# on_batch(koleksiyon adı, parti): parti taşınmadan hemen önce çağrılır (bağlı kayıtlar için)
+BatchHook = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+
+def archive_name(name: str) -> str:
+    return f"{name}{ARCHIVE_SUFFIX}"
+
+
+class Archiver:
+    def __init__(self, db, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    def collections(self, name: str, restore: bool = False):
+        hot, cold = self.db[name], self.db[archive_name(name)]
+        return (cold, hot) if restore else (hot, cold)
+
+    async def move(
+        self,
+        name: str,
+        query: Dict[str, Any],
+        restore: bool = False,
+        on_batch: Optional[BatchHook] = None,
+        progress: Optional[Callable[[str, int], Awaitable[None]]] = None,
+    ) -> int:
+        """
+        Sorguya uyan kayıtları sıcak -> soğuk (restore=True ise tersi) taşır ve taşınan sayıyı döner.
+        Taşınan kayıtlar kaynaktan silindiği için her turda sorgu bir sonraki partiyi getirir.
+        """
+        source, target = self.collections(name, restore)
+        moved = 0
+        while True:
+            batch = await source.find(query).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                break
+            if on_batch is not None:
+                await on_batch(name, batch)
+            await target.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in batch], ordered=False)
+            await source.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            moved += len(batch)
+            if progress is not None:
+                await progress(name, moved)
+        return moved
+
+
+async def list_tiers(
+    repos: Sequence[Any],
+    query: Optional[Dict[str, Any]] = None,
+    sort: Optional[Sequence[Tuple[str, int]]] = None,
+    limit: int = 1000,
+) -> List[Dict[str, Any]]:
+    """
+    Aynı sorguyu sıcak ve soğuk repository'lerde çalıştırıp sıralı birleştirir.
+    Her katmandan en fazla `limit` kayıt okunur; birleşik sonuç da `limit` ile kesilir.
+    """
+    sort = list(sort or repos[0].default_sort or [])
+    results = [await repo.list(query, sort=sort, limit=limit) for repo in repos]
+    if not sort:
+        return [doc for docs in results for doc in docs][:limit]
+    field, direction = sort[0]
+    # Mongo sıralamasıyla uyumlu: None en küçük değer sayılır
+    key = lambda doc: (doc.get(field) is not None, doc.get(field) or "")
+    merged = heapq.merge(*results, key=key, reverse=direction < 0)
+    out = []
+    for doc in merged:
+        out.append(doc)
+        if len(out) >= limit:
+            break
+    return out
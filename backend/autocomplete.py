@@ -0,0 +1,224 @@
+"""
+İnşaat listesi için süreç içi (in-memory) otomatik tamamlama indeksi.
+
+Türkçe büyük/küçük harf katlama (İ/i, I/ı) ve diakritik normalizasyonu ile
+kelime önekleri ve trigram'lar üzerinden sıralı top-k eşleşme döner.
+
+Tam yeniden yükleme event loop'u bloklamasın diye yeni indeks ayrı bir nesnede (thread'de)
+kurulup `swap` ile devralınır; kurulum sürerken gelen yazmalar kaydedilip devralmadan sonra uygulanır.
+"""
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+_TR_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_TR_ASCII = str.maketrans({"ı": "i", "ğ": "g", "ü": "u", "ş": "s", "ö": "o", "ç": "c", "â": "a", "î": "i", "û": "u"})
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+MAX_PREFIX_LENGTH = 20
+TOP_CACHE_SIZE = 64
+
+
+def turkish_fold(text: Optional[str]) -> str:
+    """'İSTANBUL', 'Istanbul', 'istanbul' ve 'ıstanbul' aynı anahtara katlanır"""
+    if not text:
+        return ""
+    folded = str(text).translate(_TR_LOWER).lower().translate(_TR_ASCII)
+    folded = unicodedata.normalize("NFKD", folded)
+    return "".join(ch for ch in folded if not unicodedata.combining(ch))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(turkish_fold(text))
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ConstructionIndex:
+    FIELDS = ("yibfNo", "isBaslik", "ilce")
+
+    def __init__(self):
+        self.loaded = False
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._rank: Dict[str, tuple] = {}
+        # Sık kullanılan kısa önekler için anahtar başına sıralı ilk N kayıt
+        self._top_cache: Dict[tuple, List[str]] = {}
+        # Eşleşme kademeleri: YİBF tam/önek, başlık öneki, kelime tam/önek, trigram
+        self._maps: Dict[str, Dict[str, Set[str]]] = {
+            name: defaultdict(set) for name in ("yibf", "yibf_prefix", "baslik_prefix", "token", "token_prefix", "trigram")
+        }
+        # begin_rebuild ile swap arasındaki yazmalar (işlem, argüman)
+        self._journal: Optional[List[tuple]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _entries(self, doc: Dict[str, Any]) -> Dict[str, Set[str]]:
+        yibf = turkish_fold(doc.get("yibfNo")).strip()
+        baslik = turkish_fold(doc.get("isBaslik")).strip()
+        tokens = set()
+        for field in self.FIELDS:
+            tokens.update(tokenize(doc.get(field)))
+        return {
+            "yibf": {yibf} if yibf else set(),
+            "yibf_prefix": {yibf[:n] for n in range(1, min(len(yibf), MAX_PREFIX_LENGTH) + 1)},
+            "baslik_prefix": {baslik[:n] for n in range(1, min(len(baslik), MAX_PREFIX_LENGTH) + 1)},
+            "token": tokens,
+            "token_prefix": {t[:n] for t in tokens for n in range(1, min(len(t), MAX_PREFIX_LENGTH) + 1)},
+            "trigram": _trigrams(yibf) | _trigrams(baslik),
+            "_text": (yibf, baslik),
+        }
+
+    def load(self, docs: Iterable[Dict[str, Any]]):
+        self.clear()
+        for doc in docs:
+            self.upsert(doc)
+        self.loaded = True
+
+    @classmethod
+    def build(cls, docs: Iterable[Dict[str, Any]]) -> "ConstructionIndex":
+        """Bağımsız yeni indeks; canlı indekse dokunmadığı için thread'de çalıştırılabilir"""
+        index = cls()
+        index.load(docs)
+        return index
+
+    def begin_rebuild(self):
+        """Kaynak okunmadan önce çağrılır; bu andan sonraki yazmalar swap'ta yeniden uygulanır"""
+        self._journal = []
+
+    def swap(self, other: "ConstructionIndex"):
+        """`other`ın içeriğini tek adımda devralır ve kurulum sırasında gelen yazmaları uygular"""
+        journal, self._journal = self._journal or [], None
+        self._docs, self._keys, self._rank = other._docs, other._keys, other._rank
+        self._top_cache, self._maps = other._top_cache, other._maps
+        self.loaded = True
+        for action, arg in journal:
+            getattr(self, action)(arg)
+
+    def abort_rebuild(self):
+        self._journal = None
+
+    def clear(self):
+        self._docs.clear()
+        self._keys.clear()
+        self._rank.clear()
+        self._top_cache.clear()
+        for m in self._maps.values():
+            m.clear()
+
+    def upsert(self, doc: Dict[str, Any]):
+        doc_id = doc.get("id")
+        if not doc_id:
+            return
+        if self._journal is not None:
+            self._journal.append(("upsert", doc))
+        self._discard(doc_id)
+        entry = self._entries(doc)
+        yibf, baslik = entry.pop("_text")
+        self._docs[doc_id] = doc
+        self._keys[doc_id] = entry
+        # Aynı kademede kısa başlıklar önce gelir
+        self._rank[doc_id] = (len(baslik), baslik, yibf)
+        for name, keys in entry.items():
+            m = self._maps[name]
+            for key in keys:
+                m[key].add(doc_id)
+                self._top_cache.pop((name, key), None)
+
+    def remove(self, doc_id: str):
+        if self._journal is not None:
+            self._journal.append(("remove", doc_id))
+        self._discard(doc_id)
+
+    def _discard(self, doc_id: str):
+        entry = self._keys.pop(doc_id, None)
+        self._docs.pop(doc_id, None)
+        self._rank.pop(doc_id, None)
+        if not entry:
+            return
+        for name, keys in entry.items():
+            m = self._maps[name]
+            for key in keys:
+                self._top_cache.pop((name, key), None)
+                ids = m.get(key)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del m[key]
+
+    def _lookup(self, name: str, keys: List[str]) -> Set[str]:
+        m = self._maps[name]
+        sets = [m.get(k) for k in keys]
+        if not sets or any(not s for s in sets):
+            return set()
+        sets.sort(key=len)
+        if len(sets) == 1:
+            return sets[0]
+        return sets[0].intersection(*sets[1:])
+
+    def _top(self, name: str, key: str, n: int) -> List[str]:
+        ids = self._maps[name].get(key)
+        if not ids:
+            return []
+        if n > TOP_CACHE_SIZE:
+            return heapq.nsmallest(n, ids, key=self._rank.__getitem__)
+        cached = self._top_cache.get((name, key))
+        if cached is None:
+            cached = heapq.nsmallest(TOP_CACHE_SIZE, ids, key=self._rank.__getitem__)
+            self._top_cache[(name, key)] = cached
+        return cached[:n]
+
+    def _tier(self, name: str, keys: List[str], need: int, seen: Set[str]) -> List[str]:
+        if len(keys) == 1:
+            return [i for i in self._top(name, keys[0], need + len(seen)) if i not in seen][:need]
+        ids = self._lookup(name, keys) - seen
+        return heapq.nsmallest(need, ids, key=self._rank.__getitem__)
+
+    def search(self, q: str, limit: int = 20) -> List[Dict[str, Any]]:
+        query = turkish_fold(q).strip()
+        if not query:
+            return []
+        tokens = _TOKEN_RE.findall(query)
+        prefix = query[:MAX_PREFIX_LENGTH]
+        tiers = [
+            ("yibf", [query]),
+            ("yibf_prefix", [prefix]),
+            ("baslik_prefix", [prefix]),
+            ("token", tokens),
+            ("token_prefix", [t[:MAX_PREFIX_LENGTH] for t in tokens]),
+        ]
+        result: List[str] = []
+        seen: Set[str] = set()
+        for name, keys in tiers:
+            need = limit - len(result)
+            if need <= 0:
+                break
+            if not keys:
+                continue
+            picked = self._tier(name, keys, need, seen)
+            result.extend(picked)
+            seen.update(picked)
+        need = limit - len(result)
+        if need > 0:
+            ids = self._substring(query) - seen
+            result.extend(heapq.nsmallest(need, ids, key=self._rank.__getitem__))
+        return [self._docs[doc_id] for doc_id in result]
+
+    def _substring(self, query: str) -> Set[str]:
+        # Kelime ortasındaki eşleşmeler (eski $regex davranışı) için trigram filtresi
+        if len(query) < 3:
+            return set()
+        matches = set()
+        for doc_id in self._lookup("trigram", list(_trigrams(query))):
+            yibf, baslik = self._rank[doc_id][2], self._rank[doc_id][1]
+            if query in yibf or query in baslik:
+                matches.add(doc_id)
+        return matches
+
+
+construction_index = ConstructionIndex()
@@ -0,0 +1,8 @@
+"""
+Performans ölçüm araçları (test paketi değildir; elle ya da CI'da ayrı adım olarak çalıştırılır).
+
+    python -m benchmarks.api --scale small --output bench.json
+    python -m benchmarks.api --scale small --baseline bench.json
+
+Komutlar backend dizininden çalıştırılır; seed edilen veritabanı `--db-name` ile ayrı tutulur.
+"""
@@ -0,0 +1,289 @@
+"""
+API yük benchmark'ı.
+
+Ayrı bir veritabanını sentetik veriyle doldurur, FastAPI uygulamasını eşzamanlı async
+istemcilerle senaryolar üzerinden çalıştırır ve endpoint başına p50/p95/p99 ile
+throughput'u JSON olarak raporlar.
+
+    # Yerel MongoDB (MONGO_URL) üzerinde, uygulama süreç içinde (ASGI) çalıştırılır
+    python -m benchmarks.api --scale small --output bench.json
+
+    # Önceki sonuca göre karşılaştırma; p95 vb. %10'dan fazla kötüleşirse çıkış kodu 1
+    python -m benchmarks.api --scale small --baseline bench.json --threshold 10
+
+    # Çalışan bir sunucuya karşı (sunucu aynı --mongo-url/--db-name ile başlatılmış olmalı)
+    python -m benchmarks.api --base-url http://localhost:8001 --db-name bench_yapi_denetim
+
+Senaryolar: login_burst, dashboard_polling, list_pages, eksiklik_report, excel_import.
+Varsayılan veritabanı her çalıştırmada silinip yeniden oluşturulur; gerçek veritabanı adını vermeyin.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_DB_NAME = "bench_yapi_denetim"
+JOB_POLL_SECONDS = 0.2
+JOB_TIMEOUT_SECONDS = 600
+
+
+@dataclass
+class Call:
+    label: str
+    method: str
+    url: str
+    role: Optional[str] = "admin"  # None: kimlik doğrulamasız
+    json: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class Context:
+    server: Any
+    builder: Any
+    tokens: Dict[str, str] = field(default_factory=dict)
+    rng: random.Random = field(default_factory=lambda: random.Random(7))
+
+
+def _login_calls(ctx: Context) -> List[Call]:
+    from benchmarks.dataset import BENCH_PASSWORD
+
+    return [
+        Call("POST /api/auth/login", "POST", "/api/auth/login", role=None, json={"email": user["email"], "password": BENCH_PASSWORD})
+        for user in ctx.builder.users
+    ]
+
+
+def _dashboard_calls(ctx: Context) -> List[Call]:
+    return [
+        Call("GET /api/dashboard/stats", "GET", "/api/dashboard/stats"),
+        Call("GET /api/activities/feed", "GET", "/api/activities/feed?limit=50"),
+        Call("GET /api/workplans", "GET", "/api/workplans"),
+        Call("GET /api/super-admin-reports", "GET", "/api/super-admin-reports", role="super_admin"),
+        Call("GET /api/mesajlar", "GET", "/api/mesajlar", role="super_admin"),
+    ]
+
+
+def _list_calls(ctx: Context) -> List[Call]:
+    ilce = ctx.rng.choice([c["ilce"] for c in ctx.builder.constructions] or ["Çankaya"])
+    prefix = (ctx.builder.constructions[0]["yibfNo"][:4] if ctx.builder.constructions else "1000")
+    return [
+        Call("GET /api/inspections", "GET", "/api/inspections"),
+        Call("GET /api/inspections?ilce", "GET", f"/api/inspections?ilce={ilce}&sort=-denetimTarihi"),
+        Call("GET /api/constructions", "GET", "/api/constructions"),
+        Call("GET /api/constructions/search", "GET", f"/api/constructions/search?q={prefix}"),
+        Call("GET /api/licenses", "GET", "/api/licenses"),
+        Call("GET /api/payments", "GET", "/api/payments"),
+        Call("GET /api/companies", "GET", "/api/companies"),
+    ]
+
+
+def _report_calls(ctx: Context) -> List[Call]:
+    return [
+        Call("GET /api/reports/eksiklik", "GET", "/api/reports/eksiklik", role="super_admin"),
+        Call("GET /api/reports/compliance", "GET", "/api/reports/compliance", role="super_admin"),
+    ]
+
+
+SCENARIOS: Dict[str, Callable[[Context], List[Call]]] = {
+    "login_burst": _login_calls,
+    "dashboard_polling": _dashboard_calls,
+    "list_pages": _list_calls,
+    "eksiklik_report": _report_calls,
+}
+SPECIAL_SCENARIOS = ("excel_import",)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, label: str, ms: float, ok: bool):
+        self.latencies[label].append(ms)
+        if not ok:
+            self.errors[label] += 1
+
+    def result(self, wall_seconds: float) -> Dict[str, Any]:
+        from benchmarks.report import summarize
+
+        return {
+            "wallSeconds": round(wall_seconds, 3),
+            "endpoints": {label: summarize(values, self.errors[label], wall_seconds) for label, values in sorted(self.latencies.items())},
+        }
+
+
+async def _issue(client, ctx: Context, call: Call, recorder: Recorder):
+    headers = {"Authorization": f"Bearer {ctx.tokens[call.role]}"} if call.role else {}
+    start = time.perf_counter()
+    try:
+        response = await client.request(call.method, call.url, json=call.json, headers=headers)
+        await response.aread()
+        ok = response.status_code < 400
+    except Exception:
+        ok = False
+    recorder.add(call.label, (time.perf_counter() - start) * 1000, ok)
+
+
+async def run_calls(client, ctx: Context, calls: List[Call], concurrency: int, total: int) -> Dict[str, Any]:
+    """`total` isteği çağrı karışımından sırayla alıp `concurrency` eşzamanlı istemciyle gönderir"""
+    recorder = Recorder()
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(calls[i % len(calls)])
+
+    async def worker():
+        while True:
+            try:
+                call = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await _issue(client, ctx, call, recorder)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return recorder.result(time.perf_counter() - start)
+
+
+async def run_excel_import(client, ctx: Context, rows: int, runs: int) -> Dict[str, Any]:
+    """Yükleme isteği (202) ve iş kuyruğunda tamamlanmaya kadar geçen süre ayrı ölçülür"""
+    from benchmarks.dataset import construction_row, construction_workbook
+
+    recorder = Recorder()
+    headers = {"Authorization": f"Bearer {ctx.tokens['super_admin']}"}
+    rng = random.Random(11)
+    existing = len(ctx.builder.constructions)
+    start = time.perf_counter()
+    for run in range(runs):
+        # Yarısı mevcut kayıtları günceller, yarısı yeni kayıt ekler
+        data = [construction_row(rng, (existing // 2) + run * rows + i) for i in range(rows)]
+        workbook = construction_workbook(data, ctx.server.CONSTRUCTION_COLUMN_MAPPING)
+        t0 = time.perf_counter()
+        response = await client.post(
+            "/api/constructions/upload",
+            files={"file": ("insaatlar.xlsx", workbook, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+            headers=headers,
+        )
+        recorder.add("POST /api/constructions/upload", (time.perf_counter() - t0) * 1000, response.status_code < 400)
+        if response.status_code >= 400:
+            continue
+        job_id = response.json()["jobId"]
+        ok = False
+        while time.perf_counter() - t0 < JOB_TIMEOUT_SECONDS:
+            job = (await client.get(f"/api/jobs/{job_id}", headers=headers)).json()
+            if job.get("status") in ("succeeded", "failed", "cancelled"):
+                ok = job["status"] == "succeeded"
+                break
+            await asyncio.sleep(JOB_POLL_SECONDS)
+        recorder.add(f"constructions.import job ({rows} satır)", (time.perf_counter() - t0) * 1000, ok)
+    return recorder.result(time.perf_counter() - start)
+
+
+async def login_tokens(client, ctx: Context):
+    from benchmarks.dataset import BENCH_PASSWORD, user_email
+
+    for role in ("super_admin", "admin", "user"):
+        response = await client.post("/api/auth/login", json={"email": user_email(role, 0), "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        ctx.tokens[role] = response.json()["access_token"]
+
+
+async def main_async(args) -> int:
+    os.environ["DB_NAME"] = args.db_name
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    if args.base_url is None:
+        # Süreç içi çalıştırmada yalnızca ölçülen işler çalışsın
+        os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+
+    import httpx
+
+    import server
+    from benchmarks.dataset import DatasetBuilder, spec_from_args
+    from benchmarks.report import compare, load_json, metadata, print_results, write_json
+
+    spec = spec_from_args(args.scale, {"constructions": args.constructions})
+    if not args.skip_seed:
+        await server.client.drop_database(args.db_name)
+    builder = DatasetBuilder(server, spec, seed=args.seed)
+    t0 = time.perf_counter()
+    counts = await builder.build() if not args.skip_seed else {}
+    print(f"Veri seti hazır ({time.perf_counter() - t0:.1f}s): {counts}", file=sys.stderr)
+
+    ctx = Context(server=server, builder=builder)
+    scenarios = args.scenarios or list(SCENARIOS) + list(SPECIAL_SCENARIOS)
+    result: Dict[str, Any] = {
+        "meta": metadata(scale=args.scale, dataset=spec.as_dict(), concurrency=args.concurrency, requests=args.requests,
+                         seed=args.seed, mode="http" if args.base_url else "asgi"),
+        "scenarios": {},
+    }
+
+    async def run(client):
+        await login_tokens(client, ctx)
+        for name in scenarios:
+            print(f"Senaryo: {name}", file=sys.stderr)
+            if name == "excel_import":
+                result["scenarios"][name] = await run_excel_import(client, ctx, args.import_rows, args.import_runs)
+                continue
+            calls = SCENARIOS[name](ctx)
+            total = len(calls) if name == "login_burst" else args.requests
+            result["scenarios"][name] = await run_calls(client, ctx, calls, args.concurrency, total)
+
+    timeout = httpx.Timeout(JOB_TIMEOUT_SECONDS)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            await run(client)
+    else:
+        app = server.app
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                await run(client)
+
+    print_results(result)
+    if args.output:
+        write_json(result, args.output)
+        print(f"\nSonuç yazıldı: {args.output}", file=sys.stderr)
+    if args.baseline:
+        regressions = compare(result, load_json(args.baseline), args.threshold)
+        if regressions:
+            return 1
+    if not args.keep_db and not args.skip_seed:
+        await server.client.drop_database(args.db_name)
+    return 0
+
+
+def parse_args(argv=None):
+    from benchmarks.dataset import SCALES
+
+    parser = argparse.ArgumentParser(description="API yük benchmark'ı")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--constructions", type=int, help="veri seti ölçeğindeki inşaat sayısını geçersiz kılar")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS) + list(SPECIAL_SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400, help="senaryo başına istek sayısı")
+    parser.add_argument("--import-rows", type=int, default=500)
+    parser.add_argument("--import-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME)
+    parser.add_argument("--base-url", help="süreç içi yerine çalışan sunucuya HTTP ile bağlan")
+    parser.add_argument("--skip-seed", action="store_true", help="mevcut bench veritabanını kullan")
+    parser.add_argument("--keep-db", action="store_true", help="bitince bench veritabanını silme")
+    parser.add_argument("--output", help="sonuç JSON dosyası")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki sonuç JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=10.0, help="gerileme eşiği (yüzde)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Benchmark için sentetik, tekrarlanabilir (seed'li) yapı denetim veri seti.
+
+Kayıtlar uygulamanın kendi modelleri ve repository `encode` adımı ile üretilir; böylece
+alan adları, tarih formatları ve türetilmiş alanlar (createdAtDate gibi) API'nin yazdığıyla
+aynıdır. Toplu yazma `insert_many` ile yapılır; repository hook'ları (arama indeksi, rollup)
+çalışmaz, arama indeksi uygulama açılışında boş olduğu için yeniden oluşturulur.
+"""
+import random
+import uuid
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+INSERT_BATCH_SIZE = 1000
+BENCH_PASSWORD = "bench-parola-123"
+
+ILCELER = ["Çankaya", "Keçiören", "Yenimahalle", "Mamak", "Etimesgut", "Sincan", "Altındağ", "Pursaklar", "Gölbaşı", "Polatlı"]
+MAHALLELER = ["Bahçelievler", "Kızılay", "Aşağı Eğlence", "Batıkent", "Eryaman", "Şentepe", "Ümitköy", "Çayyolu", "Kavaklıdere", "Ostim"]
+ISIN_DURUMU = ["Devam Ediyor", "Devam Ediyor", "Devam Ediyor", "Tamamlandı", "Durduruldu", "Fesih", "Başlamadı"]
+YAPI_SINIFLARI = ["II-A", "II-B", "III-A", "III-B", "IV-A", "IV-B", "IV-C", "V-A"]
+KONTROL_BOLUMLERI = ["Temel", "Kolon", "Kiriş", "Perde", "Tabliye", "Kolon/Tabliye", "Kolon/Perde", "Temel Kiriş", "Subasman", "Çatı Makası", "Merdiven Kulesi", "İstinat Duvarı"]
+HAKEDIS_TIPLERI = [
+    "Proje İnceleme Bedeli", "Kazı ve Temel Üst Kotuna Kadar Olan Kısım", "Taşıyıcı Sistem Bölümü",
+    "Sıvaya Kadar Hazır Duruma Getirilmiş Bölüm", "Mekanik ve Elektrik Tesisatı ile Kalan Yapı Bölümü", "İş Bitirme",
+]
+HAKEDIS_DURUMLARI = [
+    "Hazırlanacak", "Evraklar Hazırlandı", "İmzalar Atıldı", "Fatura Kesildi", "Belediyeye Verildi",
+    "Mal Müdürlüğüne Verildi", "Ödeme Alındı", "Ödeme Yapıldı", "İptal veya Fesihli",
+]
+EKSIKLER = ["Eksik Yok", "Evrak Eksiği Var", "Seviye Talep Edilecek", "Beton Raporu Eksik", "Çelik Raporu Eksik", "Tamamlandı"]
+ISIMLER = ["Ahmet", "Mehmet", "Ayşe", "Fatma", "Mustafa", "Zeynep", "Emre", "Elif", "Hüseyin", "Gülşen", "Oğuz", "Şule"]
+SOYISIMLER = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Öztürk", "Aydın", "Özdemir", "Arslan", "Doğan", "Koç"]
+PROJE_ONEKLERI = ["Park", "Vadi", "Konutları", "Rezidans", "Sitesi", "Evleri", "Plaza", "Kule"]
+FIRMA_ONEKLERI = ["Anadolu", "Başkent", "Ege", "Toros", "Kızılırmak", "Sakarya", "Yeşilırmak", "Erciyes"]
+ACTIVITY_TIPLERI = [("saha_denetim", "create"), ("saha_denetim", "update"), ("hakedis", "create"), ("ruhsat", "update"), ("workplan", "create"), ("login", "login")]
+MESAJLAR = ["Şantiye defteri eksik, kontrol edelim.", "Beton döküm saati değişti.", "Hakediş evrakları hazır.", "Ruhsat fotokopisi gönderildi.", "Yarın saha denetimi var."]
+
+
+@dataclass
+class DatasetSpec:
+    constructions: int = 200
+    inspections_per_construction: int = 5
+    license_ratio: float = 0.7
+    payments_per_construction: int = 2
+    workplans_per_construction: int = 1
+    messages: int = 200
+    activities_per_construction: int = 20
+    admins: int = 5
+    users: int = 20
+    laboratories: int = 8
+    concrete_firms: int = 12
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+SCALES = {
+    "small": DatasetSpec(),
+    "medium": DatasetSpec(constructions=2000, messages=2000),
+    "large": DatasetSpec(constructions=20000, messages=10000, activities_per_construction=10, admins=10, users=60),
+}
+
+
+def full_name(rng: random.Random) -> str:
+    return f"{rng.choice(ISIMLER)} {rng.choice(SOYISIMLER)}"
+
+
+def _date(rng: random.Random, days_back: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=rng.randint(0, days_back), seconds=rng.randint(0, 86399))
+
+
+def construction_row(rng: random.Random, index: int) -> Dict[str, Any]:
+    """Bakanlık Excel'indeki bir satıra karşılık gelen inşaat alanları (model alan adlarıyla)"""
+    alan = rng.randint(150, 25000)
+    return {
+        "yibfNo": str(1000000 + index),
+        "il": "Ankara",
+        "ilgiliIdare": f"{rng.choice(ILCELER)} Belediyesi",
+        "ada": str(rng.randint(100, 99999)),
+        "parsel": str(rng.randint(1, 60)),
+        "isBaslik": f"{rng.choice(MAHALLELER)} {rng.choice(PROJE_ONEKLERI)} {rng.randint(1, 30)}. Etap",
+        "isinDurumu": rng.choice(ISIN_DURUMU),
+        "kismi": rng.choice(["Hayır", "Evet"]),
+        "seviye": f"%{rng.choice([0, 10, 20, 30, 40, 60, 80, 100])}",
+        "sozlesmeTarihi": _date(rng, 1500).strftime("%d.%m.%Y"),
+        "kalanAlan": str(rng.randint(0, alan)),
+        "yapiInsaatAlani": str(alan),
+        "ilce": rng.choice(ILCELER),
+        "mahalleKoy": rng.choice(MAHALLELER),
+        "birimFiyat": f"{rng.randint(8000, 21000)},00",
+        "bksReferansNo": str(rng.randint(10**9, 10**10 - 1)),
+        "yapiKimlikNo": str(rng.randint(10**7, 10**8 - 1)),
+        "ruhsatTarihi": _date(rng, 1500).strftime("%d.%m.%Y"),
+        "yapiSinifi": rng.choice(YAPI_SINIFLARI),
+        "yapiToplamAlani": str(alan),
+        "kumeYapiMi": rng.choice(["Hayır", "Evet"]),
+        "eklenti": rng.choice(["Yok", "Var"]),
+        "sanayiSitesi": "Hayır",
+        "guclendirme": "Hayır",
+        "guclendirmeRuhsat": "Hayır",
+        "ykeZorunluMu": rng.choice(["Hayır", "Evet"]),
+    }
+
+
+def user_email(role: str, index: int) -> str:
+    return f"bench-{role}-{index}@example.com"
+
+
+class DatasetBuilder:
+    """server modülünü (modeller + repository'ler) kullanarak belgeleri üretip yazar"""
+
+    def __init__(self, server, spec: DatasetSpec, seed: int = 42):
+        self.server = server
+        self.spec = spec
+        self.rng = random.Random(seed)
+        self.users: List[Dict[str, Any]] = []
+        self.constructions: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+
+    async def _write(self, repo, models: Iterator[Any]):
+        batch: List[Dict[str, Any]] = []
+        written = 0
+        for model in models:
+            batch.append(repo.encode(model.model_dump()))
+            if len(batch) >= INSERT_BATCH_SIZE:
+                await repo.collection.insert_many(batch, ordered=False)
+                written += len(batch)
+                batch = []
+        if batch:
+            await repo.collection.insert_many(batch, ordered=False)
+            written += len(batch)
+        self.counts[repo.name] = self.counts.get(repo.name, 0) + written
+
+    def _author(self) -> Dict[str, Any]:
+        return self.rng.choice(self.users)
+
+    async def build(self) -> Dict[str, int]:
+        s = self.server
+        spec = self.spec
+        rng = self.rng
+        # bcrypt kasıtlı olarak yavaş; tüm kullanıcılar aynı hash'i paylaşır
+        password = s.hash_password(BENCH_PASSWORD)
+
+        roles = [(s.UserRole.SUPER_ADMIN, 1), (s.UserRole.ADMIN, spec.admins), (s.UserRole.USER, spec.users)]
+        for role, count in roles:
+            for i in range(count):
+                self.users.append({"id": str(uuid.uuid4()), "email": user_email(role, i), "name": full_name(rng), "role": role})
+        await self._write(s.users_repo, (s.User(**u) for u in self.users))
+        await s.db.users.update_many({"email": {"$regex": "^bench-"}}, {"$set": {"password": password}})
+
+        companies = [
+            s.Company(name=f"{FIRMA_ONEKLERI[i % len(FIRMA_ONEKLERI)]} Yapı Laboratuvarı {i + 1}", type="laboratory", createdBy=self.users[0]["id"], createdByName=self.users[0]["name"])
+            for i in range(spec.laboratories)
+        ] + [
+            s.Company(name=f"{FIRMA_ONEKLERI[i % len(FIRMA_ONEKLERI)]} Hazır Beton {i + 1}", type="concrete", createdBy=self.users[0]["id"], createdByName=self.users[0]["name"])
+            for i in range(spec.concrete_firms)
+        ]
+        await self._write(s.companies_repo, iter(companies))
+        labs = [c.name for c in companies if c.type == "laboratory"]
+        concrete = [c.name for c in companies if c.type == "concrete"]
+
+        self.constructions = []
+        for i in range(spec.constructions):
+            row = construction_row(rng, i)
+            row["id"] = str(uuid.uuid4())
+            self.constructions.append(row)
+        await self._write(s.constructions_repo, (s.Construction(**c, createdAt=_date(rng, 1000)) for c in self.constructions))
+
+        await self._write(s.inspections_repo, self._inspections(labs, concrete))
+        await self._write(s.licenses_repo, self._licenses())
+        await self._write(s.payments_repo, self._payments())
+        await self._write(s.workplans_repo, self._workplans())
+        await self._write(s.mesajlar_repo, self._messages())
+        await self._write(s.activities_repo, self._activities())
+        return dict(self.counts)
+
+    def _inspections(self, labs: List[str], concrete: List[str]):
+        s, rng = self.server, self.rng
+        for c in self.constructions:
+            for _ in range(self.spec.inspections_per_construction):
+                author = self._author()
+                denetim = _date(rng, 730)
+                poured = rng.random() < 0.6
+                teslim = rng.choices(["alindi", "beklemede", "alinmadi"], weights=[70, 20, 10])[0]
+                yield s.SiteInspection(
+                    denetimTarihi=denetim.date().isoformat(),
+                    betonDokumTarihi=(denetim + timedelta(days=rng.randint(0, 5))).date().isoformat() if poured else None,
+                    kontrolEdilenBolum=rng.choice(KONTROL_BOLUMLERI),
+                    betonDokulenBolum=rng.choice(KONTROL_BOLUMLERI) if poured else None,
+                    insaatIsmi=c["isBaslik"],
+                    yibfNo=c["yibfNo"],
+                    ilce=c["ilce"],
+                    blokNo=rng.choice(["A", "B", "C", None]),
+                    kat=str(rng.randint(-2, 12)),
+                    laboratuvarFirma=rng.choice(labs) if poured else None,
+                    betonFirma=rng.choice(concrete) if poured else None,
+                    teslimAlindi=teslim,
+                    teslimAlinmamaAciklamasi="Şantiye şefi yerinde değildi" if teslim == "alinmadi" else None,
+                    santiyeDefteriBilgileriOnaylandi=rng.random() < 0.8,
+                    createdBy=author["id"],
+                    createdByName=author["name"],
+                    createdAt=denetim,
+                )
+
+    def _licenses(self):
+        s, rng = self.server, self.rng
+        checklist = [name for name, field in s.LicenseProject.model_fields.items() if field.annotation is bool]
+        for c in self.constructions:
+            if rng.random() >= self.spec.license_ratio:
+                continue
+            # Dosya bazında tamamlanma oranı: çoğu dosya büyük ölçüde tamam, bir kısmı çok eksik
+            completeness = rng.choice([0.3, 0.6, 0.85, 0.95, 1.0])
+            author = self._author()
+            yield s.LicenseProject(
+                insaatIsmi=c["isBaslik"],
+                yibfNo=c["yibfNo"],
+                **{name: rng.random() < completeness for name in checklist},
+                ruhsatTarihi=_date(rng, 900).date().isoformat() if rng.random() < 0.7 else None,
+                createdBy=author["id"],
+                createdByName=author["name"],
+                createdAt=_date(rng, 900),
+            )
+
+    def _payments(self):
+        s, rng = self.server, self.rng
+        for c in self.constructions:
+            for n in range(self.spec.payments_per_construction):
+                author = self._author()
+                yield s.ProgressPayment(
+                    insaatIsmi=c["isBaslik"],
+                    yibfNo=c["yibfNo"],
+                    adaParsel=f"{c['ada']}/{c['parsel']}",
+                    hakedisNo=str(n + 1),
+                    hakedisTipi=HAKEDIS_TIPLERI[min(n, len(HAKEDIS_TIPLERI) - 1)],
+                    hakedisYuzdesi=float(rng.choice([5, 10, 20, 25, 30])),
+                    belediye=c["ilgiliIdare"],
+                    hakedisDurumu=rng.choice(HAKEDIS_DURUMLARI),
+                    eksik=rng.choice(EKSIKLER),
+                    createdBy=author["id"],
+                    createdByName=author["name"],
+                    createdAt=_date(rng, 700),
+                )
+
+    def _workplans(self):
+        s, rng = self.server, self.rng
+        for c in self.constructions:
+            for _ in range(self.spec.workplans_per_construction):
+                author = self._author()
+                yield s.WorkPlan(
+                    baslik=f"{c['isBaslik']} saha kontrolü",
+                    planTarihi=(datetime.now(timezone.utc) + timedelta(days=rng.randint(-30, 60))).date().isoformat(),
+                    planSaati=f"{rng.randint(8, 17):02d}:00",
+                    tip=rng.choice(["saha_denetim", "hakedis", "ruhsat", "evrak"]),
+                    referansId=c["id"],
+                    durum=rng.choices(["beklemede", "tamamlandi", "iptal"], weights=[60, 35, 5])[0],
+                    createdBy=author["id"],
+                    createdByName=author["name"],
+                )
+
+    def _messages(self):
+        s, rng = self.server, self.rng
+        for _ in range(self.spec.messages):
+            sender = self._author()
+            c = rng.choice(self.constructions) if self.constructions and rng.random() < 0.7 else None
+            yield s.Mesaj(
+                projeId=c["id"] if c else None,
+                projeAdi=c["isBaslik"] if c else None,
+                gonderenId=sender["id"],
+                gonderenAdi=sender["name"],
+                gonderenRol=sender["role"],
+                mesaj=rng.choice(MESAJLAR),
+                createdAt=_date(rng, 365),
+            )
+
+    def _activities(self):
+        s, rng = self.server, self.rng
+        for c in self.constructions:
+            for _ in range(self.spec.activities_per_construction):
+                user = self._author()
+                tip, aksiyon = rng.choice(ACTIVITY_TIPLERI)
+                yield s.ActivityLog(
+                    tip=tip,
+                    aksiyon=aksiyon,
+                    aciklama=f"{c['isBaslik']} ({c['yibfNo']})",
+                    userId=user["id"],
+                    userName=user["name"],
+                    referansId=c["id"],
+                    createdAt=_date(rng, 365),
+                )
+
+
+def construction_workbook(rows: List[Dict[str, Any]], column_mapping: Dict[str, str]) -> bytes:
+    """Satırları bakanlık başlıklarıyla (column_mapping anahtarları) .xlsx dosyasına yazar"""
+    from io import BytesIO
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("İnşaatlar")
+    headers = list(column_mapping)
+    ws.append(headers)
+    for row in rows:
+        ws.append([row.get(column_mapping[h]) for h in headers])
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def spec_from_args(scale: str, overrides: Optional[Dict[str, Any]] = None) -> DatasetSpec:
+    base = SCALES[scale].as_dict()
+    base.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return DatasetSpec(**base)
@@ -0,0 +1,224 @@
+"""
+Excel içe aktarma (constructions.import) throughput benchmark'ı.
+
+Bakanlık başlıklarıyla (CONSTRUCTION_COLUMN_MAPPING) .xlsx üretir ve içe aktarmanın üç aşamasını
+ayrı ayrı ölçer:
+
+- parse:     read_constructions_excel (pd.read_excel + NaN -> None)
+- normalize: construction_from_excel_row (satır -> model alanları)
+- write:     save_imported_construction (find_one + insert/update + arama indeksi)
+
+Aşama başına süre, satır/sn ve süreç tepe RSS'i (ru_maxrss; aşamalar boyunca monoton artar) raporlanır.
+
+    python -m benchmarks.excel_import --rows 10000 --output excel.json
+    python -m benchmarks.excel_import --rows 100000 --duplicate-ratio 0.2 --nan-ratio 0.05 --runs 1
+    python -m benchmarks.excel_import --rows 10000 --skip-write          # MongoDB gerekmez
+    python -m benchmarks.excel_import --rows 10000 --baseline excel.json
+
+Yazma aşaması için yerel MongoDB gerekir; bench veritabanı her çalıştırmada silinir.
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+DEFAULT_DB_NAME = "bench_yapi_denetim"
+STAGES = ("parse", "normalize", "write")
+DATE_FIELDS = ("sozlesmeTarihi", "ruhsatTarihi")
+NUMERIC_FIELDS = ("ada", "parsel", "kalanAlan", "yapiInsaatAlani", "yapiToplamAlani", "bksReferansNo", "yapiKimlikNo")
+BENCH_USER_ID = "bench-excel-import"
+
+
+def peak_rss_mb() -> float:
+    # Linux'ta KB, macOS'ta bayt
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def workbook_rows(rows: int, duplicate_ratio: float, nan_ratio: float, timestamp_ratio: float, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Üretilen satırlar gerçek dosyalardaki çeşitliliği taklit eder:
+    - duplicate_ratio: dosyada daha önce geçen bir YİBF No'yu tekrarlayan satırlar (güncelleme yolu)
+    - nan_ratio: boş bırakılan hücreler; YİBF No boş kalırsa satır atlanır
+    - timestamp_ratio: tarih hücrelerinin metin yerine gerçek tarih olarak yazılma oranı (pd.Timestamp yolu)
+    Sayısal alanlar sayı olarak yazılır; boş hücre içeren sütunlar pandas'ta float'a döner.
+    """
+    from benchmarks.dataset import construction_row
+
+    rng = random.Random(seed)
+    out: List[Dict[str, Any]] = []
+    for i in range(rows):
+        row = construction_row(rng, i)
+        if out and rng.random() < duplicate_ratio:
+            row["yibfNo"] = rng.choice(out)["yibfNo"]
+        for name in NUMERIC_FIELDS:
+            row[name] = int(row[name])
+        for name in DATE_FIELDS:
+            if rng.random() < timestamp_ratio:
+                row[name] = datetime.strptime(row[name], "%d.%m.%Y")
+        if nan_ratio:
+            for name in list(row):
+                if rng.random() < nan_ratio:
+                    row[name] = None
+        out.append(row)
+    return out
+
+
+class StageTimer:
+    def __init__(self):
+        self.ms: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.rss: Dict[str, float] = {}
+
+    def record(self, stage: str, start: float):
+        self.ms[stage].append((time.perf_counter() - start) * 1000)
+        self.rss[stage] = max(self.rss.get(stage, 0.0), peak_rss_mb())
+
+
+async def run_once(server, contents: bytes, user, timer: StageTimer, write: bool) -> Dict[str, int]:
+    gc.collect()
+    start = time.perf_counter()
+    df = server.read_constructions_excel(contents)
+    timer.record("parse", start)
+
+    start = time.perf_counter()
+    records = [server.construction_from_excel_row(row, user) for _, row in df.iterrows()]
+    timer.record("normalize", start)
+    del df
+
+    counts = {"rows": len(records), "imported": 0, "updated": 0, "skipped": sum(1 for r in records if r is None)}
+    if write:
+        start = time.perf_counter()
+        for record in records:
+            if record is None:
+                continue
+            if await server.save_imported_construction(record):
+                counts["updated"] += 1
+            else:
+                counts["imported"] += 1
+        timer.record("write", start)
+    return counts
+
+
+async def reset_constructions(server, existing: List[Dict[str, Any]]):
+    """Her tur aynı başlangıç durumundan çalışsın: koleksiyon ve arama indeksi yeniden kurulur"""
+    await server.db.constructions.delete_many({})
+    if existing:
+        await server.db.constructions.insert_many([dict(doc) for doc in existing])
+    server.construction_index.load(existing)
+
+
+async def main_async(args) -> int:
+    from benchmarks.dataset import construction_row, construction_workbook
+    from benchmarks.report import compare, load_json, metadata, summarize, write_json
+
+    os.environ["DB_NAME"] = args.db_name
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    import server
+
+    if args.workbook:
+        with open(args.workbook, "rb") as f:
+            contents = f.read()
+        rows = None
+    else:
+        t0 = time.perf_counter()
+        data = workbook_rows(args.rows, args.duplicate_ratio, args.nan_ratio, args.timestamp_ratio, args.seed)
+        contents = construction_workbook(data, server.CONSTRUCTION_COLUMN_MAPPING)
+        rows = len(data)
+        del data
+        print(f"Çalışma kitabı üretildi: {rows} satır, {len(contents) / 1e6:.1f} MB ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+        if args.save_workbook:
+            with open(args.save_workbook, "wb") as f:
+                f.write(contents)
+
+    write = not args.skip_write
+    existing: List[Dict[str, Any]] = []
+    if write:
+        # Dosyadaki satırların bir kısmı veritabanında zaten var (güncelleme yolu)
+        rng = random.Random(args.seed + 1)
+        now = datetime.now() - timedelta(days=30)
+        for i in range(int((rows or 0) * args.existing_ratio)):
+            doc = construction_row(rng, i)
+            doc.update(id=f"bench-{i}", createdBy=BENCH_USER_ID, createdByName="Benchmark", createdAt=now.isoformat())
+            existing.append(doc)
+        await server.client.drop_database(args.db_name)
+
+    user = server.User(id=BENCH_USER_ID, email="bench-excel@example.com", name="Benchmark", role=server.UserRole.SUPER_ADMIN)
+    timer = StageTimer()
+    baseline_rss = peak_rss_mb()
+    counts: Dict[str, int] = {}
+    wall = time.perf_counter()
+    for run in range(args.runs):
+        if write:
+            await reset_constructions(server, existing)
+        counts = await run_once(server, contents, user, timer, write)
+        print(f"Tur {run + 1}/{args.runs}: " + ", ".join(f"{s} {timer.ms[s][-1]:.0f}ms" for s in STAGES if timer.ms[s]), file=sys.stderr)
+    wall = time.perf_counter() - wall
+
+    total_rows = counts.get("rows", 0)
+    endpoints: Dict[str, Any] = {}
+    for stage in STAGES:
+        if not timer.ms[stage]:
+            continue
+        stats = summarize(timer.ms[stage], 0, wall)
+        stats["rowsPerSec"] = round(total_rows / (stats["p50"] / 1000), 1) if stats["p50"] else 0.0
+        stats["peakRssMb"] = round(timer.rss[stage], 1)
+        endpoints[stage] = stats
+    scenario = f"excel_import_{total_rows}"
+    result = {
+        "meta": metadata(rows=total_rows, runs=args.runs, duplicateRatio=args.duplicate_ratio, nanRatio=args.nan_ratio,
+                         timestampRatio=args.timestamp_ratio, existingRatio=args.existing_ratio, seed=args.seed,
+                         workbookBytes=len(contents), baselineRssMb=round(baseline_rss, 1), counts=counts),
+        "scenarios": {scenario: {"wallSeconds": round(wall, 3), "endpoints": endpoints}},
+    }
+
+    print(f"\n== {scenario} ({args.runs} tur, {counts})")
+    print(f"   {'aşama':<12} {'p50':>10} {'max':>10} {'satır/sn':>12} {'tepe RSS':>10}")
+    for stage, s in endpoints.items():
+        print(f"   {stage:<12} {s['p50']:>8.0f}ms {s['max']:>8.0f}ms {s['rowsPerSec']:>12.0f} {s['peakRssMb']:>8.0f}MB")
+    print(f"   (başlangıç RSS {baseline_rss:.0f}MB)")
+
+    if args.output:
+        write_json(result, args.output)
+    status = 0
+    if args.baseline and compare(result, load_json(args.baseline), args.threshold):
+        status = 1
+    if write and not args.keep_db:
+        await server.client.drop_database(args.db_name)
+    return status
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Excel içe aktarma throughput benchmark'ı")
+    parser.add_argument("--rows", type=int, default=10000, help="üretilecek satır sayısı (örn. 10000, 100000)")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="dosya içinde tekrarlanan YİBF No oranı")
+    parser.add_argument("--nan-ratio", type=float, default=0.02, help="boş hücre oranı")
+    parser.add_argument("--timestamp-ratio", type=float, default=0.5, help="tarih olarak yazılan tarih hücresi oranı")
+    parser.add_argument("--existing-ratio", type=float, default=0.5, help="veritabanında önceden bulunan satır oranı (--workbook ile kullanılmaz)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workbook", help="üretmek yerine bu .xlsx dosyasını kullan")
+    parser.add_argument("--save-workbook", help="üretilen .xlsx dosyasını bu yola kaydet")
+    parser.add_argument("--skip-write", action="store_true", help="yalnızca parse/normalize (MongoDB gerekmez)")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME)
+    parser.add_argument("--keep-db", action="store_true")
+    parser.add_argument("--output", help="sonuç JSON dosyası")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki sonuç JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=10.0, help="gerileme eşiği (yüzde)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Endpoint başına sorgu bütçesi kontrolü.
+
+Küçük, sabit tohumlu bir veri setiyle doldurulan bench veritabanında her endpoint bir kez çağrılır;
+isteğin gönderdiği Mongo komutları dbstats.capture_requests(commands=True) ile yakalanır ve
+BUDGETS'taki beyanlarla karşılaştırılır:
+
+- komut sayısı (max_ops; auth kullanıcı sorgusu dahil) -> satır başına sorgu (N+1) geri gelirse yakalanır
+- Mongo'dan dönen toplam belge sayısı (max_docs) -> to_list(1000) ile tam tarama geri gelirse yakalanır
+- dönen belgelerdeki en fazla alan sayısı (max_fields) -> projeksiyon kaldırılırsa yakalanır
+- her sorgunun `explain` planı; collscan_ok dışında COLLSCAN yasaktır
+
+    python -m benchmarks.query_shapes                  # ihlal varsa çıkış kodu 1
+    python -m benchmarks.query_shapes --verbose        # komutlar ve planlarıyla
+    python -m benchmarks.query_shapes --route /api/dashboard/stats --output shapes.json
+
+Yerel MongoDB gerekir (explain için gerçek sunucu); veritabanı her çalıştırmada silinir.
+Aynı kontroller tests/test_query_shapes.py ile pytest altında da çalışır; orada plan (explain)
+kontrolleri yalnızca TEST_MONGO_URL ile gerçek sunucuya bağlanıldığında yapılır.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+DEFAULT_DB_NAME = "bench_yapi_denetim_shapes"
+EXPLAINABLE = ("find", "aggregate", "count", "distinct", "update", "delete", "findAndModify")
+# explain içinde gönderilemeyen alanlar
+EXPLAIN_EXCLUDED = ("readConcern", "writeConcern", "cursor", "batchSize")
+SHAPES_SPEC = {"constructions": 200, "messages": 200, "activities_per_construction": 10}
+SAMPLE_YIBF = "1000005"
+
+
+@dataclass
+class Budget:
+    url: str
+    max_ops: int
+    max_docs: int
+    max_fields: Optional[int] = None
+    role: str = "super_admin"
+    method: str = "GET"
+    # Tam taramanın kabul edildiği koleksiyonlar (küçük referans tabloları, filtresiz sayımlar)
+    collscan_ok: Tuple[str, ...] = ()
+    note: str = ""
+
+
+COUNTED = ("site_inspections", "progress_payments", "license_projects", "work_plans", "constructions", "companies")
+
+BUDGETS: List[Budget] = [
+    Budget("/api/auth/me", max_ops=1, max_docs=1, max_fields=5, note="parola alanı projeksiyonla dışarıda kalmalı"),
+    Budget("/api/inspections?ilce=Çankaya&sort=-denetimTarihi", max_ops=2, max_docs=300),
+    Budget(f"/api/inspections?yibfNo={SAMPLE_YIBF}", max_ops=2, max_docs=10),
+    Budget("/api/inspections?teslimAlindi=alinmadi&sort=-denetimTarihi", max_ops=2, max_docs=1001),
+    Budget(f"/api/payments?yibfNo={SAMPLE_YIBF}", max_ops=2, max_docs=10),
+    Budget("/api/workplans?durum=beklemede", max_ops=2, max_docs=201),
+    Budget("/api/licenses", max_ops=2, max_docs=201),
+    Budget("/api/companies", max_ops=2, max_docs=21, collscan_ok=("companies",)),
+    Budget("/api/companies/type/laboratory", max_ops=2, max_docs=21, collscan_ok=("companies",)),
+    Budget("/api/activities/feed?limit=50", max_ops=2, max_docs=52),
+    Budget("/api/constructions/search?q=1000", max_ops=1, max_docs=1, note="bellek içi indeks; yalnızca auth sorgusu"),
+    Budget("/api/mesajlar", max_ops=2, max_docs=201, collscan_ok=("mesajlar",)),
+    Budget("/api/dashboard/stats", max_ops=10, max_docs=10, collscan_ok=COUNTED, note="filtresiz count_documents"),
+    Budget(
+        "/api/reports/eksiklik", max_ops=410, max_docs=2000,
+        collscan_ok=("work_plans", "license_projects", "constructions"),
+        note="bilinen N+1: inşaat başına count_documents + find_one; düzeltildiğinde bütçe düşürülmeli",
+    ),
+]
+
+
+def plan_stages(explain: Any, found: Optional[Set[str]] = None) -> Set[str]:
+    """Kazanan plan(lar)daki aşama adları; reddedilen planlar dikkate alınmaz"""
+    found = set() if found is None else found
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "rejectedPlans":
+                continue
+            if key == "stage" and isinstance(value, str):
+                found.add(value)
+            else:
+                plan_stages(value, found)
+    elif isinstance(explain, list):
+        for item in explain:
+            plan_stages(item, found)
+    return found
+
+
+async def explain(client, command: Dict[str, Any]) -> Set[str]:
+    body = {k: v for k, v in command["command"].items() if k not in EXPLAIN_EXCLUDED}
+    result = await client[command["database"]].command({"explain": body, "verbosity": "queryPlanner"})
+    return plan_stages(result)
+
+
+async def check(http, server, budget: Budget, tokens: Dict[str, str], explain_plans: bool = True) -> Dict[str, Any]:
+    """`explain_plans=False` plan kontrolünü atlar (explain desteklemeyen mongomock ile testler)"""
+    from dbstats import capture_requests
+
+    with capture_requests(commands=True) as captured:
+        response = await http.request(budget.method, budget.url, headers={"Authorization": f"Bearer {tokens[budget.role]}"})
+    stats = captured[-1] if captured else None
+    commands = stats.commands if stats is not None else []
+    violations: List[str] = []
+    if response.status_code >= 400:
+        violations.append(f"HTTP {response.status_code}")
+
+    docs = sum(c["docs"] for c in commands)
+    fields = max((c["fields"] for c in commands), default=0)
+    if len(commands) > budget.max_ops:
+        repeated = ", ".join(f"{n}x {shape}" for shape, n in stats.repeated(2)[:3])
+        violations.append(f"{len(commands)} komut > {budget.max_ops}" + (f" (tekrar eden: {repeated})" if repeated else ""))
+    if docs > budget.max_docs:
+        violations.append(f"{docs} belge > {budget.max_docs}")
+    if budget.max_fields is not None and fields > budget.max_fields:
+        violations.append(f"belge başına {fields} alan > {budget.max_fields}")
+    for command in commands:
+        if command.get("failed"):
+            violations.append(f"hatalı komut: {command['name']} {command['collection']} ({command.get('error')})")
+
+    plans = []
+    for command in commands:
+        entry = {"name": command["name"], "collection": command["collection"], "docs": command["docs"], "fields": command["fields"]}
+        if explain_plans and command["name"] in EXPLAINABLE:
+            try:
+                stages = await explain(server.client, command)
+            except Exception as e:
+                entry["explainError"] = str(e)
+            else:
+                entry["stages"] = sorted(stages)
+                if "COLLSCAN" in stages and command["collection"] not in budget.collscan_ok:
+                    violations.append(f"COLLSCAN: {command['name']} {command['collection']}")
+        entry["command"] = command["command"]
+        plans.append(entry)
+
+    return {
+        "method": budget.method,
+        "url": budget.url,
+        "route": stats.route if stats else None,
+        "ops": len(commands),
+        "docs": docs,
+        "fields": fields,
+        "budget": {"maxOps": budget.max_ops, "maxDocs": budget.max_docs, "maxFields": budget.max_fields, "collscanOk": list(budget.collscan_ok)},
+        "note": budget.note,
+        "violations": sorted(set(violations), key=violations.index),
+        "commands": plans,
+    }
+
+
+def print_result(result: Dict[str, Any], verbose: bool, out=sys.stdout):
+    mark = "İHLAL" if result["violations"] else "ok"
+    b = result["budget"]
+    out.write(
+        f"{mark:<6} {result['method']} {result['url']:<58} ops {result['ops']:>3}/{b['maxOps']:<4} "
+        f"docs {result['docs']:>5}/{b['maxDocs']:<5} fields {result['fields']:>3}\n"
+    )
+    for violation in result["violations"]:
+        out.write(f"       - {violation}\n")
+    if verbose:
+        for c in result["commands"]:
+            stages = ",".join(c.get("stages", [])) or c.get("explainError", "-")
+            body = json.dumps(c["command"], default=str, ensure_ascii=False)
+            out.write(f"         {c['name']} {c['collection']} docs={c['docs']} [{stages}] {body[:200]}\n")
+
+
+async def main_async(args) -> int:
+    os.environ["DB_NAME"] = args.db_name
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    # Ölçülen komutlara iş kuyruğu worker'ının sorguları karışmasın
+    os.environ.setdefault("JOB_WORKER_ENABLED", "false")
+
+    import httpx
+
+    import server
+    from benchmarks.api import Context, login_tokens
+    from benchmarks.dataset import DatasetBuilder, spec_from_args
+    from benchmarks.report import metadata, write_json
+
+    await server.client.drop_database(args.db_name)
+    builder = DatasetBuilder(server, spec_from_args("small", SHAPES_SPEC), seed=args.seed)
+    counts = await builder.build()
+
+    budgets = [b for b in BUDGETS if not args.route or b.url.split("?")[0] in args.route]
+    results = []
+    app = server.app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://shapes", timeout=120) as http:
+            ctx = Context(server=server, builder=builder)
+            await login_tokens(http, ctx)
+            for budget in budgets:
+                result = await check(http, server, budget, ctx.tokens)
+                print_result(result, args.verbose)
+                results.append(result)
+
+    failed = [r for r in results if r["violations"]]
+    print(f"\n{len(results)} endpoint, {len(failed)} ihlal")
+    if args.output:
+        write_json({"meta": metadata(dataset=counts, seed=args.seed), "endpoints": results}, args.output)
+    if not args.keep_db:
+        await server.client.drop_database(args.db_name)
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Endpoint başına Mongo sorgu bütçesi kontrolü")
+    parser.add_argument("--route", action="append", help="yalnızca bu path (sorgu parametresiz, tekrarlanabilir)")
+    parser.add_argument("--verbose", action="store_true", help="komutları ve plan aşamalarını yaz")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME)
+    parser.add_argument("--keep-db", action="store_true")
+    parser.add_argument("--output", help="sonuç JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Kaydedilmiş iş yükünü (capture.py, CAPTURE_FILE) bir test ortamına tekrar oynatır.
+
+İstekler kayıttaki zaman aralıklarıyla gönderilir (--speed 1 gerçek hız, 10 on kat hızlı); bir istek
+öncekinin bitmesini beklemez, böylece kayıttaki eşzamanlılık korunur. Sonuç api benchmark'ıyla aynı
+JSON biçimindedir; iki build arasındaki fark --baseline ile alınır:
+
+    python -m benchmarks.replay capture.jsonl* --base-url http://eski:8001 \\
+        --login super_admin=admin@example.com:parola --login user=kullanici@example.com:parola --output eski.json
+    python -m benchmarks.replay capture.jsonl* --base-url http://yeni:8001 \\
+        --login super_admin=admin@example.com:parola --login user=kullanici@example.com:parola --baseline eski.json
+
+Varsayılan olarak yalnızca GET/HEAD istekleri oynatılır; yazma istekleri --include-writes ile eklenir
+(yalnızca test ortamında kullanın). JSON olmayan gövdeler (Excel yüklemeleri) atlanır. Gövde değerleri
+kaydedilmediyse gövde şeklinden yer tutucu değerler üretilir.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SAFE_METHODS = ("GET", "HEAD")
+LOGIN_ROUTE = "/api/auth/login"
+REDACTED = "***"
+PLACEHOLDERS = {"str": "", "int": 0, "float": 0.0, "bool": False, "null": None}
+
+
+def read_capture(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda r: r["at"])
+    return records
+
+
+def from_shape(shape: Any) -> Any:
+    """capture.body_shape çıktısından aynı yapıda yer tutucu gövde üretir"""
+    if isinstance(shape, dict):
+        if "$list" in shape:
+            return [from_shape(shape["item"]) for _ in range(shape["$list"])] if "item" in shape else []
+        return {k: from_shape(v) for k, v in shape.items()}
+    return PLACEHOLDERS.get(shape, shape)
+
+
+def captured_concurrency(records: List[Dict[str, Any]]) -> int:
+    """Kayıttaki en yüksek eşzamanlı istek sayısı (başlangıç + süre aralıklarından)"""
+    events: List[Tuple[float, int]] = []
+    for r in records:
+        events.append((r["at"], 1))
+        events.append((r["at"] + r["durationMs"] / 1000, -1))
+    peak = current = 0
+    for _, delta in sorted(events):
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+class Replayer:
+    def __init__(self, client, tokens: Dict[str, str], credentials: Optional[Dict[str, str]], speed: float, max_concurrency: int):
+        self.client = client
+        self.tokens = tokens
+        self.credentials = credentials
+        self.speed = speed
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.status_changes: Dict[str, int] = defaultdict(int)
+        self.lateness_ms: List[float] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def request_args(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        kwargs: Dict[str, Any] = {"params": {k: v for k, v in record.get("query", {}).items() if v != REDACTED}}
+        role = record.get("role")
+        if role:
+            token = self.tokens.get(role) or next(iter(self.tokens.values()), None)
+            if token:
+                kwargs["headers"] = {"Authorization": f"Bearer {token}"}
+        if record["route"] == LOGIN_ROUTE:
+            if not self.credentials:
+                return None
+            kwargs["json"] = self.credentials
+        elif record.get("bodyBytes"):
+            if record.get("contentType") != "application/json":
+                return None
+            if "body" in record:
+                kwargs["json"] = record["body"]
+            elif "bodyShape" in record:
+                kwargs["json"] = from_shape(record["bodyShape"])
+            else:
+                return None
+        return kwargs
+
+    async def issue(self, record: Dict[str, Any], kwargs: Dict[str, Any]):
+        label = f"{record['method']} {record['route']}"
+        async with self.semaphore:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(record["method"], record["path"], **kwargs)
+                await response.aread()
+                status = response.status_code
+            except Exception:
+                status = 0
+            finally:
+                self.in_flight -= 1
+        self.latencies[label].append((time.perf_counter() - start) * 1000)
+        if status == 0 or status >= 500 or (status >= 400 and record.get("status", 0) < 400):
+            self.errors[label] += 1
+        if status != record.get("status"):
+            self.status_changes[label] += 1
+
+    async def run(self, records: List[Dict[str, Any]]) -> Tuple[float, int]:
+        tasks = []
+        skipped = 0
+        first = records[0]["at"] if records else 0.0
+        start = time.perf_counter()
+        for record in records:
+            kwargs = self.request_args(record)
+            if kwargs is None:
+                skipped += 1
+                continue
+            if self.speed > 0:
+                due = (record["at"] - first) / self.speed
+                delay = due - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.lateness_ms.append(-delay * 1000)
+            tasks.append(asyncio.ensure_future(self.issue(record, kwargs)))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start, skipped
+
+
+async def login(client, credentials: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+    tokens = {}
+    for role, (email, password) in credentials.items():
+        response = await client.post(LOGIN_ROUTE, json={"email": email, "password": password})
+        response.raise_for_status()
+        tokens[role] = response.json()["access_token"]
+    return tokens
+
+
+def parse_login(values: List[str]) -> Dict[str, Tuple[str, str]]:
+    credentials = {}
+    for value in values:
+        role, _, rest = value.partition("=")
+        email, _, password = rest.partition(":")
+        if not (role and email and password):
+            raise SystemExit(f"Geçersiz --login değeri: {value} (rol=eposta:parola bekleniyor)")
+        credentials[role] = (email, password)
+    return credentials
+
+
+async def main_async(args) -> int:
+    import httpx
+
+    from benchmarks.report import compare, load_json, metadata, print_results, summarize, write_json
+
+    records = read_capture(args.files)
+    if not args.include_writes:
+        records = [r for r in records if r["method"] in SAFE_METHODS or r["route"] == LOGIN_ROUTE]
+    if args.route:
+        records = [r for r in records if r["route"] in args.route]
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print("Oynatılacak kayıt yok", file=sys.stderr)
+        return 1
+
+    credentials = parse_login(args.login or [])
+    captured_span = records[-1]["at"] - records[0]["at"]
+    print(f"{len(records)} istek, kayıt süresi {captured_span:.1f}s, hız {args.speed:g}x", file=sys.stderr)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=httpx.Timeout(args.timeout),
+                                 limits=httpx.Limits(max_connections=args.max_concurrency)) as client:
+        tokens = dict(tok.split("=", 1) for tok in args.token or [])
+        tokens.update(await login(client, credentials))
+        first_login = next(iter(credentials.values()), None)
+        replayer = Replayer(client, tokens, {"email": first_login[0], "password": first_login[1]} if first_login else None,
+                            args.speed, args.max_concurrency)
+        wall, skipped = await replayer.run(records)
+
+    captured: Dict[str, List[float]] = defaultdict(list)
+    for r in records:
+        captured[f"{r['method']} {r['route']}"].append(r["durationMs"])
+    endpoints = {}
+    for label, values in sorted(replayer.latencies.items()):
+        stats = summarize(values, replayer.errors[label], wall)
+        recorded = summarize(captured[label], 0, captured_span or wall)
+        stats["capturedP50"] = recorded["p50"]
+        stats["capturedP95"] = recorded["p95"]
+        stats["statusChanges"] = replayer.status_changes[label]
+        endpoints[label] = stats
+
+    late = sorted(replayer.lateness_ms)
+    result = {
+        "meta": metadata(
+            baseUrl=args.base_url, speed=args.speed, requests=len(records), skipped=skipped,
+            capturedSeconds=round(captured_span, 3), capturedConcurrency=captured_concurrency(records),
+            replayedConcurrency=replayer.peak_in_flight, maxConcurrency=args.max_concurrency,
+            lateRequests=len(late), maxLatenessMs=round(late[-1], 1) if late else 0.0,
+        ),
+        "scenarios": {"replay": {"wallSeconds": round(wall, 3), "endpoints": endpoints}},
+    }
+    print_results(result)
+    meta = result["meta"]
+    print(f"\nEşzamanlılık: kayıtta {meta['capturedConcurrency']}, oynatmada {meta['replayedConcurrency']}; "
+          f"{skipped} istek atlandı; {len(late)} istek planlanandan geç gönderildi (en fazla {meta['maxLatenessMs']}ms)")
+    if args.output:
+        write_json(result, args.output)
+    if args.baseline and compare(result, load_json(args.baseline), args.threshold):
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kaydedilmiş iş yükünü tekrar oynatır")
+    parser.add_argument("files", nargs="+", help="capture JSONL dosyaları (dönen dosyalar dahil)")
+    parser.add_argument("--base-url", required=True, help="test ortamı adresi, örn. http://localhost:8001")
+    parser.add_argument("--speed", type=float, default=1.0, help="oynatma hızı çarpanı (0 = beklemeden)")
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--login", action="append", help="rol=eposta:parola (rol başına bir kez)")
+    parser.add_argument("--token", action="append", help="rol=JWT (giriş yapmadan)")
+    parser.add_argument("--include-writes", action="store_true", help="POST/PUT/DELETE isteklerini de oynat")
+    parser.add_argument("--route", action="append", help="yalnızca bu route şablonu (tekrarlanabilir)")
+    parser.add_argument("--limit", type=int, help="ilk N istek")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="sonuç JSON dosyası")
+    parser.add_argument("--baseline", help="önceki build'in sonuç JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=10.0, help="gerileme eşiği (yüzde)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark sonuçlarının özetlenmesi, JSON'a yazılması ve kayıtlı bir temel (baseline) ile karşılaştırılması.
+
+Sonuç dosyası biçimi:
+
+    {"meta": {...}, "scenarios": {"<senaryo>": {"wallSeconds": .., "endpoints": {"<etiket>": {"count", "errors",
+     "p50", "p95", "p99", "mean", "max", "throughput"}}}}}
+"""
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+COMPARED_METRICS = ("p50", "p95", "p99")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Doğrusal interpolasyonlu yüzdelik (values sıralı olmalı)"""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarize(latencies_ms: List[float], errors: int, wall_seconds: float) -> Dict[str, Any]:
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "p50": round(percentile(values, 0.50), 2),
+        "p95": round(percentile(values, 0.95), 2),
+        "p99": round(percentile(values, 0.99), 2),
+        "mean": round(sum(values) / count, 2) if count else 0.0,
+        "max": round(values[-1], 2) if values else 0.0,
+        "throughput": round(count / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def metadata(**extra) -> Dict[str, Any]:
+    return {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        **extra,
+    }
+
+
+def write_json(result: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def print_results(result: Dict[str, Any], out=sys.stdout):
+    for scenario, data in result["scenarios"].items():
+        out.write(f"\n== {scenario} ({data['wallSeconds']:.2f}s)\n")
+        out.write(f"   {'endpoint':<44} {'n':>6} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>8}\n")
+        for label, s in data["endpoints"].items():
+            out.write(
+                f"   {label:<44} {s['count']:>6} {s['errors']:>4} {s['p50']:>7.1f}ms {s['p95']:>7.1f}ms "
+                f"{s['p99']:>7.1f}ms {s['throughput']:>8.1f}\n"
+            )
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold_percent: float = 10.0, out=sys.stdout) -> List[str]:
+    """
+    Ortak senaryo/endpoint'ler için yüzdelik değişimleri yazar; eşikten fazla yavaşlayanları döner.
+    Çok kısa süreli uçlarda gürültüyü azaltmak için 1 ms altındaki mutlak farklar yok sayılır.
+    """
+    regressions = []
+    out.write(f"\nTemel: {baseline.get('meta', {}).get('git')} ({baseline.get('meta', {}).get('createdAt')})\n")
+    for scenario, data in current["scenarios"].items():
+        base_scenario = baseline.get("scenarios", {}).get(scenario)
+        if not base_scenario:
+            continue
+        out.write(f"\n== {scenario}\n")
+        for label, stats in data["endpoints"].items():
+            base = base_scenario["endpoints"].get(label)
+            if not base:
+                continue
+            parts = []
+            for metric in COMPARED_METRICS:
+                old, new = base[metric], stats[metric]
+                delta = (new - old) / old * 100 if old else 0.0
+                flag = ""
+                if delta > threshold_percent and new - old >= 1.0:
+                    flag = " !"
+                    regressions.append(f"{scenario} {label} {metric}: {old:.1f}ms -> {new:.1f}ms ({delta:+.0f}%)")
+                parts.append(f"{metric} {old:.1f}->{new:.1f}ms ({delta:+.0f}%){flag}")
+            out.write(f"   {label:<44} " + "  ".join(parts) + "\n")
+    if regressions:
+        out.write(f"\n{len(regressions)} gerileme (eşik %{threshold_percent:g}):\n")
+        for line in regressions:
+            out.write(f"   {line}\n")
+    return regressions
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,170 @@
+"""
+İş yükü kaydı (capture).
+
+Saf ASGI middleware; /api isteklerini sonradan `python -m benchmarks.replay` ile tekrar oynatılabilecek
+biçimde JSONL dosyasına yazar. Kayıt başına: zaman, method, route şablonu, path, query parametreleri,
+gövde şekli (alan adları ve tipleri), kullanıcı rolü, durum kodu ve süre. Parola/token gibi hassas
+alanlar "***" ile maskelenir. Gövde değerleri yalnızca `bodies=True` iken (maskelenmiş olarak) saklanır.
+
+Rol, get_current_user içinden `note_user_role` ile isteğe iliştirilir; ek sorgu yapılmaz.
+"""
+import json
+import random
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import RouteTemplates
+from tracing import TraceWriter
+
+REDACTED = "***"
+SENSITIVE_KEY = re.compile(r"password|passwd|parola|şifre|sifre|token|secret|authorization|api[_-]?key", re.IGNORECASE)
+
+_entry: ContextVar[Optional[Dict[str, Any]]] = ContextVar("capture_entry", default=None)
+
+
+def note_user_role(role: Any):
+    """Kayıt altındaki isteğe kimliği doğrulanmış kullanıcının rolünü ekler"""
+    entry = _entry.get()
+    if entry is not None:
+        entry["role"] = getattr(role, "value", role)
+
+
+def is_sensitive(key: str) -> bool:
+    return bool(SENSITIVE_KEY.search(key))
+
+
+def body_shape(value: Any) -> Any:
+    """Değerleri tip adlarıyla değiştirir; listelerde ilk elemanın şekli ve uzunluk tutulur"""
+    if isinstance(value, dict):
+        return {k: REDACTED if is_sensitive(k) else body_shape(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return {"$list": len(value), "item": body_shape(value[0])} if value else {"$list": 0}
+    if value is None:
+        return "null"
+    return type(value).__name__
+
+
+def redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: REDACTED if is_sensitive(k) else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def _query(query_string: bytes) -> Dict[str, Any]:
+    from urllib.parse import parse_qsl
+
+    params: Dict[str, Any] = {}
+    for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+        value = REDACTED if is_sensitive(key) else value
+        if key in params:
+            existing = params[key]
+            params[key] = (existing if isinstance(existing, list) else [existing]) + [value]
+        else:
+            params[key] = value
+    return params
+
+
+def _content_type(scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"content-type":
+            return value.decode("latin-1").split(";")[0].strip()
+    return ""
+
+
+class CaptureMiddleware:
+    """
+    `sample_rate` oranındaki /api istekleri yazılır; `exclude` önekleriyle başlayan path'ler
+    (tanılama uçları vb.) kaydedilmez. JSON gövdeleri `max_body_bytes`'a kadar okunur; daha büyük
+    ya da JSON olmayan gövdeler (Excel yüklemesi) yalnızca tip ve boyutla kaydedilir.
+    """
+
+    def __init__(
+        self,
+        app,
+        route_templates: RouteTemplates,
+        writer: TraceWriter,
+        sample_rate: float = 1.0,
+        bodies: bool = False,
+        max_body_bytes: int = 64 * 1024,
+        prefix: str = "/api",
+        exclude: Tuple[str, ...] = ("/api/diagnostics",),
+    ):
+        self.app = app
+        self.route_template = route_templates
+        self.writer = writer
+        self.sample_rate = sample_rate
+        self.bodies = bodies
+        self.max_body_bytes = max_body_bytes
+        self.prefix = prefix
+        self.exclude = exclude
+
+    def _wanted(self, scope) -> bool:
+        if scope["type"] != "http" or self.sample_rate <= 0:
+            return False
+        path = scope["path"]
+        if not path.startswith(self.prefix) or path.startswith(self.exclude):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        entry: Dict[str, Any] = {"role": None}
+        token = _entry.set(entry)
+        content_type = _content_type(scope)
+        chunks = []
+        body_bytes = 0
+        status = 500
+
+        async def receive_wrapper():
+            nonlocal body_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                body_bytes += len(body)
+                if content_type == "application/json" and body_bytes <= self.max_body_bytes:
+                    chunks.append(body)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        at = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            _entry.reset(token)
+            record = {
+                "at": at,
+                "ts": datetime.fromtimestamp(at, timezone.utc).isoformat(),
+                "method": scope["method"],
+                "route": self.route_template(scope),
+                "path": scope["path"],
+                "query": _query(scope.get("query_string", b"")),
+                "contentType": content_type or None,
+                "bodyBytes": body_bytes,
+                "role": entry["role"],
+                "status": status,
+                "durationMs": round(duration_ms, 3),
+            }
+            if chunks and body_bytes <= self.max_body_bytes:
+                try:
+                    body = json.loads(b"".join(chunks))
+                except ValueError:
+                    body = None
+                if body is not None:
+                    record["bodyShape"] = body_shape(body)
+                    if self.bodies:
+                        record["body"] = redact(body)
+            self.writer.write(record)
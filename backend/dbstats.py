@@ -0,0 +1,266 @@
+"""
+İstek başına veritabanı operasyon sayacı ve N+1 dedektörü.
+
+Middleware her HTTP isteği için bir `RequestDbStats` nesnesini contextvar'a koyar; pymongo
+command listener'ı o isteğe ait komutları ve sürelerini bu nesneye yazar (motor işlemleri
+thread havuzunda çalıştırırken contextvar'ları kopyaladığından listener doğru isteği görür).
+
+Yanıta `Server-Timing: db;dur=<ms>;desc="<n> ops"` başlığı eklenir. Operasyon sayısı ya da
+toplam süre bütçeyi aşan istekler, aynı istekte tekrar eden sorgu şekilleriyle (N+1 adayları)
+birlikte loglanır. `capture_requests()` ile betiklerden endpoint başına operasyon sayısı
+ölçülüp `assert_max_ops` ile sınırlanabilir.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from metrics import IGNORED_COMMANDS, RouteTemplates, command_collection
+
+logger = logging.getLogger(__name__)
+
+# Komut adı -> filtrenin bulunduğu alan
+_FILTER_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query"}
+_WRITE_FIELDS = {"update": ("updates", "q"), "delete": ("deletes", "q")}
+
+
+def _shape(value: Any) -> Any:
+    """Değerleri '?' ile değiştirip yalnızca sorgu iskeletini bırakır"""
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, list):
+        # $and/$or gibi koşul listeleri korunur, değer listeleri ($in) tek '?' olur
+        if value and all(isinstance(v, dict) for v in value):
+            return [_shape(v) for v in value]
+        return "?"
+    return "?"
+
+
+def query_shape(command_name: str, command) -> str:
+    """find users {"email": "?"} gibi; aynı şekil bir istekte tekrar ediyorsa N+1 adayıdır"""
+    collection = command_collection(command_name, command)
+    if command_name in _FILTER_FIELDS:
+        body = command.get(_FILTER_FIELDS[command_name]) or {}
+    elif command_name in _WRITE_FIELDS:
+        field, key = _WRITE_FIELDS[command_name]
+        items = command.get(field) or [{}]
+        body = items[0].get(key) or {}
+    elif command_name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        body = [{"$match": stage["$match"]} if "$match" in stage else {name: "?" for name in stage} for stage in pipeline]
+    else:
+        body = None
+    if body is None:
+        return f"{command_name} {collection}"
+    return f"{command_name} {collection} {json.dumps(_shape(body), sort_keys=True, default=str, ensure_ascii=False)}"
+
+
+# Kaydedilen komutlardan çıkarılan oturum/sürücü alanları (explain için tekrar gönderilmez)
+_DRIVER_FIELDS = ("lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "signature", "$readConcern")
+
+
+def reply_documents(reply) -> Tuple[int, int]:
+    """Yanıttaki belge sayısı ve belgelerdeki en fazla üst düzey alan sayısı"""
+    cursor = reply.get("cursor") if isinstance(reply, dict) else None
+    if cursor:
+        batch = cursor.get("firstBatch", cursor.get("nextBatch")) or []
+        return len(batch), max((len(doc) for doc in batch), default=0)
+    if isinstance(reply, dict) and "values" in reply:
+        return len(reply["values"]), 0
+    return 0, 0
+
+
+class RequestDbStats:
+    def __init__(self, keep_commands: bool = False):
+        self.ops = 0
+        # Sunucunun hata döndürdüğü komutlar (ops içinde de sayılır)
+        self.failures = 0
+        self.duration_ms = 0.0
+        self.shapes: Counter = Counter()
+        # capture_requests(commands=True) altında komutların kendisi de tutulur (explain, belge sayısı)
+        self.commands: Optional[List[Dict[str, Any]]] = [] if keep_commands else None
+        self.route: Optional[str] = None
+        self.method: Optional[str] = None
+        self.status: Optional[int] = None
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, shape: str, duration_ms: float, failed: bool = False):
+        with self._lock:
+            self.ops += 1
+            self.failures += failed
+            self.duration_ms += duration_ms
+            self.shapes[shape] += 1
+
+    def record_command(self, command: Dict[str, Any]):
+        with self._lock:
+            self.commands.append(command)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "route": self.route,
+            "status": self.status,
+            "ops": self.ops,
+            "failures": self.failures,
+            "dbMs": round(self.duration_ms, 2),
+            "totalMs": round(self.total_ms, 2),
+            "shapes": dict(self.shapes),
+        }
+
+
+_current: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def current_stats() -> Optional[RequestDbStats]:
+    return _current.get()
+
+
+class RequestDbListener(monitoring.CommandListener):
+    """Yalnızca bir HTTP isteği içinde başlayan komutları sayar (worker, startup vb. hariç)"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, int], Tuple[RequestDbStats, str, Optional[Dict[str, Any]]]] = {}
+
+    def started(self, event):
+        stats = _current.get()
+        if stats is None or event.command_name in IGNORED_COMMANDS:
+            return
+        command = None
+        if stats.commands is not None:
+            command = {
+                "name": event.command_name,
+                "database": event.database_name,
+                "collection": command_collection(event.command_name, event.command),
+                "command": {k: v for k, v in event.command.items() if k not in _DRIVER_FIELDS},
+            }
+        self._pending[(event.request_id, event.operation_id)] = (stats, query_shape(event.command_name, event.command), command)
+
+    def succeeded(self, event):
+        self._finish(event, None)
+
+    def failed(self, event):
+        failure = getattr(event, "failure", None)
+        self._finish(event, (failure.get("errmsg") if isinstance(failure, dict) else None) or str(failure))
+
+    def _finish(self, event, error: Optional[str]):
+        pending = self._pending.pop((event.request_id, event.operation_id), None)
+        if pending is not None:
+            stats, shape, command = pending
+            stats.record(shape, event.duration_micros / 1000, failed=error is not None)
+            if command is not None:
+                command["durationMs"] = event.duration_micros / 1000
+                command["failed"] = error is not None
+                if error is not None:
+                    command["error"] = error
+                    command["docs"], command["fields"] = 0, 0
+                else:
+                    command["docs"], command["fields"] = reply_documents(getattr(event, "reply", None))
+                stats.record_command(command)
+
+
+# capture_requests() ile eklenen gözlemciler; her istek bitiminde stats ile çağrılır
+_observers: List[Callable[[RequestDbStats], None]] = []
+# Komutların kendisini isteyen açık capture_requests bloklarının sayısı
+_command_capture = [0]
+
+
+@contextmanager
+def capture_requests(commands: bool = False) -> Iterator[List[RequestDbStats]]:
+    """
+    Blok içinde tamamlanan isteklerin istatistiklerini toplar:
+
+        with capture_requests() as captured:
+            client.get("/api/inspections", headers=auth)
+        assert_max_ops(captured, 3)
+
+    `commands=True` ile her isteğin komutları (filtre, projeksiyon, dönen belge sayısı) da tutulur.
+    """
+    captured: List[RequestDbStats] = []
+    _observers.append(captured.append)
+    if commands:
+        _command_capture[0] += 1
+    try:
+        yield captured
+    finally:
+        _observers.remove(captured.append)
+        if commands:
+            _command_capture[0] -= 1
+
+
+def assert_max_ops(captured: List[RequestDbStats], max_ops: int, route: Optional[str] = None):
+    for stats in captured:
+        if route is not None and stats.route != route:
+            continue
+        assert stats.ops <= max_ops, (
+            f"{stats.method} {stats.route}: {stats.ops} Mongo operasyonu (sınır {max_ops}); "
+            f"tekrar eden sorgular: {stats.repeated(2)}"
+        )
+
+
+class DbBudgetMiddleware:
+    """
+    Saf ASGI middleware. Bütçe değerleri 0 ise ilgili kontrol kapalıdır; tekrar eşiği,
+    aynı sorgu şeklinin bir istekte kaç kez çalışınca N+1 olarak raporlanacağıdır.
+    """
+
+    def __init__(self, app, route_templates: RouteTemplates, max_ops: int = 0, max_ms: float = 0, repeat_threshold: int = 5):
+        self.app = app
+        self.route_template = route_templates
+        self.max_ops = max_ops
+        self.max_ms = max_ms
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestDbStats(keep_commands=_command_capture[0] > 0)
+        token = _current.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                stats.status = message["status"]
+                timing = f'db;dur={stats.duration_ms:.1f};desc="{stats.ops} ops", app;dur={(time.perf_counter() - start) * 1000:.1f}'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            stats.total_ms = (time.perf_counter() - start) * 1000
+            stats.method = scope["method"]
+            stats.route = self.route_template(scope)
+            self._check(stats)
+            for observer in list(_observers):
+                observer(stats)
+
+    def _check(self, stats: RequestDbStats):
+        over_ops = self.max_ops and stats.ops > self.max_ops
+        over_ms = self.max_ms and stats.duration_ms > self.max_ms
+        repeated = stats.repeated(self.repeat_threshold) if self.repeat_threshold else []
+        if not (over_ops or over_ms or repeated):
+            return
+        reasons = []
+        if over_ops:
+            reasons.append(f"operasyon bütçesi aşıldı ({stats.ops} > {self.max_ops})")
+        if over_ms:
+            reasons.append(f"süre bütçesi aşıldı ({stats.duration_ms:.0f}ms > {self.max_ms:.0f}ms)")
+        if repeated:
+            reasons.append("tekrar eden sorgular: " + "; ".join(f"{count}x {shape}" for shape, count in repeated[:5]))
+        failures = f" ({stats.failures} hatalı)" if stats.failures else ""
+        logger.warning(
+            f"DB bütçesi: {stats.method} {stats.route} -> {stats.ops} op{failures}, {stats.duration_ms:.0f}ms db, "
+            f"{stats.total_ms:.0f}ms toplam | " + " | ".join(reasons)
+        )
@@ -0,0 +1,97 @@
+"""
+Veritabanı cursor'ından doğrudan akan CSV ve XLSX dışa aktarımları.
+
+CSV satırları üretildikçe gönderilir. XLSX için openpyxl write-only modu kullanılır:
+satırlar diske yazılır, bellek kullanımı satır sayısından bağımsız kalır; dosya
+tamamlandıktan sonra parça parça gönderilip silinir.
+"""
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from urllib.parse import quote
+
+from openpyxl import Workbook
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse, StreamingResponse
+
+CSV_DELIMITER = ";"  # Türkçe Excel'de liste ayırıcı
+CSV_BATCH_ROWS = 500
+XLSX_BATCH_ROWS = 1000
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# (model alanı, Türkçe sütun başlığı)
+Columns = List[Tuple[str, str]]
+
+
+def format_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Evet" if value else "Hayır"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _content_disposition(filename: str) -> Dict[str, str]:
+    return {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+
+
+async def _csv_chunks(docs: AsyncIterator[Dict[str, Any]], columns: Columns) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=CSV_DELIMITER)
+    writer.writerow([header for _, header in columns])
+    yield ("﻿" + buffer.getvalue()).encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    rows = 0
+    async for doc in docs:
+        writer.writerow([format_value(doc.get(field)) for field, _ in columns])
+        rows += 1
+        if rows % CSV_BATCH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def csv_response(docs: AsyncIterator[Dict[str, Any]], columns: Columns, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        _csv_chunks(docs, columns),
+        media_type="text/csv; charset=utf-8",
+        headers=_content_disposition(filename),
+    )
+
+
+async def xlsx_response(docs: AsyncIterator[Dict[str, Any]], columns: Columns, filename: str, sheet_title: str) -> FileResponse:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title[:31])
+    ws.append([header for _, header in columns])
+    batch = []
+    async for doc in docs:
+        batch.append([format_value(doc.get(field)) for field, _ in columns])
+        if len(batch) >= XLSX_BATCH_ROWS:
+            # Satır yazımı senkron; event loop'u bloklamamak için thread'de yapılır
+            await asyncio.to_thread(lambda rows=batch: [ws.append(r) for r in rows])
+            batch = []
+    if batch:
+        await asyncio.to_thread(lambda rows=batch: [ws.append(r) for r in rows])
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await asyncio.to_thread(wb.save, path)
+    except Exception:
+        os.unlink(path)
+        raise
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        headers=_content_disposition(filename),
+        background=BackgroundTask(os.unlink, path),
+    )
@@ -0,0 +1,301 @@
+"""
+Mongo üzerinde kalıcı arka plan iş kuyruğu.
+
+Uzun süren yönetim işlemleri (Excel içe aktarma, toplu silme, rapor üretimi) HTTP isteği
+içinde değil, `jobs` koleksiyonundaki iş dokümanları üzerinden çalıştırılır:
+
+    queued -> running -> succeeded | failed | cancelled
+
+Bir worker işi kiralar (lease); kira düzenli olarak yenilenir. Süreç çökerse kira dolar ve
+iş başka bir worker tarafından yeniden alınır. Hatalı işler `maxAttempts` kadar artan
+bekleme ile yeniden denenir. Worker aynı süreçte (API) ya da `worker.py` ile ayrı çalışabilir.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+DEFAULT_LEASE_SECONDS = 60
+RETRY_BASE_SECONDS = 5
+
+
+class JobError(Exception):
+    """Yeniden denenmeyecek (kalıcı) iş hatası, örn. geçersiz dosya"""
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class LeaseLost(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobContext:
+    def __init__(self, queue: "JobQueue", job: Dict[str, Any], worker_id: str):
+        self.queue = queue
+        self.job = job
+        self.worker_id = worker_id
+        self.cancel_requested = False
+        self.lease_lost = False
+
+    @property
+    def id(self) -> str:
+        return self.job["id"]
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.job.get("params") or {}
+
+    def _owner(self) -> Dict[str, Any]:
+        return {"id": self.id, "status": RUNNING, "workerId": self.worker_id, "attempts": self.job["attempts"]}
+
+    async def renew(self, extra: Optional[Dict[str, Any]] = None):
+        """Kirayı uzatır ve iptal isteğini okur; iş başka worker'a geçtiyse LeaseLost"""
+        update = {"leaseUntil": (_now() + timedelta(seconds=self.queue.lease_seconds)).isoformat()}
+        update.update(extra or {})
+        doc = await self.queue.collection.find_one_and_update(
+            self._owner(), {"$set": update},
+            projection={"_id": 0, "cancelRequested": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            raise LeaseLost(self.id)
+        self.cancel_requested = bool(doc.get("cancelRequested"))
+
+    async def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """İlerlemeyi yazar; iptal istenmişse JobCancelled fırlatır (güvenli durma noktası)"""
+        await self.renew({"progress": {"done": done, "total": total, "message": message}})
+        if self.cancel_requested:
+            raise JobCancelled(self.id)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobQueue:
+    def __init__(self, db, collection_name: str = "jobs", files_bucket: str = "job_files", lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.collection = db[collection_name]
+        self.files = AsyncIOMotorGridFSBucket(db, bucket_name=files_bucket)
+        self.lease_seconds = lease_seconds
+        self.handlers: Dict[str, JobHandler] = {}
+        self.max_attempts: Dict[str, int] = {}
+
+    def register(self, kind: str, handler: JobHandler, max_attempts: int = 3):
+        self.handlers[kind] = handler
+        self.max_attempts[kind] = max_attempts
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index([("status", 1), ("runAt", 1)])
+        await self.collection.create_index([("status", 1), ("leaseUntil", 1)])
+        await self.collection.create_index([("createdBy", 1), ("createdAt", -1)])
+
+    # ---------- dosyalar (Excel yüklemeleri vb.) ----------
+
+    async def put_file(self, filename: str, data: bytes) -> str:
+        file_id = await self.files.upload_from_stream(filename, data)
+        return str(file_id)
+
+    async def read_file(self, file_id: str) -> bytes:
+        from bson import ObjectId
+        stream = await self.files.open_download_stream(ObjectId(file_id))
+        return await stream.read()
+
+    async def _delete_files(self, job: Dict[str, Any]):
+        from bson import ObjectId
+        for file_id in job.get("fileIds") or []:
+            try:
+                await self.files.delete(ObjectId(file_id))
+            except Exception as e:
+                logger.warning(f"İş dosyası silinemedi ({job['id']} {file_id}): {e}")
+
+    # ---------- API ----------
+
+    async def submit(self, kind: str, params: Dict[str, Any], user_id: str, user_name: str, file_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        if kind not in self.handlers:
+            raise ValueError(f"Bilinmeyen iş türü: {kind}")
+        now = _now().isoformat()
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "params": params,
+            "status": QUEUED,
+            "progress": {"done": 0, "total": None, "message": None},
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "maxAttempts": self.max_attempts[kind],
+            "runAt": now,
+            "leaseUntil": None,
+            "workerId": None,
+            "cancelRequested": False,
+            "fileIds": file_ids or [],
+            "createdBy": user_id,
+            "createdByName": user_name,
+            "createdAt": now,
+            "startedAt": None,
+            "finishedAt": None,
+        }
+        await self.collection.insert_one(job)
+        job.pop("_id", None)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def list(self, user_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {}
+        if user_id:
+            query["createdBy"] = user_id
+        if status:
+            query["status"] = status
+        return await self.collection.find(query, {"_id": 0, "result": 0}).sort("createdAt", -1).limit(limit).to_list(limit)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Kuyruktaki iş hemen iptal edilir; çalışan işe iptal isteği bırakılır"""
+        now = _now().isoformat()
+        doc = await self.collection.find_one_and_update(
+            {"id": job_id, "status": QUEUED},
+            {"$set": {"status": CANCELLED, "cancelRequested": True, "finishedAt": now}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None:
+            await self._delete_files(doc)
+            return doc
+        return await self.collection.find_one_and_update(
+            {"id": job_id, "status": RUNNING},
+            {"$set": {"cancelRequested": True}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+        ) or await self.get(job_id)
+
+    # ---------- worker ----------
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = _now()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": QUEUED, "runAt": {"$lte": now.isoformat()}},
+                # Kirası dolmuş (worker'ı ölmüş) işler yeniden alınır
+                {"status": RUNNING, "leaseUntil": {"$lt": now.isoformat()}},
+            ], "kind": {"$in": list(self.handlers)}},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "workerId": worker_id,
+                    "leaseUntil": (now + timedelta(seconds=self.lease_seconds)).isoformat(),
+                    "startedAt": now.isoformat(),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("runAt", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _finish(self, ctx: JobContext, update: Dict[str, Any]):
+        update["finishedAt"] = _now().isoformat()
+        result = await self.collection.update_one(ctx._owner(), {"$set": update})
+        if result.modified_count and update.get("status") in FINISHED_STATUSES:
+            await self._delete_files(ctx.job)
+
+    async def _heartbeat(self, ctx: JobContext, task: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await ctx.renew()
+            except LeaseLost:
+                logger.warning(f"İş kirası kaybedildi, durduruluyor: {ctx.id}")
+                ctx.lease_lost = True
+                task.cancel()
+                return
+            except Exception as e:
+                logger.warning(f"İş kirası yenilenemedi ({ctx.id}): {e}")
+
+    async def run_job(self, job: Dict[str, Any], worker_id: str):
+        ctx = JobContext(self, job, worker_id)
+        handler = self.handlers[job["kind"]]
+        if job.get("cancelRequested"):
+            await self._finish(ctx, {"status": CANCELLED})
+            return
+        if job["attempts"] > job.get("maxAttempts", 1):
+            # Kirası dolarak tekrar tekrar alınan (süreci çökerten) iş
+            await self._finish(ctx, {"status": FAILED, "error": job.get("error") or "Deneme hakkı tükendi"})
+            return
+        task = asyncio.ensure_future(handler(ctx))
+        heartbeat = asyncio.ensure_future(self._heartbeat(ctx, task))
+        try:
+            result = await task
+            await self._finish(ctx, {"status": SUCCEEDED, "result": result, "error": None})
+        except JobCancelled:
+            await self._finish(ctx, {"status": CANCELLED})
+        except asyncio.CancelledError:
+            # Kira kaybı: iş artık başka worker'da; burada bir şey yazılmaz
+            if ctx.lease_lost:
+                return
+            # Worker kapanıyor: iş deneme hakkı harcanmadan kuyruğa geri bırakılır
+            await asyncio.shield(self.collection.update_one(ctx._owner(), {
+                "$set": {"status": QUEUED, "leaseUntil": None, "workerId": None},
+                "$inc": {"attempts": -1},
+            }))
+            raise
+        except JobError as e:
+            await self._finish(ctx, {"status": FAILED, "error": str(e)})
+        except Exception as e:
+            logger.exception(f"İş başarısız ({job['kind']} {job['id']}, deneme {job['attempts']})")
+            if job["attempts"] < job.get("maxAttempts", 1):
+                delay = RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                await self.collection.update_one(ctx._owner(), {"$set": {
+                    "status": QUEUED,
+                    "error": str(e),
+                    "runAt": (_now() + timedelta(seconds=delay)).isoformat(),
+                    "leaseUntil": None,
+                    "workerId": None,
+                }})
+            else:
+                await self._finish(ctx, {"status": FAILED, "error": str(e)})
+        finally:
+            heartbeat.cancel()
+
+    async def run_worker(self, worker_id: str, stop: asyncio.Event, concurrency: int = 2, poll_interval: float = 1.0):
+        """`stop` set edilene kadar kuyruktan iş alır; en fazla `concurrency` iş aynı anda çalışır"""
+        running = set()
+        logger.info(f"İş worker'ı başladı: {worker_id} (eşzamanlılık {concurrency})")
+        while not stop.is_set():
+            job = None
+            if len(running) < concurrency:
+                try:
+                    job = await self.claim(worker_id)
+                except Exception as e:
+                    logger.warning(f"İş kuyruğu okunamadı: {e}")
+            if job is not None:
+                task = asyncio.ensure_future(self.run_job(job, worker_id))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        # Çalışan işler kesilip kuyruğa geri bırakılır
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        logger.info(f"İş worker'ı durdu: {worker_id}")
@@ -0,0 +1,130 @@
+"""
+Event loop gecikme (lag) izleyicisi.
+
+Tek süreçli asyncio sunucusunda handler içindeki senkron iş (bcrypt, pd.read_excel, büyük
+Pydantic doğrulamaları) o sırada bekleyen tüm istekleri durdurur. İzleyici iki parçadan oluşur:
+
+- Örnekleyici coroutine her `interval` saniyede uyanır; planlanan ile gerçek uyanma arasındaki
+  fark gecikmedir ve histogram'a yazılır. Her uyanışta bir "kalp atışı" zamanı bırakır.
+- Gözcü (watchdog) thread kalp atışı `threshold` süresinden uzun gecikirse loop thread'inin o
+  anki yığınını (`sys._current_frames`) alır; yığındaki ASGI scope'undan route bulunur. Böylece
+  bloklayan çağrı, bloklama sürerken yakalanır.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from metrics import registry
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_STACK_DEPTH = 40
+
+loop_lag = registry.histogram("event_loop_lag_seconds", "Event loop zamanlama gecikmesi (saniye)", (), LAG_BUCKETS)
+loop_stalls = registry.counter("event_loop_stalls_total", "Eşiği aşan event loop tıkanmaları", ("route",))
+
+
+def _scope_from_stack(frame) -> Optional[Dict[str, Any]]:
+    """Yığında ASGI scope'u taşıyan en içteki çerçeveyi bulur (middleware/route çerçeveleri)"""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            return scope
+        frame = frame.f_back
+    return None
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        route_templates: Optional[Callable[[Dict[str, Any]], str]] = None,
+        interval: float = 0.1,
+        threshold_ms: float = 200,
+        max_incidents: int = 100,
+    ):
+        self.route_templates = route_templates
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self.incidents: Deque[Dict[str, Any]] = deque(maxlen=max_incidents)
+        self.max_lag = 0.0
+        self._heartbeat = time.monotonic()
+        self._captured: Optional[Dict[str, Any]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.ensure_future(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._heartbeat = now
+            loop_lag.observe((), lag)
+            self.max_lag = max(self.max_lag, lag)
+            captured, self._captured = self._captured, None
+            if captured is not None:
+                # Gözcünün tıkanma sırasında yakaladığı kayda gerçek süreyi ekle
+                captured["lagMs"] = round(lag * 1000, 1)
+            elif lag >= self.threshold:
+                # Gözcü uyanamadan biten kısa tıkanma: yığın yok, yalnızca süre
+                self._record(lag, None)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled >= self.threshold and self._captured is None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                self._captured = self._record(stalled, frame)
+
+    def _record(self, lag: float, frame) -> Dict[str, Any]:
+        scope = _scope_from_stack(frame) if frame is not None else None
+        route = None
+        if scope is not None:
+            route = self.route_templates(scope) if self.route_templates else scope.get("path")
+        stack: List[str] = []
+        if frame is not None:
+            stack = [
+                f"{summary.filename}:{summary.lineno} {summary.name}"
+                for summary in traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)
+            ]
+        incident = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "lagMs": round(lag * 1000, 1),
+            "method": scope.get("method") if scope else None,
+            "path": scope.get("path") if scope else None,
+            "route": route,
+            "stack": stack,
+        }
+        self.incidents.append(incident)
+        loop_stalls.inc((route or "unknown",))
+        return incident
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        return {
+            "intervalMs": self.interval * 1000,
+            "thresholdMs": self.threshold * 1000,
+            "maxLagMs": round(self.max_lag * 1000, 1),
+            "incidents": list(self.incidents)[-limit:][::-1],
+        }
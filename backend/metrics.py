@@ -0,0 +1,228 @@
+"""
+Süreç içi metrik kaydı ve Prometheus metin formatında dışa aktarım.
+
+    http_requests_total{method, route, status}
+    http_request_duration_seconds{method, route}      (histogram)
+    http_response_size_bytes{method, route}           (histogram)
+    mongodb_command_duration_seconds{collection, command}  (histogram)
+    mongodb_command_failures_total{collection, command}
+
+`route` etiketi istek yolunun kendisi değil route şablonudur (/api/inspections/{inspection_id});
+eşleşmeyen istekler tek bir 'unmatched' etiketinde toplanır. Mongo komutları pymongo
+command monitoring ile ölçülür; listener motor'un thread havuzundan çağrıldığı için
+kayıt işlemleri kilit ile korunur.
+"""
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_float(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_float(value)}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # etiketler -> [kova sayaçları..., +Inf], toplam
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_float(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_float(state[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, labels: Labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter("http_requests_total", "HTTP istek sayısı", ("method", "route", "status"))
+http_latency = registry.histogram("http_request_duration_seconds", "HTTP istek süresi (saniye)", ("method", "route"))
+http_response_size = registry.histogram("http_response_size_bytes", "HTTP yanıt gövdesi boyutu (byte)", ("method", "route"), SIZE_BUCKETS)
+mongo_latency = registry.histogram("mongodb_command_duration_seconds", "MongoDB komut süresi (saniye)", ("collection", "command"))
+mongo_failures = registry.counter("mongodb_command_failures_total", "Başarısız MongoDB komut sayısı", ("collection", "command"))
+
+
+def command_collection(command_name: str, command) -> str:
+    """{'find': 'users'} -> 'users'; getMore için 'collection' alanı kullanılır"""
+    target = command.get(command_name)
+    if isinstance(target, str):
+        return target
+    return str(command.get("collection") or "")
+
+
+# Bağlantı/handshake komutları uygulama sorgusu sayılmaz
+IGNORED_COMMANDS = frozenset({"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildinfo", "buildInfo"})
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Komut başlangıcında koleksiyon adını saklar, bitişte süreyi histogram'a yazar"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, int], Labels] = {}
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        self._pending[(event.request_id, event.operation_id)] = (command_collection(event.command_name, event.command), event.command_name)
+
+    def succeeded(self, event):
+        labels = self._pending.pop((event.request_id, event.operation_id), None)
+        if labels is not None:
+            mongo_latency.observe(labels, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        labels = self._pending.pop((event.request_id, event.operation_id), None)
+        if labels is not None:
+            mongo_latency.observe(labels, event.duration_micros / 1e6)
+            mongo_failures.inc(labels)
+
+
+class RouteTemplates:
+    """
+    scope -> route şablonu. Router eşleşen endpoint'i scope'a yazar; şablon tablosu
+    ilk istekte (tüm route'lar eklendikten sonra) bir kez kurulur.
+    """
+
+    def __init__(self, loader: Callable[[], Dict[Any, str]]):
+        self._loader = loader
+        self._templates: Optional[Dict[Any, str]] = None
+
+    def __call__(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._templates is None:
+            self._templates = self._loader()
+        return self._templates.get(endpoint, "unmatched")
+
+
+class MetricsMiddleware:
+    """Saf ASGI middleware: yanıt başlığından durum kodunu, gövde parçalarından boyutu okur"""
+
+    def __init__(self, app, route_templates: RouteTemplates):
+        self.app = app
+        self.route_template = route_templates
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self.route_template(scope)
+            method = scope["method"]
+            http_requests.inc((method, route, str(status)))
+            http_latency.observe((method, route), time.perf_counter() - start)
+            http_response_size.observe((method, route), size)
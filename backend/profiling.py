@@ -0,0 +1,309 @@
+"""
+Canlı süreç için isteğe bağlı CPU ve bellek profili.
+
+- CPU örnekleme: ayrı bir thread belirli aralıklarla tüm thread'lerin yığınını
+  (`sys._current_frames`) okur; sonuç collapsed-stack (flamegraph) ya da en sık görülen
+  fonksiyonlar olarak döner. Süreç durdurulmaz, yeniden deploy gerekmez.
+- İşaretli istek: tek kullanımlık bir anahtar üretilir; `X-Profile-Token` başlığı bu anahtarı
+  taşıyan ilk istek cProfile altında çalıştırılır ve pstats olarak saklanır.
+- Bellek: tracemalloc oturumu açılır; snapshot'lar alınıp karşılaştırılır, oturum boyunca
+  istek başına net bellek değişimi route bazında toplanır.
+
+Aynı anda yalnızca bir oturum çalışabilir; her oturumun üst süre sınırı vardır ve sınır
+dolduğunda oturum kendiliğinden kapanır.
+"""
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import secrets
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+CPU = "cpu"
+REQUEST = "request"
+MEMORY = "memory"
+
+MAX_SNAPSHOTS = 5
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class ProfilerError(Exception):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(stop: threading.Event, interval: float, stacks: Counter):
+    """`stop` set edilene kadar diğer tüm thread'lerin yığınını sayar (kökten yaprağa, ';' ile)"""
+    own = threading.get_ident()
+    while not stop.wait(interval):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, str(thread_id)))
+            stacks[";".join(reversed(labels))] += 1
+
+
+def top_functions(stacks: Counter, limit: int = 50) -> List[Dict[str, Any]]:
+    """Örnek sayılarından fonksiyon bazında öz (yaprak) ve toplam sayılar"""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for label in set(frames):
+            total[label] += count
+    samples = sum(stacks.values()) or 1
+    return [
+        {"function": label, "self": own[label], "total": total[label], "selfPercent": round(own[label] / samples * 100, 2)}
+        for label, _ in own.most_common(limit)
+    ]
+
+
+class Profiler:
+    def __init__(self, max_cpu_seconds: float = 60, max_request_wait: float = 300, max_memory_seconds: float = 600):
+        self.max_cpu_seconds = max_cpu_seconds
+        self.max_request_wait = max_request_wait
+        self.max_memory_seconds = max_memory_seconds
+        self.active: Optional[Dict[str, Any]] = None
+        self._expiry: Optional[asyncio.TimerHandle] = None
+        # işaretli istek
+        self.request_token: Optional[str] = None
+        self.request_result: Optional[Dict[str, Any]] = None
+        # bellek oturumu
+        self.snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self.route_memory: Dict[str, Dict[str, float]] = defaultdict(lambda: {"requests": 0, "netBytes": 0, "maxBytes": 0})
+
+    # ---------- oturum ----------
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": dict(self.active) if self.active else None,
+            "snapshots": list(self.snapshots),
+            "lastRequestProfile": {k: v for k, v in self.request_result.items() if k != "stats"} if self.request_result else None,
+        }
+
+    def _acquire(self, kind: str, max_seconds: float, **info) -> Dict[str, Any]:
+        if self.active is not None:
+            raise ProfilerBusy(self.active["kind"])
+        now = datetime.now(timezone.utc)
+        self.active = {"kind": kind, "startedAt": now.isoformat(), "maxSeconds": max_seconds, **info}
+        self._expiry = asyncio.get_running_loop().call_later(max_seconds, self._expire, kind)
+        return self.active
+
+    def _release(self, kind: str):
+        if self.active is not None and self.active["kind"] == kind:
+            self.active = None
+            if self._expiry is not None:
+                self._expiry.cancel()
+                self._expiry = None
+
+    def _expire(self, kind: str):
+        """Üst süre sınırı: oturum kullanıcı kapatmasa da sonlanır"""
+        self._expiry = None
+        if kind == REQUEST:
+            self.request_token = None
+        elif kind == MEMORY and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self.active is not None and self.active["kind"] == kind:
+            self.active = None
+
+    # ---------- CPU örnekleme ----------
+
+    async def sample_cpu(self, seconds: float, interval: float = 0.005) -> Counter:
+        if not 0 < seconds <= self.max_cpu_seconds:
+            raise ProfilerError(f"Süre 0 ile {self.max_cpu_seconds:g} saniye arasında olmalı")
+        interval = min(max(interval, 0.001), 0.1)
+        self._acquire(CPU, seconds + 5, seconds=seconds, intervalMs=interval * 1000)
+        stacks: Counter = Counter()
+        stop = threading.Event()
+        sampler = threading.Thread(target=sample_stacks, args=(stop, interval, stacks), name="cpu-profiler", daemon=True)
+        try:
+            sampler.start()
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join, 1)
+            self._release(CPU)
+        return stacks
+
+    # ---------- işaretli istek (cProfile) ----------
+
+    def arm_request(self, seconds: float) -> Dict[str, Any]:
+        if not 0 < seconds <= self.max_request_wait:
+            raise ProfilerError(f"Bekleme süresi 0 ile {self.max_request_wait:g} saniye arasında olmalı")
+        # Başka bir oturum sürerken mevcut anahtar ve son sonuç bozulmamalı
+        self._acquire(REQUEST, seconds)
+        self.request_token = secrets.token_urlsafe(16)
+        self.request_result = None
+        return {"token": self.request_token, "header": "X-Profile-Token", "expiresIn": seconds}
+
+    def take_request_token(self, token: Optional[str]) -> bool:
+        """Başlıktaki anahtar eşleşirse anahtarı tüketir (yalnızca tek istek profillenir)"""
+        if not token or self.request_token is None or not secrets.compare_digest(token, self.request_token):
+            return False
+        self.request_token = None
+        return True
+
+    def finish_request(self, profile: cProfile.Profile, method: str, path: str, status: Optional[int], seconds: float):
+        self.request_result = {
+            "method": method,
+            "path": path,
+            "status": status,
+            "durationMs": round(seconds * 1000, 1),
+            "at": datetime.now(timezone.utc).isoformat(),
+            "stats": pstats.Stats(profile),
+        }
+        self._release(REQUEST)
+
+    def request_stats_text(self, sort: str = "cumulative", limit: int = 60) -> str:
+        if not self.request_result:
+            raise ProfilerError("Profillenmiş istek yok")
+        out = io.StringIO()
+        stats = self.request_result["stats"]
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def request_stats_dump(self) -> bytes:
+        """snakeviz / `python -m pstats` ile açılabilen ikili pstats dosyası"""
+        if not self.request_result:
+            raise ProfilerError("Profillenmiş istek yok")
+        fd, path = tempfile.mkstemp(suffix=".prof")
+        os.close(fd)
+        try:
+            self.request_result["stats"].dump_stats(path)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.unlink(path)
+
+    # ---------- bellek (tracemalloc) ----------
+
+    def memory_start(self, seconds: float, frames: int = 10) -> Dict[str, Any]:
+        if not 0 < seconds <= self.max_memory_seconds:
+            raise ProfilerError(f"Süre 0 ile {self.max_memory_seconds:g} saniye arasında olmalı")
+        session = self._acquire(MEMORY, seconds, frames=frames)
+        self.snapshots.clear()
+        self.route_memory.clear()
+        tracemalloc.start(min(max(frames, 1), 50))
+        return session
+
+    def memory_stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._release(MEMORY)
+
+    def memory_snapshot(self) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            raise ProfilerError("Bellek oturumu açık değil")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        snapshot_id = datetime.now(timezone.utc).strftime("%H%M%S%f")
+        self.snapshots[snapshot_id] = snapshot
+        while len(self.snapshots) > MAX_SNAPSHOTS:
+            self.snapshots.pop(next(iter(self.snapshots)))
+        current, peak = tracemalloc.get_traced_memory()
+        return {"id": snapshot_id, "currentBytes": current, "peakBytes": peak, "top": self._top(snapshot.statistics("lineno"), 20)}
+
+    def memory_diff(self, from_id: str, to_id: Optional[str] = None, limit: int = 30, group_by: str = "lineno") -> Dict[str, Any]:
+        if from_id not in self.snapshots or (to_id and to_id not in self.snapshots):
+            raise ProfilerError("Snapshot bulunamadı")
+        to_id = to_id or list(self.snapshots)[-1]
+        stats = self.snapshots[to_id].compare_to(self.snapshots[from_id], group_by)
+        return {"from": from_id, "to": to_id, "top": self._top(stats, limit)}
+
+    def memory_by_route(self) -> List[Dict[str, Any]]:
+        rows = [{"route": route, **values} for route, values in self.route_memory.items()]
+        return sorted(rows, key=lambda row: -row["netBytes"])
+
+    def record_route_memory(self, route: str, delta: int):
+        entry = self.route_memory[route]
+        entry["requests"] += 1
+        entry["netBytes"] += delta
+        entry["maxBytes"] = max(entry["maxBytes"], delta)
+
+    @staticmethod
+    def _top(stats, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            row = {"site": f"{frame.filename}:{frame.lineno}", "sizeBytes": stat.size, "count": stat.count}
+            if hasattr(stat, "size_diff"):
+                row.update(sizeDiffBytes=stat.size_diff, countDiff=stat.count_diff)
+            rows.append(row)
+        return rows
+
+
+class ProfilingMiddleware:
+    """
+    Saf ASGI middleware. Normalde yalnızca iki öznitelik kontrolü yapar; işaretli istek
+    cProfile altında çalıştırılır (istek await ederken loop'ta çalışan diğer görevler de
+    profile girer), bellek oturumu açıksa istek başına net bellek değişimi
+    route bazında toplanır (eşzamanlı isteklerin ayrımı yaklaşık değerdir).
+    """
+
+    def __init__(self, app, profiler: Profiler, route_templates: Callable[[Dict[str, Any]], str]):
+        self.app = app
+        self.profiler = profiler
+        self.route_template = route_templates
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.profiler.request_token is not None:
+            token = dict(scope.get("headers") or []).get(b"x-profile-token")
+            if self.profiler.take_request_token(token.decode() if token else None):
+                await self._profile_request(scope, receive, send)
+                return
+        if tracemalloc.is_tracing():
+            before = tracemalloc.get_traced_memory()[0]
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if tracemalloc.is_tracing():
+                    self.profiler.record_route_memory(self.route_template(scope), tracemalloc.get_traced_memory()[0] - before)
+            return
+        await self.app(scope, receive, send)
+
+    async def _profile_request(self, scope, receive, send):
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.disable()
+            self.profiler.finish_request(profile, scope["method"], scope["path"], status, time.perf_counter() - start)
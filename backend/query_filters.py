@@ -0,0 +1,103 @@
+"""
+Liste uçları için doğrulanmış filtre/sıralama dili.
+
+    ?ilce=Kadıköy                    eşitlik
+    ?ilce=Kadıköy,Üsküdar            $in
+    ?denetimTarihiFrom=2025-01-01    tarih aralığı (YYYY-MM-DD string alanlar)
+    ?denetimTarihiTo=2025-01-31
+    ?sort=-denetimTarihi             izinli alanlarda sıralama ('-' azalan)
+
+Derlenen sorgu yalnızca tanımlı index'lerden biriyle (Eşitlik -> Sıralama -> Aralık
+sırasında) karşılanabiliyorsa kabul edilir; aksi halde ValueError fırlatılır. Sıralama
+verilmediğinde varsayılan sıralama kullanılır, başka bir alana geçilmez (örn. ?ilce=... için
+sort=-denetimTarihi açıkça verilmelidir).
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+MAX_IN_VALUES = 50
+
+
+class ListQuerySpec:
+    def __init__(
+        self,
+        eq_fields: Sequence[str],
+        range_fields: Sequence[str],
+        sort_fields: Sequence[str],
+        indexes: Sequence[Sequence[str]],
+        default_sort: Tuple[str, int],
+    ):
+        self.eq_fields = tuple(eq_fields)
+        self.range_fields = tuple(range_fields)
+        self.sort_fields = tuple(sort_fields)
+        self.indexes = [tuple(ix) for ix in indexes]
+        self.default_sort = default_sort
+
+    @property
+    def param_names(self) -> Tuple[str, ...]:
+        """Sorgu dizesinden okunan filtre parametreleri (eşitlik alanları + aralık From/To)"""
+        return self.eq_fields + tuple(f"{field}{suffix}" for field in self.range_fields for suffix in ("From", "To"))
+
+    def _parse_sort(self, sort: str) -> Tuple[str, int]:
+        direction = -1 if sort.startswith("-") else 1
+        field = sort.lstrip("+-")
+        if field not in self.sort_fields:
+            raise ValueError(f"Sıralama alanı desteklenmiyor: {field}")
+        return field, direction
+
+    def _index_backed(self, eq: Sequence[str], sort_field: Optional[str], range_field: Optional[str]) -> bool:
+        rest = []
+        if sort_field:
+            rest.append(sort_field)
+        if range_field and range_field != sort_field:
+            rest.append(range_field)
+        eq_set = set(eq)
+        for ix in self.indexes:
+            n = len(eq_set)
+            if set(ix[:n]) != eq_set:
+                continue
+            if list(ix[n:n + len(rest)]) == rest:
+                return True
+        return False
+
+    def compile(self, params: Dict[str, Optional[str]], sort: Optional[str] = None) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+        query: Dict[str, Any] = {}
+        for field in self.eq_fields:
+            value = params.get(field)
+            if value is None or value == "":
+                continue
+            values = [v.strip() for v in value.split(",") if v.strip()]
+            if len(values) > MAX_IN_VALUES:
+                raise ValueError(f"{field} için en fazla {MAX_IN_VALUES} değer verilebilir")
+            query[field] = values[0] if len(values) == 1 else {"$in": values}
+
+        range_field = None
+        for field in self.range_fields:
+            bounds = {}
+            for suffix, op in (("From", "$gte"), ("To", "$lte")):
+                value = params.get(f"{field}{suffix}")
+                if value is None or value == "":
+                    continue
+                if not DATE_RE.match(value):
+                    raise ValueError(f"{field}{suffix} YYYY-MM-DD formatında olmalı")
+                bounds[op] = value
+            if bounds:
+                if range_field:
+                    raise ValueError("Aynı anda tek bir tarih aralığı filtrelenebilir")
+                range_field = field
+                query[field] = bounds
+
+        eq = [f for f in self.eq_fields if f in query]
+        sort_field, direction = self._parse_sort(sort) if sort else self.default_sort
+        if self._index_backed(eq, sort_field, range_field):
+            return query, [(sort_field, direction)]
+        # Sıralama sessizce değiştirilmez; varsayılan sıralama desteklenmiyorsa istemci açıkça seçmelidir
+        alternatives = [f for f in self.sort_fields if f != sort_field and self._index_backed(eq, f, range_field)]
+        if not sort and alternatives:
+            sign = "-" if direction < 0 else ""
+            raise ValueError(
+                f"Bu filtrelerle varsayılan sıralama ({sort_field}) index ile desteklenmiyor; "
+                f"sort={sign}{alternatives[0]} verilmeli"
+            )
+        raise ValueError("Bu filtre/sıralama kombinasyonu index ile desteklenmiyor")
@@ -0,0 +1,64 @@
+"""
+Küçük referans koleksiyonları (firmalar) için süreç içi önbellek.
+
+Başlangıçta tamamen yüklenir (lifespan), repository yazma hook'larıyla güncel tutulur ve
+diğer worker'lardaki yazmalar için periyodik olarak yeniden yüklenir. Yüklenmeden önce
+`loaded` False'tur; çağıranlar bu durumda doğrudan veritabanına gider.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from repository import Repository
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceCache:
+    def __init__(self, repo: Repository, projection: Optional[Dict[str, int]] = None):
+        self.repo = repo
+        self.projection = projection
+        self.loaded = False
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._ordered: Optional[List[Dict[str, Any]]] = None
+        self._excluded = tuple(k for k, v in (projection or {}).items() if not v)
+        repo.add_hook(self._hook)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    async def load(self):
+        docs = await self.repo.list(limit=0, projection=self.projection)
+        self._docs = {doc["id"]: doc for doc in docs if doc.get("id")}
+        self._ordered = None
+        self.loaded = True
+        logger.info(f"{self.repo.name} önbelleği yüklendi: {len(self._docs)} kayıt")
+
+    def get(self, id: str) -> Optional[Dict[str, Any]]:
+        doc = self._docs.get(id)
+        return dict(doc) if doc is not None else None
+
+    def put(self, doc: Dict[str, Any]):
+        """Önbellekte bulunmayıp veritabanından okunan kaydı ekler"""
+        if self.loaded and doc.get("id"):
+            self._docs[doc["id"]] = {k: v for k, v in doc.items() if k not in self._excluded}
+            self._ordered = None
+
+    def values(self, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """Repository'nin varsayılan sıralamasıyla kayıtlar"""
+        if self._ordered is None:
+            ordered = list(self._docs.values())
+            # Çok alanlı sıralama: sondaki alandan başlayarak kararlı sıralama; boş alanlar Mongo'daki gibi en küçük
+            for field, direction in reversed(self.repo.default_sort or []):
+                ordered.sort(key=lambda d: (d.get(field) is not None, d.get(field) if d.get(field) is not None else ""), reverse=direction < 0)
+            self._ordered = ordered
+        return [dict(doc) for doc in self._ordered if predicate is None or predicate(doc)]
+
+    async def _hook(self, action: str, id: str, doc: Optional[Dict[str, Any]]):
+        if not self.loaded:
+            return
+        if action == "delete":
+            self._docs.pop(id, None)
+        elif doc is not None:
+            decoded = self.repo.decode({k: v for k, v in doc.items() if k != "_id" and k not in self._excluded})
+            self._docs[id] = decoded
+        self._ordered = None
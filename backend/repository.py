@@ -0,0 +1,151 @@
+"""
+Koleksiyon bazlı async repository katmanı.
+
+Handler'larda tekrar eden find_one -> update_one -> find_one dizisini tek bir atomik
+find_one_and_update çağrısına indirir; projection varsayılanları ile ISO string <-> datetime
+dönüşümü tek yerde yapılır.
+"""
+import logging
+import typing
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+# hook(action, id, doc): action 'upsert' veya 'delete'; delete için doc None
+WriteHook = Callable[[str, str, Optional[Dict[str, Any]]], Awaitable[None]]
+
+DEFAULT_PROJECTION = {"_id": 0}
+
+
+def _datetime_fields(model: Type[BaseModel]) -> Tuple[str, ...]:
+    fields = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if annotation is datetime or datetime in typing.get_args(annotation):
+            fields.append(name)
+    return tuple(fields)
+
+
+class Repository(Generic[T]):
+    def __init__(
+        self,
+        collection,
+        model: Type[T],
+        default_sort: Optional[Sequence[Tuple[str, int]]] = None,
+        date_mirrors: Sequence[str] = (),
+    ):
+        self.collection = collection
+        self.model = model
+        self.default_sort = list(default_sort) if default_sort else None
+        self.datetime_fields = _datetime_fields(model)
+        # Bu alanlar ISO string'e ek olarak `<alan>Date` adıyla gerçek tarih tipinde de yazılır (TTL index vb. için)
+        self.date_mirrors = tuple(date_mirrors)
+        self.hooks: List[WriteHook] = []
+
+    def add_hook(self, hook: WriteHook):
+        """Başarılı her yazmadan sonra çağrılır (arama indeksi vb. türetilmiş veriler için)"""
+        self.hooks.append(hook)
+
+    async def _notify(self, action: str, id: str, doc: Optional[Dict[str, Any]]):
+        for hook in self.hooks:
+            try:
+                await hook(action, id, doc)
+            except Exception as e:
+                logger.warning(f"{self.name} yazma hook'u başarısız ({action} {id}): {e}")
+
+    @property
+    def name(self) -> str:
+        return self.collection.name
+
+    def decode(self, doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Mongo'da ISO string olarak saklanan tarih alanlarını datetime'a çevirir"""
+        if doc is None:
+            return None
+        for field in self.datetime_fields:
+            value = doc.get(field)
+            if value and isinstance(value, str):
+                doc[field] = datetime.fromisoformat(value)
+        return doc
+
+    def encode(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        for field in self.date_mirrors:
+            value = doc.get(field)
+            if isinstance(value, datetime):
+                doc[f"{field}Date"] = value
+        for field in self.datetime_fields:
+            value = doc.get(field)
+            if isinstance(value, datetime):
+                doc[field] = value.isoformat()
+        return doc
+
+    async def insert(self, obj: T) -> T:
+        doc = self.encode(obj.model_dump())
+        await self.collection.insert_one(doc)
+        doc.pop("_id", None)
+        await self._notify("upsert", doc.get("id"), doc)
+        return obj
+
+    async def get(self, id: str, projection: Optional[Dict[str, int]] = None) -> Optional[T]:
+        doc = await self.find_one({"id": id}, projection)
+        return self.model(**doc) if doc else None
+
+    async def find_one(self, query: Dict[str, Any], projection: Optional[Dict[str, int]] = None, sort=None) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one(query, projection or DEFAULT_PROJECTION, sort=sort)
+        return self.decode(doc)
+
+    async def list(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        sort: Optional[Sequence[Tuple[str, int]]] = None,
+        limit: int = 1000,
+        projection: Optional[Dict[str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        cursor = self.collection.find(query or {}, projection or DEFAULT_PROJECTION)
+        sort = sort or self.default_sort
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if limit:
+            cursor = cursor.limit(limit)
+        docs = await cursor.to_list(limit or None)
+        return [self.decode(doc) for doc in docs]
+
+    async def stream(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        sort: Optional[Sequence[Tuple[str, int]]] = None,
+        projection: Optional[Dict[str, int]] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Cursor'ı batch'ler halinde okuyarak dokümanları tek tek üretir (sabit bellek)"""
+        cursor = self.collection.find(query or {}, projection or DEFAULT_PROJECTION).batch_size(batch_size)
+        sort = sort or self.default_sort
+        if sort:
+            cursor = cursor.sort(list(sort))
+        async for doc in cursor:
+            yield self.decode(doc)
+
+    async def update(self, id: str, update_data: Dict[str, Any]) -> Optional[T]:
+        """Tek round trip: $set uygular ve güncel dokümanı döner; kayıt yoksa None"""
+        doc = await self.collection.find_one_and_update(
+            {"id": id},
+            {"$set": self.encode(dict(update_data))},
+            projection=DEFAULT_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return None
+        await self._notify("upsert", id, doc)
+        return self.model(**self.decode(doc))
+
+    async def delete(self, id: str) -> bool:
+        result = await self.collection.delete_one({"id": id})
+        if result.deleted_count == 0:
+            return False
+        await self._notify("delete", id, None)
+        return True
@@ -0,0 +1,172 @@
+"""
+Analitik için önceden toplanmış (rollup) sayaçlar.
+
+Her rollup bir kaynak kaydı (grup, dönem) kovasına eşler, örn. denetimler -> (ilçe, ay).
+Sayaçlar repository yazma hook'ları ile artımlı güncellenir; böylece zaman serisi
+sorguları ham koleksiyonları taramadan yalnızca kova sayısı kadar doküman okur.
+
+Güncellenebilen/silinebilen kaynaklar için her kaydın hangi kovaya sayıldığı
+`rollup_contributions` koleksiyonunda tutulur; kayıt değiştiğinde eski kova azaltılıp
+yenisi artırılır. Yalnızca eklenen kaynaklar (aktivite kayıtları) için bu tutulmaz.
+"""
+from collections import defaultdict
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple
+
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+
+GRANULARITY_LENGTH = {"month": 7, "day": 10}
+REBUILD_BATCH_SIZE = 1000
+MAX_SERIES_BUCKETS = 20000
+
+Key = Tuple[str, str]  # (grup, dönem)
+
+
+class Rollup:
+    def __init__(self, name: str, entity: str, group_field: str, period_field: str, granularity: str = "month", track: bool = True):
+        self.name = name
+        self.entity = entity
+        self.group_field = group_field
+        self.period_field = period_field
+        self.granularity = granularity
+        self.period_length = GRANULARITY_LENGTH[granularity]
+        self.track = track
+
+    def key(self, doc: Optional[Dict[str, Any]]) -> Optional[Key]:
+        if not doc:
+            return None
+        group = doc.get(self.group_field)
+        period = str(doc.get(self.period_field) or "")[:self.period_length]
+        if not group or len(period) < self.period_length:
+            return None
+        return str(group), period
+
+
+class RollupStore:
+    def __init__(self, db, rollups: List[Rollup]):
+        self.collection = db.rollups
+        self.contributions = db.rollup_contributions
+        self.rollups = {r.name: r for r in rollups}
+        self.by_entity: Dict[str, List[Rollup]] = defaultdict(list)
+        for rollup in rollups:
+            self.by_entity[rollup.entity].append(rollup)
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("rollup", 1), ("group", 1), ("period", 1)], unique=True)
+        await self.collection.create_index([("rollup", 1), ("period", 1)])
+        await self.contributions.create_index([("rollup", 1), ("refId", 1)], unique=True)
+
+    def hook(self, entity: str):
+        async def hook(action: str, id: str, doc: Optional[Dict[str, Any]]):
+            await self.apply(entity, action, id, doc)
+        return hook
+
+    @staticmethod
+    def _inc(rollup: Rollup, key: Key, amount: int) -> UpdateOne:
+        group, period = key
+        return UpdateOne(
+            {"rollup": rollup.name, "group": group, "period": period},
+            {"$inc": {"count": amount}},
+            upsert=True,
+        )
+
+    async def _swap_contribution(self, rollup: Rollup, ref_id: str, new: Optional[Key]) -> Optional[Key]:
+        """
+        Kaydın yeni kovasını yazar ve önceki kovayı aynı atomik işlemde okur; aynı kayda eşzamanlı
+        iki yazma her zaman birbirinin bıraktığı kovadan devam eder, sayaçlar kaymaz.
+        """
+        query = {"rollup": rollup.name, "refId": ref_id}
+        if new:
+            previous = await self.contributions.find_one_and_update(
+                query, {"$set": {"key": list(new)}},
+                projection={"_id": 0, "key": 1}, upsert=True, return_document=ReturnDocument.BEFORE,
+            )
+        else:
+            previous = await self.contributions.find_one_and_delete(query, projection={"_id": 0, "key": 1})
+        return tuple(previous["key"]) if previous else None
+
+    async def apply(self, entity: str, action: str, ref_id: str, doc: Optional[Dict[str, Any]]):
+        """Rollup başına bir findAndModify (izlenen kaynaklar) ve tüm sayaçlar için tek bulk_write"""
+        ops: List[UpdateOne] = []
+        for rollup in self.by_entity.get(entity, []):
+            new = rollup.key(doc) if action != "delete" else None
+            old = None
+            if rollup.track:
+                old = await self._swap_contribution(rollup, ref_id, new)
+            elif action == "delete":
+                # Yalnızca eklenen kaynaklarda silme (TTL, arşiv) geçmiş sayaçları değiştirmez
+                continue
+            if old == new:
+                continue
+            if old:
+                ops.append(self._inc(rollup, old, -1))
+            if new:
+                ops.append(self._inc(rollup, new, 1))
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+
+    async def series(self, name: str, start: Optional[str] = None, end: Optional[str] = None, group: Optional[str] = None) -> Dict[str, Any]:
+        rollup = self.rollups[name]
+        query: Dict[str, Any] = {"rollup": name, "count": {"$gt": 0}}
+        period: Dict[str, str] = {}
+        if start:
+            period["$gte"] = start[:rollup.period_length]
+        if end:
+            period["$lte"] = end[:rollup.period_length]
+        if period:
+            query["period"] = period
+        if group:
+            query["group"] = group
+        docs = await self.collection.find(query, {"_id": 0, "group": 1, "period": 1, "count": 1}).sort("period", 1).to_list(MAX_SERIES_BUCKETS)
+        series: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        totals: Dict[str, int] = defaultdict(int)
+        for doc in docs:
+            series[doc["group"]].append({"period": doc["period"], "count": doc["count"]})
+            totals[doc["group"]] += doc["count"]
+        return {
+            "rollup": name,
+            "groupField": rollup.group_field,
+            "granularity": rollup.granularity,
+            "series": dict(series),
+            "totals": dict(totals),
+            "truncated": len(docs) >= MAX_SERIES_BUCKETS,
+        }
+
+    async def rebuild(self, name: str, sources: List[AsyncIterable[Dict[str, Any]]]) -> Dict[str, int]:
+        """
+        Rollup'ı kaynaklardan baştan hesaplar (bakım/ilk kurulum). Sayaçlar bellekte kova
+        bazında toplanır; kaynak kayıt sayısından bağımsız olarak yalnızca kova sayısı kadar tutulur.
+        Yazmaların az olduğu bir zamanda çalıştırılmalıdır.
+        """
+        rollup = self.rollups[name]
+        counts: Dict[Key, int] = defaultdict(int)
+        contributions: List[Any] = []
+        if rollup.track:
+            await self.contributions.delete_many({"rollup": name})
+        scanned = 0
+        for source in sources:
+            async for doc in source:
+                scanned += 1
+                key = rollup.key(doc)
+                if key is None:
+                    continue
+                counts[key] += 1
+                if rollup.track and doc.get("id"):
+                    contributions.append(ReplaceOne(
+                        {"rollup": name, "refId": doc["id"]},
+                        {"rollup": name, "refId": doc["id"], "key": list(key)},
+                        upsert=True,
+                    ))
+                    if len(contributions) >= REBUILD_BATCH_SIZE:
+                        await self.contributions.bulk_write(contributions, ordered=False)
+                        contributions = []
+        if contributions:
+            await self.contributions.bulk_write(contributions, ordered=False)
+
+        await self.collection.delete_many({"rollup": name})
+        ops = [
+            UpdateOne({"rollup": name, "group": group, "period": period}, {"$set": {"count": count}}, upsert=True)
+            for (group, period), count in counts.items()
+        ]
+        for i in range(0, len(ops), REBUILD_BATCH_SIZE):
+            await self.collection.bulk_write(ops[i:i + REBUILD_BATCH_SIZE], ordered=False)
+        return {"scanned": scanned, "buckets": len(counts)}
@@ -0,0 +1,134 @@
+"""
+Kayıtlar arası genel arama için Mongo üzerinde tutulan ters indeks (inverted index).
+
+Her kayıt için `search_index` koleksiyonunda tek bir doküman tutulur; `tokens` alanı
+Türkçe katlanmış kelime öneklerini içerir ve multikey index ile sorgulanır, böylece
+arama hiçbir zaman kaynak koleksiyonları taramaz.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReplaceOne
+
+from autocomplete import tokenize
+
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 15
+MAX_QUERY_TOKENS = 8
+
+# entity -> (başlık alanı, alt başlık alanı, indekslenen alanlar)
+ENTITY_FIELDS = {
+    "inspections": ("insaatIsmi", "kontrolEdilenBolum", ("insaatIsmi", "yibfNo", "ilce", "blokNo", "kontrolEdilenBolum", "betonDokulenBolum", "betonFirma", "laboratuvarFirma", "teslimAlinmamaAciklamasi")),
+    "payments": ("insaatIsmi", "hakedisNo", ("insaatIsmi", "yibfNo", "hakedisNo", "hakedisTipi", "belediye", "eksik", "adaParsel")),
+    "licenses": ("insaatIsmi", "yibfNo", ("insaatIsmi", "yibfNo", "notlar")),
+    "workplans": ("baslik", "planTarihi", ("baslik", "aciklama")),
+    "mesajlar": ("projeAdi", "gonderenAdi", ("projeAdi", "mesaj", "gonderenAdi", "aliciAdi")),
+}
+
+
+def index_tokens(values: List[Any]) -> List[str]:
+    tokens = set()
+    for value in values:
+        for token in tokenize(str(value) if value is not None else None):
+            token = token[:MAX_TOKEN_LENGTH]
+            for n in range(MIN_TOKEN_LENGTH, len(token) + 1):
+                tokens.add(token[:n])
+            if len(token) < MIN_TOKEN_LENGTH:
+                tokens.add(token)
+    return sorted(tokens)
+
+
+def query_tokens(q: str) -> List[str]:
+    tokens = []
+    for token in tokenize(q):
+        token = token[:MAX_TOKEN_LENGTH]
+        if token not in tokens:
+            tokens.append(token)
+    # En uzun (en seçici) token önce: $all ilk token için index kullanır
+    return sorted(tokens, key=len, reverse=True)[:MAX_QUERY_TOKENS]
+
+
+class SearchIndex:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("tokens", 1), ("entity", 1)])
+        await self.collection.create_index([("entity", 1), ("refId", 1)], unique=True)
+
+    def build(self, entity: str, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        spec = ENTITY_FIELDS.get(entity)
+        if spec is None or not doc.get("id"):
+            return None
+        title_field, subtitle_field, fields = spec
+        return {
+            "entity": entity,
+            "refId": doc["id"],
+            "title": doc.get(title_field),
+            "subtitle": doc.get(subtitle_field),
+            "yibfNo": doc.get("yibfNo"),
+            "ilce": doc.get("ilce"),
+            "tokens": index_tokens([doc.get(f) for f in fields]),
+            "updatedAt": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def upsert(self, entity: str, doc: Dict[str, Any]):
+        entry = self.build(entity, doc)
+        if entry is None:
+            return
+        await self.collection.replace_one({"entity": entity, "refId": entry["refId"]}, entry, upsert=True)
+
+    async def remove(self, entity: str, ref_id: str):
+        await self.collection.delete_one({"entity": entity, "refId": ref_id})
+
+    async def rebuild(self, entity: str, source_collection, batch_size: int = 500) -> int:
+        """
+        Kaynak koleksiyondan indeksi yeniden kurar (ilk kurulum / bakım için). Girdiler yerinde
+        upsert edilir, rebuild sürerken arama sonuçları boşalmaz ve eşzamanlı hook yazmalarıyla
+        çakışmaz; sonunda bu turda yazılmamış (kaynağı silinmiş) eski girdiler temizlenir.
+        """
+        started = datetime.now(timezone.utc).isoformat()
+        count = 0
+        batch = []
+        async for doc in source_collection.find({}, {"_id": 0}):
+            entry = self.build(entity, doc)
+            if entry:
+                batch.append(ReplaceOne({"entity": entity, "refId": entry["refId"]}, entry, upsert=True))
+            if len(batch) >= batch_size:
+                await self.collection.bulk_write(batch, ordered=False)
+                count += len(batch)
+                batch = []
+        if batch:
+            await self.collection.bulk_write(batch, ordered=False)
+            count += len(batch)
+        await self.collection.delete_many({"entity": entity, "updatedAt": {"$lt": started}})
+        return count
+
+    async def search(self, q: str, entities: List[str], page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        tokens = query_tokens(q)
+        if not tokens:
+            return {"query": q, "total": 0, "page": page, "pageSize": page_size, "facets": {}, "results": []}
+        match = {"tokens": {"$all": tokens}, "entity": {"$in": entities}}
+        pipeline = [
+            {"$match": match},
+            {"$facet": {
+                "facets": [{"$group": {"_id": "$entity", "count": {"$sum": 1}}}],
+                "results": [
+                    {"$sort": {"updatedAt": -1}},
+                    {"$skip": (page - 1) * page_size},
+                    {"$limit": page_size},
+                    {"$project": {"_id": 0, "tokens": 0}},
+                ],
+            }},
+        ]
+        out = await self.collection.aggregate(pipeline).to_list(1)
+        out = out[0] if out else {"facets": [], "results": []}
+        facets = {f["_id"]: f["count"] for f in out["facets"]}
+        return {
+            "query": q,
+            "total": sum(facets.values()),
+            "page": page,
+            "pageSize": page_size,
+            "facets": facets,
+            "results": out["results"],
+        }
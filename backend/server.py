@@ -1,19 +1,46 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Header, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
+import re
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, create_model
+from typing import Any, Dict, List, Optional
 import uuid
+import asyncio
+import base64
+import inspect
+import socket
+import typing
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
 import bcrypt
 import jwt
 import pandas as pd
 from io import BytesIO
+from archive import ARCHIVED_COLLECTIONS, Archiver, archive_name, list_tiers
+from autocomplete import ConstructionIndex, construction_index
+from capture import CaptureMiddleware, note_user_role
+from dbstats import DbBudgetMiddleware, RequestDbListener
+from exports import csv_response, xlsx_response
+from jobs import FINISHED_STATUSES, JobContext, JobError, JobQueue
+from looplag import LoopLagMonitor
+from metrics import MetricsMiddleware, MongoCommandMetrics, RouteTemplates, registry as metrics_registry
+from profiling import Profiler, ProfilerBusy, ProfilerError, ProfilingMiddleware, top_functions
+from query_filters import DATE_RE, ListQuerySpec
+from refcache import ReferenceCache
+from rollups import Rollup, RollupStore
+from repository import Repository
+from search import ENTITY_FIELDS, SearchIndex
+from streaming import stream_documents
+from tracing import TraceDbListener, TraceWriter, TracedRoute, TracingMiddleware, traced
+from singleflight import coalesce, group as singleflight_group
 
 # Initialize logging first
 logging.basicConfig(
@@ -27,7 +54,30 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+# Havuz boyutu ve zaman aşımları (varsayılanlar pymongo'nunkiler); istemci tembeldir, bağlantılar lifespan'de açılır
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+    "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+    "maxIdleTimeMS": _optional_int('MONGO_MAX_IDLE_TIME_MS'),
+    "waitQueueTimeoutMS": _optional_int('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+    "connectTimeoutMS": int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '20000')),
+    "socketTimeoutMS": _optional_int('MONGO_SOCKET_TIMEOUT_MS'),
+    "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000')),
+}
+# Başlangıçta eşzamanlı ping ile önceden açılacak bağlantı sayısı
+MONGO_WARM_CONNECTIONS = int(os.environ.get('MONGO_WARM_CONNECTIONS', '10'))
+
+# Komut süreleri /metrics için koleksiyon ve komut bazında, ayrıca istek başına (DB bütçesi, iz) ölçülür
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[MongoCommandMetrics(), RequestDbListener(), TraceDbListener()],
+    **{k: v for k, v in MONGO_POOL_OPTIONS.items() if v is not None},
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -47,8 +97,22 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
 security = HTTPBearer()
 
-app = FastAPI()
-api_router = APIRouter(prefix="/api")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Başlatma/kapatma adımları dosyanın sonundaki BAŞLATMA / KAPATMA bölümündedir"""
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+app = FastAPI(lifespan=lifespan)
+api_router = APIRouter(prefix="/api", route_class=TracedRoute)
+
+# endpoint fonksiyonu -> route şablonu (etiket sayısı route sayısıyla sınırlı kalır)
+route_templates = RouteTemplates(
+    lambda: {route.endpoint: route.path for route in app.routes if getattr(route, "endpoint", None) is not None}
+)
 
 # ==================== MODELS ====================
 
@@ -660,11 +724,202 @@ class Construction(BaseModel):
     importDate: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     createdAt: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# ==================== REPOSITORIES ====================
+
+users_repo = Repository(db.users, User, default_sort=[("createdAt", -1)])
+inspections_repo = Repository(db.site_inspections, SiteInspection, default_sort=[("createdAt", -1)])
+payments_repo = Repository(db.progress_payments, ProgressPayment, default_sort=[("createdAt", -1)])
+workplans_repo = Repository(db.work_plans, WorkPlan, default_sort=[("planTarihi", 1)])
+licenses_repo = Repository(db.license_projects, LicenseProject, default_sort=[("createdAt", -1)])
+super_admin_reports_repo = Repository(db.super_admin_reports, SuperAdminReport, default_sort=[("reportedAt", -1)])
+activities_repo = Repository(db.activity_logs, ActivityLog, default_sort=[("createdAtDate", -1)], date_mirrors=("createdAt",))
+constructions_repo = Repository(db.constructions, Construction, default_sort=[("createdAt", -1)])
+companies_repo = Repository(db.companies, Company, default_sort=[("name", 1)])
+hakedis_evrak_repo = Repository(db.hakedis_evrak, HakedisEvrak, default_sort=[("createdAt", -1)])
+aylik_raporlar_repo = Repository(db.aylik_seviye_raporlari, AylikSeviyeRaporu, default_sort=[("ay", -1)])
+yilsonu_raporlar_repo = Repository(db.yilsonu_seviye_raporlari, YilSonuSeviyeRaporu, default_sort=[("yil", -1)])
+mesajlar_repo = Repository(db.mesajlar, Mesaj, default_sort=[("createdAt", -1)])
+
+# Her istekte okunan küçük referans koleksiyonu; lifespan'de ısıtılır, yazma hook'larıyla güncel kalır.
+# Kullanıcılar önbelleğe alınmaz: kimlik doğrulama silinen/rolü değişen kullanıcıyı hemen görmelidir
+company_cache = ReferenceCache(companies_repo)
+
+# Soğuk katman (arşiv) - yalnızca include_archived=true ile okunur
+inspections_archive_repo = Repository(db[archive_name("site_inspections")], SiteInspection, default_sort=[("createdAt", -1)])
+workplans_archive_repo = Repository(db[archive_name("work_plans")], WorkPlan, default_sort=[("planTarihi", 1)])
+activities_archive_repo = Repository(db[archive_name("activity_logs")], ActivityLog, default_sort=[("createdAtDate", -1)], date_mirrors=("createdAt",))
+mesajlar_archive_repo = Repository(db[archive_name("mesajlar")], Mesaj, default_sort=[("createdAt", -1)])
+
+# ==================== LİSTE FİLTRELERİ ====================
+
+INSPECTION_LIST_QUERY = ListQuerySpec(
+    eq_fields=("ilce", "yibfNo", "teslimAlindi"),
+    range_fields=("denetimTarihi",),
+    sort_fields=("createdAt", "denetimTarihi"),
+    indexes=[
+        ("createdAt",),
+        ("denetimTarihi",),
+        ("yibfNo", "createdAt"),
+        ("yibfNo", "denetimTarihi"),
+        ("ilce", "denetimTarihi"),
+        ("teslimAlindi", "denetimTarihi"),
+        ("ilce", "teslimAlindi", "denetimTarihi"),
+    ],
+    default_sort=("createdAt", -1)
+)
+
+PAYMENT_LIST_QUERY = ListQuerySpec(
+    eq_fields=("yibfNo", "hakedisDurumu", "hakedisTipi"),
+    range_fields=(),
+    sort_fields=("createdAt",),
+    indexes=[
+        ("createdAt",),
+        ("yibfNo", "createdAt"),
+        ("hakedisDurumu", "createdAt"),
+        ("hakedisTipi", "createdAt"),
+    ],
+    default_sort=("createdAt", -1)
+)
+
+WORKPLAN_LIST_QUERY = ListQuerySpec(
+    eq_fields=("durum", "tip", "referansId"),
+    range_fields=("planTarihi",),
+    sort_fields=("planTarihi",),
+    indexes=[
+        ("planTarihi",),
+        ("durum", "planTarihi"),
+        ("tip", "planTarihi"),
+        ("tip", "durum", "planTarihi"),
+        ("referansId", "planTarihi"),
+    ],
+    default_sort=("planTarihi", 1)
+)
+
+LICENSE_LIST_QUERY = ListQuerySpec(
+    eq_fields=("yibfNo",),
+    range_fields=(),
+    sort_fields=("createdAt",),
+    indexes=[
+        ("createdAt",),
+        ("yibfNo", "createdAt"),
+    ],
+    default_sort=("createdAt", -1)
+)
+
+CONSTRUCTION_LIST_QUERY = ListQuerySpec(
+    eq_fields=("ilce", "isinDurumu", "yibfNo"),
+    range_fields=(),
+    sort_fields=("createdAt",),
+    indexes=[
+        ("createdAt",),
+        ("yibfNo", "createdAt"),
+        ("ilce", "createdAt"),
+        ("isinDurumu", "createdAt"),
+        ("ilce", "isinDurumu", "createdAt"),
+    ],
+    default_sort=("createdAt", -1)
+)
+
+LIST_QUERY_SPECS = [
+    (db.site_inspections, INSPECTION_LIST_QUERY),
+    (db.progress_payments, PAYMENT_LIST_QUERY),
+    (db.work_plans, WORKPLAN_LIST_QUERY),
+    (db.license_projects, LICENSE_LIST_QUERY),
+    (db.constructions, CONSTRUCTION_LIST_QUERY),
+]
+
+def compile_list_query(spec: ListQuerySpec, sort: Optional[str] = None, **params):
+    try:
+        return spec.compile(params, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ==================== GENEL ARAMA İNDEKSİ ====================
+
+search_index = SearchIndex(db.search_index)
+
+SEARCH_REPOS = {
+    "inspections": inspections_repo,
+    "payments": payments_repo,
+    "licenses": licenses_repo,
+    "workplans": workplans_repo,
+    "mesajlar": mesajlar_repo,
+}
+
+def _search_hook(entity: str):
+    async def hook(action: str, id: str, doc: Optional[dict]):
+        if action == "delete":
+            await search_index.remove(entity, id)
+        else:
+            await search_index.upsert(entity, doc)
+    return hook
+
+for _entity, _repo in SEARCH_REPOS.items():
+    _repo.add_hook(_search_hook(_entity))
+
+# ==================== ANALİTİK ROLLUP'LARI ====================
+
+ROLLUPS = [
+    Rollup("inspections_by_ilce", "inspections", group_field="ilce", period_field="denetimTarihi", granularity="month"),
+    Rollup("pours_by_beton_firma", "inspections", group_field="betonFirma", period_field="betonDokumTarihi", granularity="month"),
+    Rollup("pours_by_laboratuvar_firma", "inspections", group_field="laboratuvarFirma", period_field="betonDokumTarihi", granularity="month"),
+    Rollup("payments_by_durum", "payments", group_field="hakedisDurumu", period_field="createdAt", granularity="month"),
+    Rollup("activity_by_user", "activities", group_field="userId", period_field="createdAt", granularity="day", track=False),
+]
+
+rollup_store = RollupStore(db, ROLLUPS)
+
+ROLLUP_REPOS = {
+    "inspections": inspections_repo,
+    "payments": payments_repo,
+    "activities": activities_repo,
+}
+
+# Yeniden hesaplamada okunan kaynaklar (arşivlenmiş kayıtlar trendlerden düşmez)
+ROLLUP_SOURCES = {
+    "inspections": [db.site_inspections, db[archive_name("site_inspections")]],
+    "payments": [db.progress_payments],
+    "activities": [db.activity_logs, db[archive_name("activity_logs")]],
+}
+
+for _entity, _repo in ROLLUP_REPOS.items():
+    _repo.add_hook(rollup_store.hook(_entity))
+
+# ==================== ARKA PLAN İŞ KUYRUĞU ====================
+
+JOB_PROGRESS_EVERY = 200
+JOB_DELETE_BATCH = 1000
+JOB_WORKER_ENABLED = os.environ.get('JOB_WORKER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', '2'))
+
+job_queue = JobQueue(db, lease_seconds=int(os.environ.get('JOB_LEASE_SECONDS', '60')))
+
+# iş türü -> /jobs üzerinden kuyruğa alabilecek roller (boş liste: yalnızca kendi ucundan)
+JOB_SUBMIT_ROLES: Dict[str, List[str]] = {}
+
+def job_handler(kind: str, roles: List[str], max_attempts: int = 3):
+    """İşi, kuyruğa alan kullanıcının yetkileriyle çalıştırır; HTTPException kalıcı hataya çevrilir"""
+    def decorator(fn):
+        async def run(ctx: JobContext):
+            user = await users_repo.get(ctx.job["createdBy"])
+            if user is None:
+                raise JobError("İşi başlatan kullanıcı bulunamadı")
+            try:
+                return await fn(ctx, user)
+            except HTTPException as e:
+                raise JobError(e.detail)
+        job_queue.register(kind, run, max_attempts)
+        JOB_SUBMIT_ROLES[kind] = roles
+        return fn
+    return decorator
+
 # ==================== AUTH UTILITIES ====================
 
+@traced("bcrypt.hash")
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
+@traced("bcrypt.verify")
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
@@ -674,6 +929,7 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+@traced("auth")
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
@@ -682,16 +938,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication")
         
-        user_doc = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+        user_doc = await users_repo.find_one({"id": user_id}, {"_id": 0, "password": 0})
         if user_doc is None:
             raise HTTPException(status_code=401, detail="User not found")
         
+        note_user_role(user_doc.get("role"))
         return User(**user_doc)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid authentication")
 
+@traced()
 async def log_activity(tip: str, aksiyon: str, aciklama: str, user: User, referansId: Optional[str] = None):
     log = ActivityLog(
         tip=tip,
@@ -701,9 +959,7 @@ async def log_activity(tip: str, aksiyon: str, aciklama: str, user: User, refera
         userName=user.name,
         referansId=referansId
     )
-    doc = log.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.activity_logs.insert_one(doc)
+    await activities_repo.insert(log)
 
 async def create_super_admin_report(
     report_type: str,
@@ -723,13 +979,31 @@ async def create_super_admin_report(
         projeType=proje_type,
         message=message
     )
-    doc = report.model_dump()
-    doc['reportedAt'] = doc['reportedAt'].isoformat()
-    if doc['resolvedAt']:
-        doc['resolvedAt'] = doc['resolvedAt'].isoformat()
-    await db.super_admin_reports.insert_one(doc)
+    await super_admin_reports_repo.insert(report)
     return report
 
+def partial_model(model):
+    """Create modelinden tüm alanları opsiyonel, bilinmeyen alanları reddeden PATCH modeli üretir"""
+    fields = {name: (Optional[field.annotation], None) for name, field in model.model_fields.items()}
+    return create_model(f"{model.__name__}Patch", __config__=ConfigDict(extra="forbid"), **fields)
+
+def _allows_none(annotation) -> bool:
+    return annotation is Any or annotation is None or type(None) in typing.get_args(annotation)
+
+def patch_update_data(input: BaseModel, model) -> dict:
+    update_data = input.model_dump(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="Güncellenecek alan gönderilmedi")
+    for name, value in update_data.items():
+        # PATCH modelinde her alan Optional; asıl modelde None kabul etmeyen alanlara null yazılmamalı
+        if value is None and not _allows_none(model.model_fields[name].annotation):
+            raise HTTPException(status_code=400, detail=f"{name} alanı boş olamaz")
+    return update_data
+
+def field_diff_text(update_data: dict, limit: int = 300) -> str:
+    text = ", ".join(f"{k}={v}" for k, v in update_data.items())
+    return text if len(text) <= limit else text[:limit] + "..."
+
 # ==================== AUTH ENDPOINTS ====================
 
 @api_router.post("/auth/register", response_model=Token)
@@ -741,9 +1015,8 @@ async def register(input: UserCreate):
     user_dict = input.model_dump(exclude={"password"})
     user_obj = User(**user_dict)
     
-    doc = user_obj.model_dump()
+    doc = users_repo.encode(user_obj.model_dump())
     doc['password'] = hash_password(input.password)
-    doc['createdAt'] = doc['createdAt'].isoformat()
     
     await db.users.insert_one(doc)
     
@@ -758,10 +1031,7 @@ async def login(input: UserLogin):
     
     user_doc.pop('password', None)
     user_doc.pop('_id', None)
-    if isinstance(user_doc.get('createdAt'), str):
-        user_doc['createdAt'] = datetime.fromisoformat(user_doc['createdAt'])
-    
-    user = User(**user_doc)
+    user = User(**users_repo.decode(user_doc))
     token = create_access_token({"sub": user.id})
     
     # Log login activity
@@ -772,9 +1042,7 @@ async def login(input: UserLogin):
         userId=user.id,
         userName=user.name
     )
-    log_doc = log.model_dump()
-    log_doc['createdAt'] = log_doc['createdAt'].isoformat()
-    await db.activity_logs.insert_one(log_doc)
+    await activities_repo.insert(log)
     
     return Token(access_token=token, token_type="bearer", user=user)
 
@@ -794,9 +1062,8 @@ async def create_user_by_admin(input: UserCreate, current_user: User = Depends(g
     user_dict = input.model_dump(exclude={"password"})
     user_obj = User(**user_dict)
     
-    doc = user_obj.model_dump()
+    doc = users_repo.encode(user_obj.model_dump())
     doc['password'] = hash_password(input.password)
-    doc['createdAt'] = doc['createdAt'].isoformat()
     
     await db.users.insert_one(doc)
     await log_activity("user", "create", f"Yeni kullanıcı oluşturuldu: {user_obj.name} ({user_obj.role})", current_user)
@@ -808,11 +1075,7 @@ async def get_users(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
     
-    users = await db.users.find({}, {"_id": 0, "password": 0}).sort("createdAt", -1).to_list(1000)
-    for user in users:
-        if isinstance(user.get('createdAt'), str):
-            user['createdAt'] = datetime.fromisoformat(user['createdAt'])
-    return users
+    return await users_repo.list(projection={"_id": 0, "password": 0})
 
 @api_router.delete("/users/{user_id}")
 async def delete_user(user_id: str, current_user: User = Depends(get_current_user)):
@@ -822,8 +1085,7 @@ async def delete_user(user_id: str, current_user: User = Depends(get_current_use
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Kendi hesabınızı silemezsiniz")
     
-    result = await db.users.delete_one({"id": user_id})
-    if result.deleted_count == 0:
+    if not await users_repo.delete(user_id):
         raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
     
     await log_activity("user", "delete", "Kullanıcı silindi", current_user, user_id)
@@ -841,9 +1103,7 @@ async def create_inspection(input: SiteInspectionCreate, current_user: User = De
         createdByName=current_user.name
     )
     
-    doc = inspection_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.site_inspections.insert_one(doc)
+    await inspections_repo.insert(inspection_obj)
     
     # İleri tarihli planları work_plans'a ekle
     if input.ileriTarihliKontrolPlan:
@@ -857,9 +1117,7 @@ async def create_inspection(input: SiteInspectionCreate, current_user: User = De
             createdBy=current_user.id,
             createdByName=current_user.name
         )
-        wp_doc = work_plan.model_dump()
-        wp_doc['createdAt'] = wp_doc['createdAt'].isoformat()
-        await db.work_plans.insert_one(wp_doc)
+        await workplans_repo.insert(work_plan)
     
     if input.ileriTarihliBetonDokumPlan:
         work_plan = WorkPlan(
@@ -873,9 +1131,7 @@ async def create_inspection(input: SiteInspectionCreate, current_user: User = De
             createdBy=current_user.id,
             createdByName=current_user.name
         )
-        wp_doc = work_plan.model_dump()
-        wp_doc['createdAt'] = wp_doc['createdAt'].isoformat()
-        await db.work_plans.insert_one(wp_doc)
+        await workplans_repo.insert(work_plan)
     
     await log_activity("saha_denetim", "create", f"Yeni saha denetimi oluşturuldu: {input.insaatIsmi}", current_user, inspection_obj.id)
     
@@ -893,59 +1149,57 @@ async def create_inspection(input: SiteInspectionCreate, current_user: User = De
     return inspection_obj
 
 @api_router.get("/inspections", response_model=List[SiteInspection])
-async def get_inspections(current_user: User = Depends(get_current_user)):
-    inspections = await db.site_inspections.find({}, {"_id": 0}).sort("createdAt", -1).to_list(1000)
-    for insp in inspections:
-        if isinstance(insp.get('createdAt'), str):
-            insp['createdAt'] = datetime.fromisoformat(insp['createdAt'])
-        if insp.get('updatedAt') and isinstance(insp['updatedAt'], str):
-            insp['updatedAt'] = datetime.fromisoformat(insp['updatedAt'])
-    return inspections
+async def get_inspections(
+    ilce: Optional[str] = None,
+    yibfNo: Optional[str] = None,
+    teslimAlindi: Optional[str] = None,
+    denetimTarihiFrom: Optional[str] = None,
+    denetimTarihiTo: Optional[str] = None,
+    sort: Optional[str] = None,
+    include_archived: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    query, sort_spec = compile_list_query(
+        INSPECTION_LIST_QUERY, sort,
+        ilce=ilce, yibfNo=yibfNo, teslimAlindi=teslimAlindi,
+        denetimTarihiFrom=denetimTarihiFrom, denetimTarihiTo=denetimTarihiTo
+    )
+    if include_archived:
+        return await list_tiers([inspections_repo, inspections_archive_repo], query, sort_spec)
+    return await inspections_repo.list(query, sort=sort_spec)
 
 @api_router.get("/inspections/{inspection_id}", response_model=SiteInspection)
 async def get_inspection(inspection_id: str, current_user: User = Depends(get_current_user)):
-    inspection = await db.site_inspections.find_one({"id": inspection_id}, {"_id": 0})
+    # Arşivlenmiş listelerden açılan kayıtlar için soğuk katmana da bakılır
+    inspection = await inspections_repo.get(inspection_id) or await inspections_archive_repo.get(inspection_id)
     if not inspection:
         raise HTTPException(status_code=404, detail="Denetim kaydı bulunamadı")
-    if isinstance(inspection.get('createdAt'), str):
-        inspection['createdAt'] = datetime.fromisoformat(inspection['createdAt'])
-    if inspection.get('updatedAt') and isinstance(inspection['updatedAt'], str):
-        inspection['updatedAt'] = datetime.fromisoformat(inspection['updatedAt'])
-    return SiteInspection(**inspection)
+    return inspection
 
 @api_router.put("/inspections/{inspection_id}", response_model=SiteInspection)
 async def update_inspection(inspection_id: str, input: SiteInspectionCreate, current_user: User = Depends(get_current_user)):
     if current_user.role == UserRole.USER:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    existing = await db.site_inspections.find_one({"id": inspection_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Denetim kaydı bulunamadı")
-    
     update_data = input.model_dump()
     update_data['updatedBy'] = current_user.id
     update_data['updatedByName'] = current_user.name
-    update_data['updatedAt'] = datetime.now(timezone.utc).isoformat()
+    update_data['updatedAt'] = datetime.now(timezone.utc)
     
-    await db.site_inspections.update_one({"id": inspection_id}, {"$set": update_data})
-    
-    updated = await db.site_inspections.find_one({"id": inspection_id}, {"_id": 0})
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
-    if updated.get('updatedAt') and isinstance(updated['updatedAt'], str):
-        updated['updatedAt'] = datetime.fromisoformat(updated['updatedAt'])
+    updated = await inspections_repo.update(inspection_id, update_data)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Denetim kaydı bulunamadı")
     
     await log_activity("saha_denetim", "update", f"Saha denetimi güncellendi: {input.insaatIsmi}", current_user, inspection_id)
     
-    return SiteInspection(**updated)
+    return updated
 
 @api_router.delete("/inspections/{inspection_id}")
 async def delete_inspection(inspection_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    result = await db.site_inspections.delete_one({"id": inspection_id})
-    if result.deleted_count == 0:
+    if not await inspections_repo.delete(inspection_id):
         raise HTTPException(status_code=404, detail="Denetim kaydı bulunamadı")
     
     await log_activity("saha_denetim", "delete", "Saha denetimi silindi", current_user, inspection_id)
@@ -963,9 +1217,7 @@ async def create_payment(input: ProgressPaymentCreate, current_user: User = Depe
         createdByName=current_user.name
     )
     
-    doc = payment_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.progress_payments.insert_one(doc)
+    await payments_repo.insert(payment_obj)
     
     # İleri tarihli hakediş planı
     if input.ileriTarihliHakedisHazirlamaTarihi:
@@ -979,68 +1231,57 @@ async def create_payment(input: ProgressPaymentCreate, current_user: User = Depe
             createdBy=current_user.id,
             createdByName=current_user.name
         )
-        wp_doc = work_plan.model_dump()
-        wp_doc['createdAt'] = wp_doc['createdAt'].isoformat()
-        await db.work_plans.insert_one(wp_doc)
+        await workplans_repo.insert(work_plan)
     
     await log_activity("hakedis", "create", f"Yeni hakediş oluşturuldu: {input.insaatIsmi} - Hakediş No: {input.hakedisNo}", current_user, payment_obj.id)
     
     return payment_obj
 
 @api_router.get("/payments", response_model=List[ProgressPayment])
-async def get_payments(current_user: User = Depends(get_current_user)):
-    payments = await db.progress_payments.find({}, {"_id": 0}).sort("createdAt", -1).to_list(1000)
-    for payment in payments:
-        if isinstance(payment.get('createdAt'), str):
-            payment['createdAt'] = datetime.fromisoformat(payment['createdAt'])
-        if payment.get('updatedAt') and isinstance(payment['updatedAt'], str):
-            payment['updatedAt'] = datetime.fromisoformat(payment['updatedAt'])
-    return payments
+async def get_payments(
+    yibfNo: Optional[str] = None,
+    hakedisDurumu: Optional[str] = None,
+    hakedisTipi: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    query, sort_spec = compile_list_query(
+        PAYMENT_LIST_QUERY, sort,
+        yibfNo=yibfNo, hakedisDurumu=hakedisDurumu, hakedisTipi=hakedisTipi
+    )
+    return await payments_repo.list(query, sort=sort_spec)
 
 @api_router.get("/payments/{payment_id}", response_model=ProgressPayment)
 async def get_payment(payment_id: str, current_user: User = Depends(get_current_user)):
-    payment = await db.progress_payments.find_one({"id": payment_id}, {"_id": 0})
+    payment = await payments_repo.get(payment_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Hakediş kaydı bulunamadı")
-    if isinstance(payment.get('createdAt'), str):
-        payment['createdAt'] = datetime.fromisoformat(payment['createdAt'])
-    if payment.get('updatedAt') and isinstance(payment['updatedAt'], str):
-        payment['updatedAt'] = datetime.fromisoformat(payment['updatedAt'])
-    return ProgressPayment(**payment)
+    return payment
 
 @api_router.put("/payments/{payment_id}", response_model=ProgressPayment)
 async def update_payment(payment_id: str, input: ProgressPaymentCreate, current_user: User = Depends(get_current_user)):
     if current_user.role == UserRole.USER:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    existing = await db.progress_payments.find_one({"id": payment_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Hakediş kaydı bulunamadı")
-    
     update_data = input.model_dump()
     update_data['updatedBy'] = current_user.id
     update_data['updatedByName'] = current_user.name
-    update_data['updatedAt'] = datetime.now(timezone.utc).isoformat()
+    update_data['updatedAt'] = datetime.now(timezone.utc)
     
-    await db.progress_payments.update_one({"id": payment_id}, {"$set": update_data})
-    
-    updated = await db.progress_payments.find_one({"id": payment_id}, {"_id": 0})
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
-    if updated.get('updatedAt') and isinstance(updated['updatedAt'], str):
-        updated['updatedAt'] = datetime.fromisoformat(updated['updatedAt'])
+    updated = await payments_repo.update(payment_id, update_data)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Hakediş kaydı bulunamadı")
     
     await log_activity("hakedis", "update", f"Hakediş güncellendi: {input.insaatIsmi} - Hakediş No: {input.hakedisNo}", current_user, payment_id)
     
-    return ProgressPayment(**updated)
+    return updated
 
 @api_router.delete("/payments/{payment_id}")
 async def delete_payment(payment_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    result = await db.progress_payments.delete_one({"id": payment_id})
-    if result.deleted_count == 0:
+    if not await payments_repo.delete(payment_id):
         raise HTTPException(status_code=404, detail="Hakediş kaydı bulunamadı")
     
     await log_activity("hakedis", "delete", "Hakediş silindi", current_user, payment_id)
@@ -1062,47 +1303,51 @@ async def create_workplan(input: WorkPlanCreate, current_user: User = Depends(ge
         durum="beklemede"
     )
     
-    doc = workplan_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.work_plans.insert_one(doc)
+    await workplans_repo.insert(workplan_obj)
     
     await log_activity("workplan", "create", f"Yeni iş planı oluşturuldu: {input.baslik}", current_user, workplan_obj.id)
     
     return workplan_obj
 
 @api_router.get("/workplans", response_model=List[WorkPlan])
-async def get_workplans(current_user: User = Depends(get_current_user)):
-    workplans = await db.work_plans.find({}, {"_id": 0}).sort("planTarihi", 1).to_list(1000)
-    for wp in workplans:
-        if isinstance(wp.get('createdAt'), str):
-            wp['createdAt'] = datetime.fromisoformat(wp['createdAt'])
-    return workplans
+async def get_workplans(
+    durum: Optional[str] = None,
+    tip: Optional[str] = None,
+    referansId: Optional[str] = None,
+    planTarihiFrom: Optional[str] = None,
+    planTarihiTo: Optional[str] = None,
+    sort: Optional[str] = None,
+    include_archived: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    query, sort_spec = compile_list_query(
+        WORKPLAN_LIST_QUERY, sort,
+        durum=durum, tip=tip, referansId=referansId,
+        planTarihiFrom=planTarihiFrom, planTarihiTo=planTarihiTo
+    )
+    if include_archived:
+        return await list_tiers([workplans_repo, workplans_archive_repo], query, sort_spec)
+    return await workplans_repo.list(query, sort=sort_spec)
 
 @api_router.put("/workplans/{workplan_id}", response_model=WorkPlan)
 async def update_workplan_status(workplan_id: str, durum: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    await db.work_plans.update_one({"id": workplan_id}, {"$set": {"durum": durum}})
-    
-    updated = await db.work_plans.find_one({"id": workplan_id}, {"_id": 0})
+    updated = await workplans_repo.update(workplan_id, {"durum": durum})
     if not updated:
         raise HTTPException(status_code=404, detail="İş planı bulunamadı")
     
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
-    
     await log_activity("workplan", "update", f"İş planı durumu güncellendi: {durum}", current_user, workplan_id)
     
-    return WorkPlan(**updated)
+    return updated
 
 @api_router.delete("/workplans/{workplan_id}")
 async def delete_workplan(workplan_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    result = await db.work_plans.delete_one({"id": workplan_id})
-    if result.deleted_count == 0:
+    if not await workplans_repo.delete(workplan_id):
         raise HTTPException(status_code=404, detail="İş planı bulunamadı")
     
     await log_activity("workplan", "delete", "İş planı silindi", current_user, workplan_id)
@@ -1120,9 +1365,7 @@ async def create_license(input: LicenseProjectCreate, current_user: User = Depen
         createdByName=current_user.name
     )
     
-    doc = license_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.license_projects.insert_one(doc)
+    await licenses_repo.insert(license_obj)
     
     await log_activity("ruhsat", "create", f"Yeni ruhsat kaydı oluşturuldu: {input.insaatIsmi}", current_user, license_obj.id)
     
@@ -1155,58 +1398,60 @@ async def create_license(input: LicenseProjectCreate, current_user: User = Depen
 
 @api_router.get("/licenses", response_model=List[LicenseProject])
 async def get_licenses(current_user: User = Depends(get_current_user)):
-    licenses = await db.license_projects.find({}, {"_id": 0}).sort("createdAt", -1).to_list(1000)
-    for lic in licenses:
-        if isinstance(lic.get('createdAt'), str):
-            lic['createdAt'] = datetime.fromisoformat(lic['createdAt'])
-        if lic.get('updatedAt') and isinstance(lic['updatedAt'], str):
-            lic['updatedAt'] = datetime.fromisoformat(lic['updatedAt'])
-    return licenses
+    return await licenses_repo.list()
 
 @api_router.get("/licenses/{license_id}", response_model=LicenseProject)
 async def get_license(license_id: str, current_user: User = Depends(get_current_user)):
-    license = await db.license_projects.find_one({"id": license_id}, {"_id": 0})
+    license = await licenses_repo.get(license_id)
     if not license:
         raise HTTPException(status_code=404, detail="Ruhsat kaydı bulunamadı")
-    if isinstance(license.get('createdAt'), str):
-        license['createdAt'] = datetime.fromisoformat(license['createdAt'])
-    if license.get('updatedAt') and isinstance(license['updatedAt'], str):
-        license['updatedAt'] = datetime.fromisoformat(license['updatedAt'])
-    return LicenseProject(**license)
+    return license
 
 @api_router.put("/licenses/{license_id}", response_model=LicenseProject)
 async def update_license(license_id: str, input: LicenseProjectCreate, current_user: User = Depends(get_current_user)):
     if current_user.role == UserRole.USER:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    existing = await db.license_projects.find_one({"id": license_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Ruhsat kaydı bulunamadı")
-    
     update_data = input.model_dump()
     update_data['updatedBy'] = current_user.id
     update_data['updatedByName'] = current_user.name
-    update_data['updatedAt'] = datetime.now(timezone.utc).isoformat()
+    update_data['updatedAt'] = datetime.now(timezone.utc)
     
-    await db.license_projects.update_one({"id": license_id}, {"$set": update_data})
-    
-    updated = await db.license_projects.find_one({"id": license_id}, {"_id": 0})
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
-    if updated.get('updatedAt') and isinstance(updated['updatedAt'], str):
-        updated['updatedAt'] = datetime.fromisoformat(updated['updatedAt'])
+    updated = await licenses_repo.update(license_id, update_data)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Ruhsat kaydı bulunamadı")
     
     await log_activity("ruhsat", "update", f"Ruhsat kaydı güncellendi: {input.insaatIsmi}", current_user, license_id)
     
-    return LicenseProject(**updated)
+    return updated
+
+LicenseProjectPatch = partial_model(LicenseProjectCreate)
+
+@api_router.patch("/licenses/{license_id}", response_model=LicenseProject)
+async def patch_license(license_id: str, input: LicenseProjectPatch, current_user: User = Depends(get_current_user)):
+    if current_user.role == UserRole.USER:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    
+    update_data = patch_update_data(input, LicenseProjectCreate)
+    diff = field_diff_text(update_data)
+    update_data['updatedBy'] = current_user.id
+    update_data['updatedByName'] = current_user.name
+    update_data['updatedAt'] = datetime.now(timezone.utc)
+    
+    updated = await licenses_repo.update(license_id, update_data)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Ruhsat kaydı bulunamadı")
+    
+    await log_activity("ruhsat", "update", f"Ruhsat kaydı güncellendi: {updated.insaatIsmi} ({diff})", current_user, license_id)
+    
+    return updated
 
 @api_router.delete("/licenses/{license_id}")
 async def delete_license(license_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    result = await db.license_projects.delete_one({"id": license_id})
-    if result.deleted_count == 0:
+    if not await licenses_repo.delete(license_id):
         raise HTTPException(status_code=404, detail="Ruhsat kaydı bulunamadı")
     
     await log_activity("ruhsat", "delete", "Ruhsat kaydı silindi", current_user, license_id)
@@ -1221,13 +1466,7 @@ async def get_super_admin_reports(current_user: User = Depends(get_current_user)
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
         raise HTTPException(status_code=403, detail="Bu raporları görmek için admin veya süper admin yetkisi gerekli")
     
-    reports = await db.super_admin_reports.find({}, {"_id": 0}).sort("reportedAt", -1).to_list(1000)
-    for report in reports:
-        if isinstance(report.get('reportedAt'), str):
-            report['reportedAt'] = datetime.fromisoformat(report['reportedAt'])
-        if report.get('resolvedAt') and isinstance(report['resolvedAt'], str):
-            report['resolvedAt'] = datetime.fromisoformat(report['resolvedAt'])
-    return reports
+    return await super_admin_reports_repo.list()
 
 @api_router.put("/super-admin-reports/{report_id}/resolve")
 async def resolve_report(report_id: str, current_user: User = Depends(get_current_user)):
@@ -1235,12 +1474,12 @@ async def resolve_report(report_id: str, current_user: User = Depends(get_curren
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için admin veya süper admin yetkisi gerekli")
     
-    result = await db.super_admin_reports.update_one(
-        {"id": report_id},
-        {"$set": {"isResolved": True, "resolvedAt": datetime.now(timezone.utc).isoformat()}}
+    updated = await super_admin_reports_repo.update(
+        report_id,
+        {"isResolved": True, "resolvedAt": datetime.now(timezone.utc)}
     )
     
-    if result.modified_count == 0:
+    if not updated:
         raise HTTPException(status_code=404, detail="Rapor bulunamadı")
     
     return {"message": "Rapor çözüldü olarak işaretlendi"}
@@ -1248,175 +1487,364 @@ async def resolve_report(report_id: str, current_user: User = Depends(get_curren
 # ==================== ACTIVITY LOGS ====================
 
 @api_router.get("/activities", response_model=List[ActivityLog])
-async def get_activities(current_user: User = Depends(get_current_user)):
-    activities = await db.activity_logs.find({}, {"_id": 0}).sort("createdAt", -1).limit(500).to_list(500)
-    for activity in activities:
-        if isinstance(activity.get('createdAt'), str):
-            activity['createdAt'] = datetime.fromisoformat(activity['createdAt'])
-    return activities
+async def get_activities(include_archived: bool = False, current_user: User = Depends(get_current_user)):
+    if include_archived:
+        return await list_tiers([activities_repo, activities_archive_repo], limit=500)
+    return await activities_repo.list(limit=500)
+
+# Saklama süresi (gün); verilirse süre dolan kayıtlar TTL index ile Mongo tarafından silinir.
+# Varsayılan 0: süresiz saklanır (denetim izi kayıtları açıkça istenmeden silinmez)
+ACTIVITY_LOG_RETENTION_DAYS = int(os.environ.get('ACTIVITY_LOG_RETENTION_DAYS', '0'))
+# Bu günden eski kayıtlar rollover işinde kullanıcı/gün kovalarına toplanır (ay bazında sorgulanır)
+ACTIVITY_LOG_ROLLOVER_DAYS = int(os.environ.get('ACTIVITY_LOG_ROLLOVER_DAYS', '90'))
+ACTIVITY_FEED_MAX_LIMIT = 200
+ACTIVITY_ROLLOVER_BATCH = 500
+
+# (userId/tip filtresi) -> (createdAtDate, id) azalan; akış sorgusu her zaman index'ten okunur
+ACTIVITY_FEED_INDEXES = [
+    [("createdAtDate", -1), ("id", -1)],
+    [("userId", 1), ("createdAtDate", -1), ("id", -1)],
+    [("tip", 1), ("createdAtDate", -1), ("id", -1)],
+    [("userId", 1), ("tip", 1), ("createdAtDate", -1), ("id", -1)],
+]
+
+def encode_activity_cursor(doc: dict) -> str:
+    created_at = doc["createdAt"]
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    return base64.urlsafe_b64encode(f"{created_at}|{doc['id']}".encode()).decode()
+
+def decode_activity_cursor(cursor: str):
+    try:
+        created_at, activity_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), activity_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+@api_router.get("/activities/feed")
+async def get_activity_feed(
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    userId: Optional[str] = None,
+    tip: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Aktivite akışını zamana göre sayfalar. Yanıttaki `nextCursor` bir sonraki istekte
+    `cursor` olarak gönderilir; skip kullanılmadığı için sayfa maliyeti derinlikten bağımsızdır.
+    """
+    limit = max(1, min(limit, ACTIVITY_FEED_MAX_LIMIT))
+    query = {}
+    if userId:
+        query["userId"] = userId
+    if tip:
+        query["tip"] = tip
+    if cursor:
+        created_at, activity_id = decode_activity_cursor(cursor)
+        query["$or"] = [
+            {"createdAtDate": {"$lt": created_at}},
+            {"createdAtDate": created_at, "id": {"$lt": activity_id}},
+        ]
+    docs = await activities_repo.list(query, sort=[("createdAtDate", -1), ("id", -1)], limit=limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    return {
+        "items": [ActivityLog(**doc) for doc in docs],
+        "nextCursor": encode_activity_cursor(docs[-1]) if has_more else None,
+    }
+
+@api_router.get("/activities/monthly")
+async def get_activity_buckets(month: str, userId: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    """Rollover ile kovalara toplanmış eski aktivite kayıtları; ayın günlük kovaları kullanıcı başına birleştirilir"""
+    if not re.match(r"^\d{4}-\d{2}$", month):
+        raise HTTPException(status_code=400, detail="Ay formatı YYYY-MM olmalı")
+    query = {"month": month}
+    if userId:
+        query["userId"] = userId
+    merged: Dict[Any, dict] = {}
+    async for bucket in db.activity_logs_monthly.find(query, {"_id": 0, "lastAtDate": 0, "day": 0}):
+        user_bucket = merged.setdefault(bucket.get("userId"), {**bucket, "entries": []})
+        user_bucket["entries"].extend(bucket.get("entries", []))
+    for bucket in merged.values():
+        bucket["entries"].sort(key=lambda e: e.get("createdAt") or "", reverse=True)
+        bucket["count"] = len(bucket["entries"])
+    return list(merged.values())
+
+async def rollover_activity_logs(before: datetime, ctx: Optional[JobContext] = None) -> int:
+    """
+    `before` tarihinden eski kayıtları (ay, kullanıcı, gün) kovalarına taşır. Kova başına bir günlük
+    kayıt düştüğü için belge boyutu sınırlı kalır; ay sorgusu `month` alanından okunur. Girdiler
+    $addToSet ile eklendiği için yarıda kalan bir çalışma tekrarlandığında aynı kayıt iki kez yazılmaz.
+    """
+    moved = 0
+    while True:
+        batch = await db.activity_logs.find({"createdAtDate": {"$lt": before}}).limit(ACTIVITY_ROLLOVER_BATCH).to_list(ACTIVITY_ROLLOVER_BATCH)
+        if not batch:
+            break
+        ops = []
+        for doc in batch:
+            entry = {field: doc.get(field) for field in ("id", "tip", "aksiyon", "aciklama", "referansId", "createdAt")}
+            created_at = str(doc.get("createdAt"))
+            ops.append(UpdateOne(
+                {"month": created_at[:7], "userId": doc.get("userId"), "day": created_at[:10]},
+                {
+                    "$addToSet": {"entries": entry},
+                    "$set": {"userName": doc.get("userName")},
+                    "$max": {"lastAtDate": doc.get("createdAtDate")},
+                },
+                upsert=True
+            ))
+        await db.activity_logs_monthly.bulk_write(ops, ordered=True)
+        await db.activity_logs.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        moved += len(batch)
+        if ctx is not None:
+            await ctx.progress(moved, None, "Aktivite kayıtları kovalara taşınıyor")
+    return moved
+
+@job_handler("activity_logs.rollover", roles=[UserRole.SUPER_ADMIN])
+async def run_activity_rollover(ctx: JobContext, user: User):
+    days = int(ctx.params.get("days", ACTIVITY_LOG_ROLLOVER_DAYS))
+    if days <= 0:
+        raise JobError("Rollover için gün sayısı pozitif olmalı")
+    moved = await rollover_activity_logs(datetime.now(timezone.utc) - timedelta(days=days), ctx)
+    return {"moved": moved}
+
+@api_router.post("/activities/rollover", status_code=202)
+async def start_activity_rollover(days: Optional[int] = None, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    days = ACTIVITY_LOG_ROLLOVER_DAYS if days is None else days
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="Gün sayısı pozitif olmalı")
+    return await job_queue.submit("activity_logs.rollover", {"days": days}, current_user.id, current_user.name)
 
 # ==================== CONSTRUCTIONS (İNŞAAT LİSTESİ) ====================
 
-@api_router.post("/constructions/upload")
+# Excel sütun başlığı -> model alanı (içe aktarma ve dışa aktarma ortak)
+CONSTRUCTION_COLUMN_MAPPING = {
+    'YİBF No': 'yibfNo',
+    'İl': 'il',
+    'İlgili İdare': 'ilgiliIdare',
+    'Ada': 'ada',
+    'Parsel': 'parsel',
+    'İş Başlık': 'isBaslik',
+    'İşin Durumu': 'isinDurumu',
+    'Kısmi': 'kismi',
+    'Seviye': 'seviye',
+    'Sözleşme Tarihi': 'sozlesmeTarihi',
+    'Kalan Alan': 'kalanAlan',
+    'Yapı İnşaat Alanı (m2)': 'yapiInsaatAlani',
+    'İlçe': 'ilce',
+    'Mahalle/Köy': 'mahalleKoy',
+    'Birim Fiyat': 'birimFiyat',
+    'BKS Referans No': 'bksReferansNo',
+    'Yapı Kimlik No': 'yapiKimlikNo',
+    'Ruhsat Tarihi': 'ruhsatTarihi',
+    'Yapı Sınıfı': 'yapiSinifi',
+    'Yapı Toplam Alanı (m2)': 'yapiToplamAlani',
+    'Küme Yapı Mı?': 'kumeYapiMi',
+    'Eklenti': 'eklenti',
+    'Sanayi Sitesi': 'sanayiSitesi',
+    'Güçlendirme': 'guclendirme',
+    'Güçlendirme (Ruhsat)': 'guclendirmeRuhsat',
+    'YKE Zorunlu mu?': 'ykeZorunluMu'
+}
+
+@api_router.post("/constructions/upload", status_code=202)
 async def upload_constructions(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+    """Dosyayı saklayıp içe aktarma işini kuyruğa alır; ilerleme /jobs/{id} ile izlenir"""
     if current_user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
     
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Sadece Excel dosyaları (.xlsx, .xls) yüklenebilir")
     
-    try:
-        # Read Excel file
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents))
-        
-        # Column mapping from Excel to our model
-        column_mapping = {
-            'YİBF No': 'yibfNo',
-            'İl': 'il',
-            'İlgili İdare': 'ilgiliIdare',
-            'Ada': 'ada',
-            'Parsel': 'parsel',
-            'İş Başlık': 'isBaslik',
-            'İşin Durumu': 'isinDurumu',
-            'Kısmi': 'kismi',
-            'Seviye': 'seviye',
-            'Sözleşme Tarihi': 'sozlesmeTarihi',
-            'Kalan Alan': 'kalanAlan',
-            'Yapı İnşaat Alanı (m2)': 'yapiInsaatAlani',
-            'İlçe': 'ilce',
-            'Mahalle/Köy': 'mahalleKoy',
-            'Birim Fiyat': 'birimFiyat',
-            'BKS Referans No': 'bksReferansNo',
-            'Yapı Kimlik No': 'yapiKimlikNo',
-            'Ruhsat Tarihi': 'ruhsatTarihi',
-            'Yapı Sınıfı': 'yapiSinifi',
-            'Yapı Toplam Alanı (m2)': 'yapiToplamAlani',
-            'Küme Yapı Mı?': 'kumeYapiMi',
-            'Eklenti': 'eklenti',
-            'Sanayi Sitesi': 'sanayiSitesi',
-            'Güçlendirme': 'guclendirme',
-            'Güçlendirme (Ruhsat)': 'guclendirmeRuhsat',
-            'YKE Zorunlu mu?': 'ykeZorunluMu'
-        }
-        
-        # Replace NaN with None
-        df = df.where(pd.notnull(df), None)
-        
-        imported_count = 0
-        updated_count = 0
-        skipped_count = 0
-        
-        for _, row in df.iterrows():
-            if pd.isna(row.get('YİBF No')) or row.get('YİBF No') is None:
-                skipped_count += 1
-                continue
-            
-            yibf_no = str(row['YİBF No']).strip()
-            
-            # Check if construction already exists
-            existing = await db.constructions.find_one({"yibfNo": yibf_no})
-            
-            # Prepare construction data
-            construction_data = {
-                "yibfNo": yibf_no,
-                "createdBy": current_user.id,
-                "createdByName": current_user.name,
-                "importDate": datetime.now(timezone.utc).isoformat()
-            }
-            
-            # Map Excel columns to model fields
-            for excel_col, model_field in column_mapping.items():
-                if excel_col in row and row[excel_col] is not None:
-                    value = row[excel_col]
-                    # Convert to string and handle special types
-                    if pd.isna(value):
-                        construction_data[model_field] = None
-                    elif isinstance(value, (int, float)):
-                        construction_data[model_field] = str(value)
-                    elif isinstance(value, pd.Timestamp):
-                        construction_data[model_field] = value.strftime('%Y-%m-%d')
-                    else:
-                        construction_data[model_field] = str(value)
-            
-            if existing:
-                # Update existing construction
-                construction_data['createdAt'] = existing.get('createdAt')
-                await db.constructions.update_one(
-                    {"yibfNo": yibf_no},
-                    {"$set": construction_data}
-                )
-                updated_count += 1
+    contents = await file.read()
+    file_id = await job_queue.put_file(file.filename, contents)
+    job = await job_queue.submit(
+        "constructions.import", {"fileId": file_id, "filename": file.filename},
+        current_user.id, current_user.name, file_ids=[file_id]
+    )
+    return {"message": "Excel dosyası işlenmek üzere kuyruğa alındı", "jobId": job["id"], "status": job["status"]}
+
+def read_constructions_excel(contents: bytes) -> pd.DataFrame:
+    """Ayrıştırma aşaması: Excel'i okuyup NaN hücreleri None yapar"""
+    df = pd.read_excel(BytesIO(contents))
+    # Replace NaN with None
+    return df.where(pd.notnull(df), None)
+
+def construction_from_excel_row(row, current_user: User) -> Optional[dict]:
+    """Normalizasyon aşaması: satırı model alanlarına çevirir; YİBF No yoksa None"""
+    if pd.isna(row.get('YİBF No')) or row.get('YİBF No') is None:
+        return None
+    
+    yibf_no = str(row['YİBF No']).strip()
+    
+    # Prepare construction data
+    construction_data = {
+        "yibfNo": yibf_no,
+        "createdBy": current_user.id,
+        "createdByName": current_user.name,
+        "importDate": datetime.now(timezone.utc).isoformat()
+    }
+    
+    # Map Excel columns to model fields
+    for excel_col, model_field in CONSTRUCTION_COLUMN_MAPPING.items():
+        if excel_col in row and row[excel_col] is not None:
+            value = row[excel_col]
+            # Convert to string and handle special types
+            if pd.isna(value):
+                construction_data[model_field] = None
+            elif isinstance(value, (int, float)):
+                construction_data[model_field] = str(value)
+            elif isinstance(value, pd.Timestamp):
+                construction_data[model_field] = value.strftime('%Y-%m-%d')
             else:
-                # Insert new construction
-                construction_data['id'] = str(uuid.uuid4())
-                construction_data['createdAt'] = datetime.now(timezone.utc).isoformat()
-                await db.constructions.insert_one(construction_data)
-                imported_count += 1
-        
-        await log_activity(
-            "construction",
-            "upload",
-            f"Excel dosyası yüklendi: {imported_count} yeni, {updated_count} güncellendi, {skipped_count} atlandı",
-            current_user
+                construction_data[model_field] = str(value)
+    return construction_data
+
+async def save_imported_construction(construction_data: dict) -> bool:
+    """Yazma aşaması: yibfNo'ya göre günceller ya da ekler; güncellendiyse True"""
+    yibf_no = construction_data["yibfNo"]
+    
+    # Check if construction already exists
+    existing = await db.constructions.find_one({"yibfNo": yibf_no})
+    
+    if existing:
+        # Update existing construction
+        construction_data['createdAt'] = existing.get('createdAt')
+        await db.constructions.update_one(
+            {"yibfNo": yibf_no},
+            {"$set": construction_data}
         )
+        existing.update(construction_data)
+        construction_data = existing
+    else:
+        # Insert new construction
+        construction_data['id'] = str(uuid.uuid4())
+        construction_data['createdAt'] = datetime.now(timezone.utc).isoformat()
+        await db.constructions.insert_one(construction_data)
+    
+    construction_data.pop('_id', None)
+    construction_index.upsert(construction_data)
+    return bool(existing)
+
+def parse_constructions_excel(contents: bytes, current_user: User) -> List[Optional[dict]]:
+    """Ayrıştırma + normalizasyon; CPU yoğun olduğu için thread'de çalıştırılır"""
+    df = read_constructions_excel(contents)
+    return [construction_from_excel_row(row, current_user) for _, row in df.iterrows()]
+
+async def import_constructions_excel(contents: bytes, current_user: User, ctx: Optional[JobContext] = None):
+    # Büyük dosyalarda event loop (istekler ve iş kiralama heartbeat'i) bloklanmasın; loop'ta yalnızca yazmalar beklenir
+    if ctx is not None:
+        await ctx.progress(0, None, "Excel dosyası okunuyor")
+    try:
+        records = await asyncio.to_thread(parse_constructions_excel, contents, current_user)
+    except Exception as e:
+        raise JobError(f"Excel işleme hatası: {str(e)}")
+    
+    imported_count = 0
+    updated_count = 0
+    skipped_count = 0
+    total = len(records)
+    
+    for position, construction_data in enumerate(records):
+        if ctx is not None and position % JOB_PROGRESS_EVERY == 0:
+            await ctx.progress(position, total, "Satırlar işleniyor")
         
-        return {
-            "message": "Excel dosyası başarıyla işlendi",
-            "imported": imported_count,
-            "updated": updated_count,
-            "skipped": skipped_count,
-            "total": imported_count + updated_count
-        }
+        if construction_data is None:
+            skipped_count += 1
+            continue
         
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Excel işleme hatası: {str(e)}")
+        if await save_imported_construction(construction_data):
+            updated_count += 1
+        else:
+            imported_count += 1
+    
+    await log_activity(
+        "construction",
+        "upload",
+        f"Excel dosyası yüklendi: {imported_count} yeni, {updated_count} güncellendi, {skipped_count} atlandı",
+        current_user
+    )
+    
+    return {
+        "message": "Excel dosyası başarıyla işlendi",
+        "imported": imported_count,
+        "updated": updated_count,
+        "skipped": skipped_count,
+        "total": imported_count + updated_count
+    }
 
 @api_router.get("/constructions", response_model=List[Construction])
 async def get_constructions(current_user: User = Depends(get_current_user)):
-    constructions = await db.constructions.find({}, {"_id": 0}).sort("createdAt", -1).to_list(5000)
-    for const in constructions:
-        if isinstance(const.get('createdAt'), str):
-            const['createdAt'] = datetime.fromisoformat(const['createdAt'])
-        if const.get('importDate') and isinstance(const['importDate'], str):
-            const['importDate'] = datetime.fromisoformat(const['importDate'])
-    return constructions
+    return await constructions_repo.list(limit=5000)
+
+@api_router.get("/constructions/stream")
+async def stream_constructions(accept: Optional[str] = Header(None), current_user: User = Depends(get_current_user)):
+    """
+    /constructions ile aynı veriyi limitsiz ve artımlı döner.
+    `Accept: application/x-ndjson` gönderilirse satır başına bir kayıt (NDJSON) yazılır.
+    """
+    return stream_documents(constructions_repo.stream(), Construction, accept)
 
 @api_router.get("/constructions/search")
-async def search_constructions(q: str, current_user: User = Depends(get_current_user)):
-    """Search constructions by YIBF No or İş Başlık"""
+async def search_constructions(q: str, limit: int = 20, current_user: User = Depends(get_current_user)):
+    """Search constructions by YIBF No, İş Başlık or İlçe (Türkçe karakter duyarsız, sıralı)"""
+    limit = max(1, min(limit, 50))
+    if construction_index.loaded:
+        return construction_index.search(q, limit)
+    
+    # İndeks henüz yüklenmediyse eski sorguya düş
+    pattern = re.escape(q)
     query = {
         "$or": [
-            {"yibfNo": {"$regex": q, "$options": "i"}},
-            {"isBaslik": {"$regex": q, "$options": "i"}}
+            {"yibfNo": {"$regex": pattern, "$options": "i"}},
+            {"isBaslik": {"$regex": pattern, "$options": "i"}}
         ]
     }
-    constructions = await db.constructions.find(query, {"_id": 0}).limit(20).to_list(20)
-    return constructions
+    return await constructions_repo.collection.find(query, {"_id": 0}).limit(limit).to_list(limit)
 
 @api_router.delete("/constructions/{construction_id}")
 async def delete_construction(construction_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
     
-    result = await db.constructions.delete_one({"id": construction_id})
-    if result.deleted_count == 0:
+    if not await constructions_repo.delete(construction_id):
         raise HTTPException(status_code=404, detail="İnşaat kaydı bulunamadı")
+    construction_index.remove(construction_id)
     
     await log_activity("construction", "delete", "İnşaat kaydı silindi", current_user, construction_id)
     
     return {"message": "Başarıyla silindi"}
 
-@api_router.delete("/constructions")
+@api_router.delete("/constructions", status_code=202)
 async def delete_all_constructions(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
     
-    result = await db.constructions.delete_many({})
-    
-    await log_activity("construction", "delete", f"Tüm inşaat kayıtları silindi ({result.deleted_count} kayıt)", current_user)
-    
-    return {"message": f"{result.deleted_count} kayıt silindi"}
+    job = await job_queue.submit("constructions.delete_all", {}, current_user.id, current_user.name)
+    return {"message": "Toplu silme işlemi kuyruğa alındı", "jobId": job["id"], "status": job["status"]}
+
+async def delete_all_constructions_job(current_user: User, ctx: Optional[JobContext] = None):
+    """Kayıtları parti parti siler; her parti arasında iptal ve ilerleme kontrolü yapılır"""
+    total = await db.constructions.count_documents({})
+    deleted = 0
+    while True:
+        batch = await db.constructions.find({}, {"_id": 1, "id": 1}).limit(JOB_DELETE_BATCH).to_list(JOB_DELETE_BATCH)
+        if not batch:
+            break
+        result = await db.constructions.delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+        deleted += result.deleted_count
+        for d in batch:
+            if d.get("id"):
+                construction_index.remove(d["id"])
+        if ctx is not None:
+            await ctx.progress(deleted, total, "Kayıtlar siliniyor")
+    
+    await log_activity("construction", "delete", f"Tüm inşaat kayıtları silindi ({deleted} kayıt)", current_user)
+    
+    return {"message": f"{deleted} kayıt silindi", "deleted": deleted}
 
 # ==================== COMPANIES ====================
 
@@ -1432,9 +1860,7 @@ async def create_company(input: CompanyCreate, current_user: User = Depends(get_
         createdByName=current_user.name
     )
     
-    doc = company_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.companies.insert_one(doc)
+    await companies_repo.insert(company_obj)
     
     await log_activity("company", "create", f"Yeni firma oluşturuldu: {input.name} ({input.type})", current_user, company_obj.id)
     
@@ -1442,48 +1868,36 @@ async def create_company(input: CompanyCreate, current_user: User = Depends(get_
 
 @api_router.get("/companies", response_model=List[Company])
 async def get_companies(current_user: User = Depends(get_current_user)):
-    companies = await db.companies.find({}, {"_id": 0}).sort("name", 1).to_list(1000)
-    for company in companies:
-        if isinstance(company.get('createdAt'), str):
-            company['createdAt'] = datetime.fromisoformat(company['createdAt'])
-    return companies
+    if company_cache.loaded:
+        return company_cache.values()
+    return await companies_repo.list()
 
 @api_router.get("/companies/{company_id}", response_model=Company)
 async def get_company(company_id: str, current_user: User = Depends(get_current_user)):
-    company = await db.companies.find_one({"id": company_id}, {"_id": 0})
+    company = company_cache.get(company_id) if company_cache.loaded else await companies_repo.get(company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
-    if isinstance(company.get('createdAt'), str):
-        company['createdAt'] = datetime.fromisoformat(company['createdAt'])
-    return Company(**company)
+    return company
 
 @api_router.put("/companies/{company_id}", response_model=Company)
 async def update_company(company_id: str, input: CompanyCreate, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    existing = await db.companies.find_one({"id": company_id})
-    if not existing:
+    updated = await companies_repo.update(company_id, input.model_dump())
+    if not updated:
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    update_data = input.model_dump()
-    await db.companies.update_one({"id": company_id}, {"$set": update_data})
-    
-    updated = await db.companies.find_one({"id": company_id}, {"_id": 0})
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
-    
     await log_activity("company", "update", f"Firma güncellendi: {input.name}", current_user, company_id)
     
-    return Company(**updated)
+    return updated
 
 @api_router.delete("/companies/{company_id}")
 async def delete_company(company_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    result = await db.companies.delete_one({"id": company_id})
-    if result.deleted_count == 0:
+    if not await companies_repo.delete(company_id):
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
     await log_activity("company", "delete", "Firma silindi", current_user, company_id)
@@ -1496,11 +1910,9 @@ async def get_companies_by_type(company_type: str, current_user: User = Depends(
     if company_type not in ['laboratory', 'concrete']:
         raise HTTPException(status_code=400, detail="Geçersiz firma tipi. 'laboratory' veya 'concrete' olmalı")
     
-    companies = await db.companies.find({"type": company_type}, {"_id": 0}).sort("name", 1).to_list(1000)
-    for company in companies:
-        if isinstance(company.get('createdAt'), str):
-            company['createdAt'] = datetime.fromisoformat(company['createdAt'])
-    return companies
+    if company_cache.loaded:
+        return company_cache.values(lambda c: c.get("type") == company_type)
+    return await companies_repo.list({"type": company_type})
 
 # ==================== HAKEDİŞ EVRAKLARI ====================
 
@@ -1508,59 +1920,54 @@ async def get_companies_by_type(company_type: str, current_user: User = Depends(
 async def create_hakedis_evrak(input: HakedisEvrakCreate, current_user: User = Depends(get_current_user)):
     evrak_dict = input.model_dump()
     evrak_obj = HakedisEvrak(**evrak_dict, createdBy=current_user.id, createdByName=current_user.name)
-    doc = evrak_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.hakedis_evrak.insert_one(doc)
+    await hakedis_evrak_repo.insert(evrak_obj)
     await log_activity("hakedis_evrak", "create", f"Hakediş evrak kaydı oluşturuldu: {input.insaatIsmi}", current_user)
     return evrak_obj
 
 @api_router.get("/hakedis-evrak", response_model=List[HakedisEvrak])
 async def get_hakedis_evrak(current_user: User = Depends(get_current_user)):
-    evraklar = await db.hakedis_evrak.find({}, {"_id": 0}).sort("createdAt", -1).to_list(1000)
-    for evrak in evraklar:
-        if isinstance(evrak.get('createdAt'), str):
-            evrak['createdAt'] = datetime.fromisoformat(evrak['createdAt'])
-        if evrak.get('updatedAt') and isinstance(evrak['updatedAt'], str):
-            evrak['updatedAt'] = datetime.fromisoformat(evrak['updatedAt'])
-    return evraklar
+    return await hakedis_evrak_repo.list()
 
 @api_router.get("/hakedis-evrak/by-hakedis/{hakedis_id}")
 async def get_hakedis_evrak_by_hakedis(hakedis_id: str, current_user: User = Depends(get_current_user)):
-    evrak = await db.hakedis_evrak.find_one({"hakedisId": hakedis_id}, {"_id": 0})
-    if not evrak:
-        return None
-    if isinstance(evrak.get('createdAt'), str):
-        evrak['createdAt'] = datetime.fromisoformat(evrak['createdAt'])
-    if evrak.get('updatedAt') and isinstance(evrak['updatedAt'], str):
-        evrak['updatedAt'] = datetime.fromisoformat(evrak['updatedAt'])
-    return evrak
+    return await hakedis_evrak_repo.find_one({"hakedisId": hakedis_id})
 
 @api_router.put("/hakedis-evrak/{evrak_id}", response_model=HakedisEvrak)
 async def update_hakedis_evrak(evrak_id: str, input: HakedisEvrakCreate, current_user: User = Depends(get_current_user)):
     if current_user.role == UserRole.USER:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
-    existing = await db.hakedis_evrak.find_one({"id": evrak_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Evrak kaydı bulunamadı")
     update_data = input.model_dump()
     update_data['updatedBy'] = current_user.id
     update_data['updatedByName'] = current_user.name
-    update_data['updatedAt'] = datetime.now(timezone.utc).isoformat()
-    await db.hakedis_evrak.update_one({"id": evrak_id}, {"$set": update_data})
-    updated = await db.hakedis_evrak.find_one({"id": evrak_id}, {"_id": 0})
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
-    if updated.get('updatedAt') and isinstance(updated['updatedAt'], str):
-        updated['updatedAt'] = datetime.fromisoformat(updated['updatedAt'])
+    update_data['updatedAt'] = datetime.now(timezone.utc)
+    updated = await hakedis_evrak_repo.update(evrak_id, update_data)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Evrak kaydı bulunamadı")
     await log_activity("hakedis_evrak", "update", "Hakediş evrak güncellendi", current_user, evrak_id)
-    return HakedisEvrak(**updated)
+    return updated
+
+HakedisEvrakPatch = partial_model(HakedisEvrakCreate)
+
+@api_router.patch("/hakedis-evrak/{evrak_id}", response_model=HakedisEvrak)
+async def patch_hakedis_evrak(evrak_id: str, input: HakedisEvrakPatch, current_user: User = Depends(get_current_user)):
+    if current_user.role == UserRole.USER:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    update_data = patch_update_data(input, HakedisEvrakCreate)
+    diff = field_diff_text(update_data)
+    update_data['updatedBy'] = current_user.id
+    update_data['updatedByName'] = current_user.name
+    update_data['updatedAt'] = datetime.now(timezone.utc)
+    updated = await hakedis_evrak_repo.update(evrak_id, update_data)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Evrak kaydı bulunamadı")
+    await log_activity("hakedis_evrak", "update", f"Hakediş evrak güncellendi ({diff})", current_user, evrak_id)
+    return updated
 
 @api_router.delete("/hakedis-evrak/{evrak_id}")
 async def delete_hakedis_evrak(evrak_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
-    result = await db.hakedis_evrak.delete_one({"id": evrak_id})
-    if result.deleted_count == 0:
+    if not await hakedis_evrak_repo.delete(evrak_id):
         raise HTTPException(status_code=404, detail="Evrak kaydı bulunamadı")
     await log_activity("hakedis_evrak", "delete", "Hakediş evrak silindi", current_user, evrak_id)
     return {"message": "Başarıyla silindi"}
@@ -1683,49 +2090,39 @@ async def hesapla_hakedis(construction_id: str, current_user: User = Depends(get
 @api_router.post("/aylik-rapor", response_model=AylikSeviyeRaporu)
 async def create_aylik_rapor(input: AylikSeviyeRaporuCreate, current_user: User = Depends(get_current_user)):
     rapor_obj = AylikSeviyeRaporu(**input.model_dump(), createdBy=current_user.id, createdByName=current_user.name)
-    doc = rapor_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.aylik_seviye_raporlari.insert_one(doc)
+    try:
+        await aylik_raporlar_repo.insert(rapor_obj)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Bu ruhsat için bu aya ait rapor kaydı zaten var")
     await log_activity("aylik_rapor", "create", f"Aylık seviye raporu oluşturuldu: {input.insaatIsmi} - {input.ay}", current_user)
     return rapor_obj
 
 @api_router.get("/aylik-rapor", response_model=List[AylikSeviyeRaporu])
 async def get_aylik_raporlar(current_user: User = Depends(get_current_user)):
-    raporlar = await db.aylik_seviye_raporlari.find({}, {"_id": 0}).sort("ay", -1).to_list(1000)
-    for r in raporlar:
-        if isinstance(r.get('createdAt'), str):
-            r['createdAt'] = datetime.fromisoformat(r['createdAt'])
-    return raporlar
+    return await aylik_raporlar_repo.list()
 
 @api_router.get("/aylik-rapor/license/{license_id}")
 async def get_aylik_raporlar_by_license(license_id: str, current_user: User = Depends(get_current_user)):
-    raporlar = await db.aylik_seviye_raporlari.find({"licenseId": license_id}, {"_id": 0}).sort("ay", -1).to_list(100)
-    for r in raporlar:
-        if isinstance(r.get('createdAt'), str):
-            r['createdAt'] = datetime.fromisoformat(r['createdAt'])
-    return raporlar
+    return await aylik_raporlar_repo.list({"licenseId": license_id}, limit=100)
 
 @api_router.put("/aylik-rapor/{rapor_id}", response_model=AylikSeviyeRaporu)
 async def update_aylik_rapor(rapor_id: str, input: AylikSeviyeRaporuCreate, current_user: User = Depends(get_current_user)):
     if current_user.role == UserRole.USER:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
-    existing = await db.aylik_seviye_raporlari.find_one({"id": rapor_id})
-    if not existing:
+    try:
+        updated = await aylik_raporlar_repo.update(rapor_id, input.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Bu ruhsat için bu aya ait rapor kaydı zaten var")
+    if not updated:
         raise HTTPException(status_code=404, detail="Rapor bulunamadı")
-    update_data = input.model_dump()
-    await db.aylik_seviye_raporlari.update_one({"id": rapor_id}, {"$set": update_data})
-    updated = await db.aylik_seviye_raporlari.find_one({"id": rapor_id}, {"_id": 0})
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
     await log_activity("aylik_rapor", "update", "Aylık rapor güncellendi", current_user, rapor_id)
-    return AylikSeviyeRaporu(**updated)
+    return updated
 
 @api_router.delete("/aylik-rapor/{rapor_id}")
 async def delete_aylik_rapor(rapor_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
-    result = await db.aylik_seviye_raporlari.delete_one({"id": rapor_id})
-    if result.deleted_count == 0:
+    if not await aylik_raporlar_repo.delete(rapor_id):
         raise HTTPException(status_code=404, detail="Rapor bulunamadı")
     await log_activity("aylik_rapor", "delete", "Aylık rapor silindi", current_user, rapor_id)
     return {"message": "Başarıyla silindi"}
@@ -1735,53 +2132,121 @@ async def delete_aylik_rapor(rapor_id: str, current_user: User = Depends(get_cur
 @api_router.post("/yilsonu-rapor", response_model=YilSonuSeviyeRaporu)
 async def create_yilsonu_rapor(input: YilSonuSeviyeRaporuCreate, current_user: User = Depends(get_current_user)):
     rapor_obj = YilSonuSeviyeRaporu(**input.model_dump(), createdBy=current_user.id, createdByName=current_user.name)
-    doc = rapor_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.yilsonu_seviye_raporlari.insert_one(doc)
+    try:
+        await yilsonu_raporlar_repo.insert(rapor_obj)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Bu ruhsat için bu yıla ait rapor kaydı zaten var")
     await log_activity("yilsonu_rapor", "create", f"Yıl sonu raporu oluşturuldu: {input.insaatIsmi} - {input.yil}", current_user)
     return rapor_obj
 
 @api_router.get("/yilsonu-rapor", response_model=List[YilSonuSeviyeRaporu])
 async def get_yilsonu_raporlar(current_user: User = Depends(get_current_user)):
-    raporlar = await db.yilsonu_seviye_raporlari.find({}, {"_id": 0}).sort("yil", -1).to_list(1000)
-    for r in raporlar:
-        if isinstance(r.get('createdAt'), str):
-            r['createdAt'] = datetime.fromisoformat(r['createdAt'])
-    return raporlar
+    return await yilsonu_raporlar_repo.list()
 
 @api_router.get("/yilsonu-rapor/license/{license_id}")
 async def get_yilsonu_raporlar_by_license(license_id: str, current_user: User = Depends(get_current_user)):
-    raporlar = await db.yilsonu_seviye_raporlari.find({"licenseId": license_id}, {"_id": 0}).sort("yil", -1).to_list(100)
-    for r in raporlar:
-        if isinstance(r.get('createdAt'), str):
-            r['createdAt'] = datetime.fromisoformat(r['createdAt'])
-    return raporlar
+    return await yilsonu_raporlar_repo.list({"licenseId": license_id}, limit=100)
 
 @api_router.put("/yilsonu-rapor/{rapor_id}", response_model=YilSonuSeviyeRaporu)
 async def update_yilsonu_rapor(rapor_id: str, input: YilSonuSeviyeRaporuCreate, current_user: User = Depends(get_current_user)):
     if current_user.role == UserRole.USER:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
-    existing = await db.yilsonu_seviye_raporlari.find_one({"id": rapor_id})
-    if not existing:
+    try:
+        updated = await yilsonu_raporlar_repo.update(rapor_id, input.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Bu ruhsat için bu yıla ait rapor kaydı zaten var")
+    if not updated:
         raise HTTPException(status_code=404, detail="Rapor bulunamadı")
-    update_data = input.model_dump()
-    await db.yilsonu_seviye_raporlari.update_one({"id": rapor_id}, {"$set": update_data})
-    updated = await db.yilsonu_seviye_raporlari.find_one({"id": rapor_id}, {"_id": 0})
-    if isinstance(updated.get('createdAt'), str):
-        updated['createdAt'] = datetime.fromisoformat(updated['createdAt'])
     await log_activity("yilsonu_rapor", "update", "Yıl sonu raporu güncellendi", current_user, rapor_id)
-    return YilSonuSeviyeRaporu(**updated)
+    return updated
 
 @api_router.delete("/yilsonu-rapor/{rapor_id}")
 async def delete_yilsonu_rapor(rapor_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
-    result = await db.yilsonu_seviye_raporlari.delete_one({"id": rapor_id})
-    if result.deleted_count == 0:
+    if not await yilsonu_raporlar_repo.delete(rapor_id):
         raise HTTPException(status_code=404, detail="Rapor bulunamadı")
     await log_activity("yilsonu_rapor", "delete", "Yıl sonu raporu silindi", current_user, rapor_id)
     return {"message": "Başarıyla silindi"}
 
+# ==================== TOPLU SEVİYE RAPORU OLUŞTURMA ====================
+
+async def _bulk_create_seviye_raporlari(repo: Repository, period_field: str, period_value: str, current_user: User):
+    """
+    Dönem için kaydı olmayan her ruhsata boş (raporVarMi=False) kayıt ekler.
+    Eksik ruhsatlar tek bir anti-join aggregation ile bulunur, kayıtlar tek insert_many ile yazılır.
+    (licenseId, dönem) unique index'i sayesinde eşzamanlı çağrılar çift kayıt üretmez.
+    """
+    pipeline = [
+        {"$project": {"_id": 0, "id": 1, "yibfNo": 1, "insaatIsmi": 1}},
+        {"$lookup": {
+            "from": repo.name,
+            "let": {"lid": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$licenseId", "$$lid"]},
+                    {"$eq": [f"${period_field}", period_value]}
+                ]}}},
+                {"$limit": 1},
+                {"$project": {"_id": 1}}
+            ],
+            "as": "mevcut"
+        }},
+        {"$match": {"mevcut": {"$size": 0}}},
+        {"$project": {"mevcut": 0}}
+    ]
+    eksik_licenses = await db.license_projects.aggregate(pipeline).to_list(None)
+    
+    docs = []
+    for lic in eksik_licenses:
+        rapor_obj = repo.model(
+            licenseId=lic["id"],
+            yibfNo=lic.get("yibfNo") or "",
+            insaatIsmi=lic.get("insaatIsmi") or "",
+            raporTarihi="",
+            raporVarMi=False,
+            createdBy=current_user.id,
+            createdByName=current_user.name,
+            **{period_field: period_value}
+        )
+        docs.append(repo.encode(rapor_obj.model_dump()))
+    
+    created = 0
+    if docs:
+        try:
+            result = await repo.collection.insert_many(docs, ordered=False)
+            created = len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Araya giren eşzamanlı istekler yüzünden oluşan duplicate key hataları yok sayılır
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+            created = e.details.get("nInserted", 0)
+    return created, len(eksik_licenses) - created
+
+@api_router.post("/aylik-rapor/bulk")
+async def bulk_create_aylik_rapor(ay: str, current_user: User = Depends(get_current_user)):
+    if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    _month_range(ay, ay)
+    
+    created, skipped = await _bulk_create_seviye_raporlari(
+        aylik_raporlar_repo, "ay", ay, current_user
+    )
+    await log_activity("aylik_rapor", "create", f"Toplu aylık seviye raporu oluşturuldu: {ay} - {created} kayıt", current_user)
+    return {"message": f"{created} aylık rapor kaydı oluşturuldu", "ay": ay, "created": created, "skipped": skipped}
+
+@api_router.post("/yilsonu-rapor/bulk")
+async def bulk_create_yilsonu_rapor(yil: str, current_user: User = Depends(get_current_user)):
+    if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    _year_range(yil, yil)
+    
+    created, skipped = await _bulk_create_seviye_raporlari(
+        yilsonu_raporlar_repo, "yil", yil, current_user
+    )
+    await log_activity("yilsonu_rapor", "create", f"Toplu yıl sonu raporu oluşturuldu: {yil} - {created} kayıt", current_user)
+    return {"message": f"{created} yıl sonu rapor kaydı oluşturuldu", "yil": yil, "created": created, "skipped": skipped}
+
 # ==================== MESAJLAŞMA (ADMIN-SUPERADMIN) ====================
 
 @api_router.post("/mesajlar", response_model=Mesaj)
@@ -1792,7 +2257,7 @@ async def create_mesaj(input: MesajCreate, current_user: User = Depends(get_curr
     # Eğer alıcı ID varsa, alıcı bilgilerini getir
     alici_adi = None
     if input.aliciId:
-        alici = await db.users.find_one({"id": input.aliciId}, {"_id": 0})
+        alici = await users_repo.find_one({"id": input.aliciId}, {"_id": 0, "name": 1})
         if alici:
             alici_adi = alici.get('name')
     
@@ -1803,63 +2268,51 @@ async def create_mesaj(input: MesajCreate, current_user: User = Depends(get_curr
         gonderenRol=current_user.role,
         aliciAdi=alici_adi
     )
-    doc = mesaj_obj.model_dump()
-    doc['createdAt'] = doc['createdAt'].isoformat()
-    await db.mesajlar.insert_one(doc)
+    await mesajlar_repo.insert(mesaj_obj)
     return mesaj_obj
 
 @api_router.get("/mesajlar/proje/{proje_id}", response_model=List[Mesaj])
-async def get_mesajlar_by_proje(proje_id: str, current_user: User = Depends(get_current_user)):
+async def get_mesajlar_by_proje(proje_id: str, include_archived: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
         raise HTTPException(status_code=403, detail="Mesajlar sadece Admin ve SuperAdmin tarafından görüntülenebilir")
     
-    mesajlar = await db.mesajlar.find({"projeId": proje_id}, {"_id": 0}).sort("createdAt", 1).to_list(1000)
-    for m in mesajlar:
-        if isinstance(m.get('createdAt'), str):
-            m['createdAt'] = datetime.fromisoformat(m['createdAt'])
-    return mesajlar
+    repos = [mesajlar_repo, mesajlar_archive_repo] if include_archived else [mesajlar_repo]
+    return await list_tiers(repos, {"projeId": proje_id}, sort=[("createdAt", 1)])
 
 @api_router.get("/mesajlar", response_model=List[Mesaj])
-async def get_all_mesajlar(current_user: User = Depends(get_current_user)):
+async def get_all_mesajlar(include_archived: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Tüm mesajlar sadece SuperAdmin tarafından görüntülenebilir")
     
-    mesajlar = await db.mesajlar.find({}, {"_id": 0}).sort("createdAt", -1).to_list(1000)
-    for m in mesajlar:
-        if isinstance(m.get('createdAt'), str):
-            m['createdAt'] = datetime.fromisoformat(m['createdAt'])
-    return mesajlar
+    repos = [mesajlar_repo, mesajlar_archive_repo] if include_archived else [mesajlar_repo]
+    return await list_tiers(repos)
 
 @api_router.get("/mesajlar/user/{user_id}", response_model=List[Mesaj])
-async def get_mesajlar_by_user(user_id: str, current_user: User = Depends(get_current_user)):
+async def get_mesajlar_by_user(user_id: str, include_archived: bool = False, current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
         raise HTTPException(status_code=403, detail="Erişim reddedildi")
     
     # Kullanıcı ile olan tüm mesajları getir (gönderen veya alıcı olarak)
-    mesajlar = await db.mesajlar.find({
+    repos = [mesajlar_repo, mesajlar_archive_repo] if include_archived else [mesajlar_repo]
+    return await list_tiers(repos, {
         "$or": [
             {"gonderenId": current_user.id, "aliciId": user_id},
             {"gonderenId": user_id, "aliciId": current_user.id}
         ]
-    }, {"_id": 0}).sort("createdAt", 1).to_list(1000)
-    
-    for m in mesajlar:
-        if isinstance(m.get('createdAt'), str):
-            m['createdAt'] = datetime.fromisoformat(m['createdAt'])
-    return mesajlar
+    }, sort=[("createdAt", 1)])
 
 @api_router.delete("/mesajlar/{mesaj_id}")
 async def delete_mesaj(mesaj_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Mesaj silme sadece SuperAdmin için")
-    result = await db.mesajlar.delete_one({"id": mesaj_id})
-    if result.deleted_count == 0:
+    if not await mesajlar_repo.delete(mesaj_id):
         raise HTTPException(status_code=404, detail="Mesaj bulunamadı")
     return {"message": "Mesaj başarıyla silindi"}
 
 # ==================== REPORTS (RAPORLAR) ====================
 
 @api_router.get("/reports/eksiklik")
+@coalesce("reports.eksiklik")
 async def get_eksiklik_raporu(current_user: User = Depends(get_current_user)):
     """
     OPTIMIZE EDİLDİ: MongoDB aggregation pipeline kullanarak performans iyileştirmesi yapıldı.
@@ -2058,9 +2511,722 @@ async def get_eksiklik_raporu(current_user: User = Depends(get_current_user)):
     
     return rapor
 
+# ==================== GENEL ARAMA ====================
+
+@api_router.get("/search")
+async def global_search(
+    q: str,
+    entity: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Denetim, hakediş, ruhsat, iş planı ve mesajlarda YİBF no, inşaat adı, ilçe, firma
+    ve not alanlarında arama. Sonuçlar ters indeksten sayfalı döner, entity bazında sayılar facets alanındadır.
+    """
+    allowed = [e for e in ENTITY_FIELDS if e != "mesajlar" or current_user.role == UserRole.SUPER_ADMIN]
+    if entity:
+        if entity not in allowed:
+            raise HTTPException(status_code=400, detail=f"Geçersiz arama alanı: {entity}")
+        allowed = [entity]
+    page = max(page, 1)
+    page_size = max(1, min(page_size, 100))
+    return await search_index.search(q, allowed, page, page_size)
+
+@job_handler("search.rebuild", roles=[UserRole.SUPER_ADMIN])
+async def run_search_rebuild(ctx: JobContext, user: User):
+    counts = {}
+    for i, (entity, repo) in enumerate(SEARCH_REPOS.items()):
+        await ctx.progress(i, len(SEARCH_REPOS), entity)
+        counts[entity] = await search_index.rebuild(entity, repo.collection)
+    await log_activity("search", "update", f"Arama indeksi yeniden oluşturuldu: {sum(counts.values())} kayıt", user)
+    return {"counts": counts}
+
+@api_router.post("/search/rebuild", status_code=202)
+async def rebuild_search_index(current_user: User = Depends(get_current_user)):
+    """Tüm kaynak koleksiyonları taradığı için iş kuyruğunda çalışır; ilerleme /jobs/{id} ile izlenir"""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    return await job_queue.submit("search.rebuild", {}, current_user.id, current_user.name)
+
+# ==================== RAPOR UYUM MATRİSİ ====================
+
+COMPLIANCE_MAX_PERIODS = 60
+
+def _month_range(start: str, end: str) -> List[str]:
+    try:
+        start_y, start_m = (int(p) for p in start.split("-"))
+        end_y, end_m = (int(p) for p in end.split("-"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ay formatı YYYY-MM olmalı")
+    if not (1 <= start_m <= 12 and 1 <= end_m <= 12):
+        raise HTTPException(status_code=400, detail="Ay formatı YYYY-MM olmalı")
+    months = []
+    y, m = start_y, start_m
+    while (y, m) <= (end_y, end_m):
+        months.append(f"{y:04d}-{m:02d}")
+        if len(months) > COMPLIANCE_MAX_PERIODS:
+            raise HTTPException(status_code=400, detail=f"En fazla {COMPLIANCE_MAX_PERIODS} dönem sorgulanabilir")
+        m += 1
+        if m > 12:
+            y, m = y + 1, 1
+    return months
+
+def _year_range(start: str, end: str) -> List[str]:
+    if not (start.isdigit() and end.isdigit() and len(start) == 4 and len(end) == 4):
+        raise HTTPException(status_code=400, detail="Yıl formatı YYYY olmalı")
+    years = [str(y) for y in range(int(start), int(end) + 1)]
+    if len(years) > COMPLIANCE_MAX_PERIODS:
+        raise HTTPException(status_code=400, detail=f"En fazla {COMPLIANCE_MAX_PERIODS} dönem sorgulanabilir")
+    return years
+
+@api_router.get("/reports/compliance")
+async def get_rapor_uyum_matrisi(
+    period: str = "monthly",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    missing_only: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Ruhsat x dönem (ay veya yıl) seviye raporu uyum matrisi.
+    Hücre durumları: 'tamam' (rapor var), 'rapor_yok' (kayıt var ama rapor yok), 'kayit_yok'.
+    Rapor tarafı tek bir aggregation ile (licenseId, dönem) bazında gruplanır ve
+    yalnızca istenen dönem aralığını tarar; geçmiş rapor sayısından bağımsızdır.
+    """
+    bugun = datetime.now(timezone.utc)
+    if period == "monthly":
+        collection = db.aylik_seviye_raporlari
+        period_field = "ay"
+        default = f"{bugun.year:04d}-{bugun.month:02d}"
+        periods = _month_range(start or default, end or start or default)
+    elif period == "yearly":
+        collection = db.yilsonu_seviye_raporlari
+        period_field = "yil"
+        default = str(bugun.year - 1)
+        periods = _year_range(start or default, end or start or default)
+    else:
+        raise HTTPException(status_code=400, detail="period 'monthly' veya 'yearly' olmalı")
+    if not periods:
+        raise HTTPException(status_code=400, detail="Başlangıç dönemi bitişten sonra olamaz")
+    
+    pipeline = [
+        {"$match": {period_field: {"$gte": periods[0], "$lte": periods[-1]}}},
+        {"$group": {
+            "_id": {"licenseId": "$licenseId", "donem": f"${period_field}"},
+            "raporVarMi": {"$max": "$raporVarMi"}
+        }}
+    ]
+    licenses_cursor = db.license_projects.find(
+        {}, {"_id": 0, "id": 1, "yibfNo": 1, "insaatIsmi": 1}
+    ).sort("createdAt", -1)
+    licenses, grouped = await asyncio.gather(
+        licenses_cursor.to_list(None),
+        collection.aggregate(pipeline).to_list(None)
+    )
+    
+    durumlar = {}
+    for g in grouped:
+        durumlar[(g["_id"]["licenseId"], g["_id"]["donem"])] = "tamam" if g.get("raporVarMi") else "rapor_yok"
+    
+    satirlar = []
+    eksik_hucre = 0
+    for lic in licenses:
+        hucreler = {p: durumlar.get((lic["id"], p), "kayit_yok") for p in periods}
+        eksik = [p for p, d in hucreler.items() if d != "tamam"]
+        eksik_hucre += len(eksik)
+        if missing_only and not eksik:
+            continue
+        satirlar.append({
+            "licenseId": lic["id"],
+            "yibfNo": lic.get("yibfNo"),
+            "insaatIsmi": lic.get("insaatIsmi"),
+            "donemler": hucreler,
+            "eksikDonemler": eksik
+        })
+    
+    return {
+        "period": period,
+        "donemler": periods,
+        "toplamRuhsat": len(licenses),
+        "eksikHucreSayisi": eksik_hucre,
+        "satirlar": satirlar
+    }
+
+# ==================== ARKA PLAN İŞLERİ ====================
+
+@job_handler("constructions.import", roles=[])
+async def run_construction_import(ctx: JobContext, user: User):
+    contents = await job_queue.read_file(ctx.params["fileId"])
+    return await import_constructions_excel(contents, user, ctx)
+
+@job_handler("constructions.delete_all", roles=[UserRole.SUPER_ADMIN])
+async def run_delete_all_constructions(ctx: JobContext, user: User):
+    return await delete_all_constructions_job(user, ctx)
+
+@job_handler("aylik_rapor.bulk", roles=[UserRole.SUPER_ADMIN, UserRole.ADMIN])
+async def run_bulk_aylik_rapor(ctx: JobContext, user: User):
+    return await bulk_create_aylik_rapor(ay=str(ctx.params.get("ay")), current_user=user)
+
+@job_handler("yilsonu_rapor.bulk", roles=[UserRole.SUPER_ADMIN, UserRole.ADMIN])
+async def run_bulk_yilsonu_rapor(ctx: JobContext, user: User):
+    return await bulk_create_yilsonu_rapor(yil=str(ctx.params.get("yil")), current_user=user)
+
+@job_handler("reports.eksiklik", roles=[UserRole.SUPER_ADMIN], max_attempts=2)
+async def run_eksiklik_raporu(ctx: JobContext, user: User):
+    return await get_eksiklik_raporu(current_user=user)
+
+@job_handler("reports.compliance", roles=[UserRole.SUPER_ADMIN, UserRole.ADMIN, UserRole.USER], max_attempts=2)
+async def run_rapor_uyum_matrisi(ctx: JobContext, user: User):
+    params = ctx.params
+    return await get_rapor_uyum_matrisi(
+        period=params.get("period", "monthly"),
+        start=params.get("start"),
+        end=params.get("end"),
+        missing_only=bool(params.get("missing_only", False)),
+        current_user=user
+    )
+
+class JobSubmit(BaseModel):
+    kind: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+async def get_job_for_user(job_id: str, current_user: User) -> dict:
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    if current_user.role != UserRole.SUPER_ADMIN and job["createdBy"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    return job
+
+@api_router.post("/jobs", status_code=202)
+async def submit_job(input: JobSubmit, current_user: User = Depends(get_current_user)):
+    roles = JOB_SUBMIT_ROLES.get(input.kind)
+    if not roles:
+        raise HTTPException(status_code=400, detail=f"Bu iş türü kuyruğa alınamaz: {input.kind}")
+    if current_user.role not in roles:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    return await job_queue.submit(input.kind, input.params, current_user.id, current_user.name)
+
+@api_router.get("/jobs")
+async def get_jobs(status: Optional[str] = None, limit: int = 50, current_user: User = Depends(get_current_user)):
+    """Kullanıcının işleri (süper admin tümünü görür); sonuçlar /jobs/{id} ile alınır"""
+    user_id = None if current_user.role == UserRole.SUPER_ADMIN else current_user.id
+    return await job_queue.list(user_id=user_id, status=status, limit=max(1, min(limit, 200)))
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: User = Depends(get_current_user)):
+    return await get_job_for_user(job_id, current_user)
+
+@api_router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await get_job_for_user(job_id, current_user)
+    if job["status"] in FINISHED_STATUSES:
+        raise HTTPException(status_code=400, detail="Tamamlanmış iş iptal edilemez")
+    return await job_queue.cancel(job_id)
+
+# ==================== ARŞİV (SICAK / SOĞUK KATMAN) ====================
+
+# isinDurumu bu ifadelerden birini içeren inşaatlar tamamlanmış sayılır
+ARCHIVE_COMPLETED_KEYWORDS = [
+    k.strip() for k in os.environ.get('ARCHIVE_COMPLETED_KEYWORDS', 'Tamamlan,Bitti,Biten,Bitmiş').split(',') if k.strip()
+]
+
+# Arşive taşınan kayıtlar genel arama indeksinden de çıkarılır
+ARCHIVE_SEARCH_ENTITIES = {"site_inspections": "inspections", "work_plans": "workplans", "mesajlar": "mesajlar"}
+
+archiver = Archiver(db)
+
+class ArchiveRequest(BaseModel):
+    before: Optional[str] = None  # YYYY-MM-DD: bu tarihten eski kayıtlar
+    completed: bool = True  # tamamlanmış inşaatların kayıtları
+
+class RestoreRequest(BaseModel):
+    yibfNo: Optional[str] = None  # yeniden açılan inşaatın kayıtları
+    after: Optional[str] = None  # YYYY-MM-DD: bu tarihten yeni kayıtlar
+
+def _validate_archive_date(value: Optional[str], name: str):
+    if value is not None and not DATE_RE.match(value):
+        raise HTTPException(status_code=400, detail=f"{name} YYYY-MM-DD formatında olmalı")
+
+async def completed_constructions():
+    pattern = "|".join(re.escape(k) for k in ARCHIVE_COMPLETED_KEYWORDS)
+    docs = await db.constructions.find(
+        {"isinDurumu": {"$regex": pattern, "$options": "i"}}, {"_id": 0, "id": 1, "yibfNo": 1}
+    ).to_list(None)
+    return [d["yibfNo"] for d in docs if d.get("yibfNo")], [d["id"] for d in docs if d.get("id")]
+
+def _archive_batch_hook(restore: bool, moved: Dict[str, int]):
+    async def on_batch(name: str, batch: List[dict]):
+        entity = ARCHIVE_SEARCH_ENTITIES.get(name)
+        if entity:
+            for doc in batch:
+                if restore:
+                    await search_index.upsert(entity, doc)
+                elif doc.get("id"):
+                    await search_index.remove(entity, doc["id"])
+        if name == "site_inspections":
+            # Denetime bağlı iş planları ve aktivite kayıtları denetimle birlikte taşınır
+            ids = [doc["id"] for doc in batch if doc.get("id")]
+            for dependent in ("work_plans", "activity_logs"):
+                query = {"referansId": {"$in": ids}}
+                if dependent == "work_plans" and not restore:
+                    # Bekleyen iş planları denetim arşivlense de sıcak katmanda kalır (run_archive ile aynı kural)
+                    query["durum"] = {"$ne": "beklemede"}
+                count = await archiver.move(dependent, query, restore=restore, on_batch=on_batch)
+                moved[dependent] = moved.get(dependent, 0) + count
+    return on_batch
+
+def _or_query(conditions: List[dict]) -> Optional[dict]:
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$or": conditions}
+
+async def _run_archive_plan(ctx: JobContext, plan: List[tuple], restore: bool):
+    moved: Dict[str, int] = {}
+    on_batch = _archive_batch_hook(restore, moved)
+    async def progress(name: str, count: int):
+        await ctx.progress(sum(moved.values()) + count, None, f"{name}: {count}")
+    for name, query in plan:
+        if query is None:
+            continue
+        count = await archiver.move(name, query, restore=restore, on_batch=on_batch, progress=progress)
+        moved[name] = moved.get(name, 0) + count
+    return moved
+
+@job_handler("archive.run", roles=[UserRole.SUPER_ADMIN])
+async def run_archive(ctx: JobContext, user: User):
+    """Yarıda kalan iş aynı parametrelerle yeniden denendiğinde kaldığı yerden devam eder"""
+    before = ctx.params.get("before")
+    yibf_nos, construction_ids = await completed_constructions() if ctx.params.get("completed", True) else ([], [])
+    plan = [
+        ("site_inspections", _or_query(
+            ([{"yibfNo": {"$in": yibf_nos}}] if yibf_nos else [])
+            + ([{"denetimTarihi": {"$lt": before}}] if before else [])
+        )),
+        # Bekleyen iş planları tarihinden bağımsız olarak sıcak katmanda kalır
+        ("work_plans", {"planTarihi": {"$lt": before}, "durum": {"$ne": "beklemede"}} if before else None),
+        ("activity_logs", {"createdAt": {"$lt": before}} if before else None),
+        ("mesajlar", _or_query(
+            ([{"projeId": {"$in": construction_ids}}] if construction_ids else [])
+            + ([{"createdAt": {"$lt": before}}] if before else [])
+        )),
+    ]
+    moved = await _run_archive_plan(ctx, plan, restore=False)
+    await log_activity("archive", "archive", f"Kayıtlar arşive taşındı: {moved}", user)
+    return {"moved": moved}
+
+@job_handler("archive.restore", roles=[UserRole.SUPER_ADMIN])
+async def run_archive_restore(ctx: JobContext, user: User):
+    yibf_no = ctx.params.get("yibfNo")
+    after = ctx.params.get("after")
+    construction_ids = []
+    if yibf_no:
+        construction_ids = [d["id"] for d in await db.constructions.find({"yibfNo": yibf_no}, {"_id": 0, "id": 1}).to_list(None) if d.get("id")]
+    plan = [
+        ("site_inspections", _or_query(
+            ([{"yibfNo": yibf_no}] if yibf_no else [])
+            + ([{"denetimTarihi": {"$gte": after}}] if after else [])
+        )),
+        ("work_plans", {"planTarihi": {"$gte": after}} if after else None),
+        ("activity_logs", {"createdAt": {"$gte": after}} if after else None),
+        ("mesajlar", _or_query(
+            ([{"projeId": {"$in": construction_ids}}] if construction_ids else [])
+            + ([{"createdAt": {"$gte": after}}] if after else [])
+        )),
+    ]
+    moved = await _run_archive_plan(ctx, plan, restore=True)
+    await log_activity("archive", "restore", f"Kayıtlar arşivden geri alındı: {moved}", user)
+    return {"restored": moved}
+
+@api_router.post("/archive/run", status_code=202)
+async def start_archive(input: ArchiveRequest, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    _validate_archive_date(input.before, "before")
+    if not input.before and not input.completed:
+        raise HTTPException(status_code=400, detail="En az bir arşivleme ölçütü gerekli")
+    return await job_queue.submit("archive.run", input.model_dump(), current_user.id, current_user.name)
+
+@api_router.post("/archive/restore", status_code=202)
+async def start_archive_restore(input: RestoreRequest, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    _validate_archive_date(input.after, "after")
+    if not input.yibfNo and not input.after:
+        raise HTTPException(status_code=400, detail="yibfNo veya after verilmeli")
+    return await job_queue.submit("archive.restore", input.model_dump(), current_user.id, current_user.name)
+
+@api_router.get("/archive/stats")
+async def get_archive_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    stats = {}
+    for name in ARCHIVED_COLLECTIONS:
+        hot, cold = archiver.collections(name)
+        stats[name] = {
+            "hot": await hot.estimated_document_count(),
+            "archived": await cold.estimated_document_count(),
+        }
+    return stats
+
+# ==================== ANALİTİK ====================
+
+async def _activity_bucket_entries():
+    """Rollover ile aylık kovalara taşınmış aktivite kayıtlarını tek tek üretir"""
+    async for bucket in db.activity_logs_monthly.find({}, {"_id": 0, "userId": 1, "entries.createdAt": 1}):
+        for entry in bucket.get("entries", []):
+            yield {"userId": bucket.get("userId"), "createdAt": entry.get("createdAt")}
+
+@job_handler("analytics.rebuild", roles=[UserRole.SUPER_ADMIN])
+async def run_rollup_rebuild(ctx: JobContext, user: User):
+    names = [ctx.params["rollup"]] if ctx.params.get("rollup") else list(rollup_store.rollups)
+    result = {}
+    for i, name in enumerate(names):
+        if name not in rollup_store.rollups:
+            raise JobError(f"Bilinmeyen rollup: {name}")
+        await ctx.progress(i, len(names), name)
+        rollup = rollup_store.rollups[name]
+        projection = {"_id": 0, "id": 1, rollup.group_field: 1, rollup.period_field: 1}
+        sources = [collection.find({}, projection) for collection in ROLLUP_SOURCES[rollup.entity]]
+        if rollup.entity == "activities":
+            sources.append(_activity_bucket_entries())
+        result[name] = await rollup_store.rebuild(name, sources)
+    return result
+
+@api_router.get("/analytics")
+async def get_analytics_catalog(current_user: User = Depends(get_current_user)):
+    if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    return [
+        {"name": r.name, "groupField": r.group_field, "periodField": r.period_field, "granularity": r.granularity}
+        for r in ROLLUPS
+    ]
+
+@api_router.get("/analytics/{rollup}")
+async def get_analytics_series(
+    rollup: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    group: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Rollup zaman serisi: grup başına dönem sayaçları ve toplamlar.
+    start/end aylık rollup'larda YYYY-MM, günlüklerde YYYY-MM-DD (uzun değerler kırpılır).
+    """
+    if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    if rollup not in rollup_store.rollups:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen rollup: {rollup}")
+    for name, value in (("start", start), ("end", end)):
+        if value is not None and not re.match(r"^\d{4}-\d{2}(-\d{2})?$", value):
+            raise HTTPException(status_code=400, detail=f"{name} YYYY-MM veya YYYY-MM-DD formatında olmalı")
+    return await rollup_store.series(rollup, start, end, group)
+
+@api_router.post("/analytics/rebuild", status_code=202)
+async def start_rollup_rebuild(rollup: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    if rollup is not None and rollup not in rollup_store.rollups:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen rollup: {rollup}")
+    return await job_queue.submit("analytics.rebuild", {"rollup": rollup}, current_user.id, current_user.name)
+
+# ==================== DIŞA AKTARMA (CSV / XLSX) ====================
+
+INSPECTION_EXPORT_COLUMNS = [
+    ("denetimTarihi", "Denetim Tarihi"),
+    ("insaatIsmi", "İnşaat İsmi"),
+    ("yibfNo", "YİBF No"),
+    ("ilce", "İlçe"),
+    ("blokNo", "Blok No"),
+    ("kat", "Kat"),
+    ("kot", "Kot"),
+    ("kontrolEdilenBolum", "Kontrol Edilen Bölüm"),
+    ("betonDokumTarihi", "Beton Döküm Tarihi"),
+    ("betonDokulenBolum", "Beton Dökülen Bölüm"),
+    ("kalipDonatiKontrolTarihi", "Kalıp Donatı Kontrol Tarihi"),
+    ("kalipKurulumTarihi", "Kalıp Kurulum Tarihi"),
+    ("kalipSokumTarihi", "Kalıp Söküm Tarihi"),
+    ("alinanDemirNumuneCaplari", "Alınan Demir Numune Çapları"),
+    ("laboratuvarFirma", "Laboratuvar Firması"),
+    ("betonFirma", "Beton Firması"),
+    ("ileriTarihliKontrolPlan", "İleri Tarihli Kontrol Planı"),
+    ("ileriTarihliBetonDokumPlan", "İleri Tarihli Beton Dökümü Planı"),
+    ("ileriTarihliBetonDokumSaati", "İleri Tarihli Beton Döküm Saati"),
+    ("teslimAlindi", "Teslim Durumu"),
+    ("teslimAlinmamaAciklamasi", "Teslim Alınmama Açıklaması"),
+    ("santiyeDefteriBilgileriOnaylandi", "Şantiye Defteri Onaylandı"),
+    ("createdByName", "Oluşturan"),
+    ("createdAt", "Oluşturulma Tarihi"),
+]
+
+PAYMENT_EXPORT_COLUMNS = [
+    ("insaatIsmi", "İnşaat İsmi"),
+    ("yibfNo", "YİBF No"),
+    ("adaParsel", "Ada/Parsel"),
+    ("hakedisNo", "Hakediş No"),
+    ("hakedisTipi", "Hakediş Tipi"),
+    ("hakedisYuzdesi", "Hakediş Yüzdesi (%)"),
+    ("belediye", "Belediye"),
+    ("hakedisDurumu", "Hakediş Durumu"),
+    ("eksik", "Eksik"),
+    ("hakedisHazirlamaTarihi", "Hakediş Hazırlama Tarihi"),
+    ("belediyeyeGirisTarihi", "Belediyeye Giriş Tarihi"),
+    ("malMudurlugneGirisTarihi", "Mal Müdürlüğüne Giriş Tarihi"),
+    ("ileriTarihliHakedisHazirlamaTarihi", "İleri Tarihli Hakediş Hazırlama Tarihi"),
+    ("createdByName", "Oluşturan"),
+    ("createdAt", "Oluşturulma Tarihi"),
+]
+
+LICENSE_EVRAK_EXPORT_COLUMNS = [
+    ("yapiSahibiTapu", "Yapı Sahibi: Tapu"),
+    ("yapiSahibiKimlik", "Yapı Sahibi: Kimlik"),
+    ("yapiSahibiImarDurumu", "Yapı Sahibi: İmar Durumu"),
+    ("yapiSahibiResmiAplikasyon", "Yapı Sahibi: Resmî Aplikasyon Krokisi"),
+    ("yapiSahibiYapiAplikasyon", "Yapı Sahibi: Yapı Aplikasyon Krokisi"),
+    ("yapiSahibiPlankote", "Yapı Sahibi: Plankote"),
+    ("yapiSahibiTaahhutname", "Yapı Sahibi: Taahhütname"),
+    ("yapiMuteahhitiSozlesme", "Yapı Müteahhiti: Sözleşme"),
+    ("yapiMuteahhitiTaahhutname", "Yapı Müteahhiti: Taahhütname"),
+    ("yapiMuteahhitiTicaretOdasi", "Yapı Müteahhiti: Ticaret Odası"),
+    ("yapiMuteahhitiVergiLevhasi", "Yapı Müteahhiti: Vergi Levhası"),
+    ("yapiMuteahhitiImzaSirkuleri", "Yapı Müteahhiti: İmza Sirküleri"),
+    ("yapiMuteahhitiKimlik", "Yapı Müteahhiti: Kimlik"),
+    ("yapiMuteahhitiFaaliyetBelgesi", "Yapı Müteahhiti: Faaliyet Belgesi"),
+    ("santiyeSefiIsSozlesmesi", "Şantiye Şefi: İş Sözleşmesi"),
+    ("santiyeSefiTaahhutname", "Şantiye Şefi: Taahhütname"),
+    ("santiyeSefiKimlik", "Şantiye Şefi: Kimlik"),
+    ("santiyeSefiImzaBeyani", "Şantiye Şefi: İmza Beyanı"),
+    ("santiyeSefiDiploma", "Şantiye Şefi: Diploma"),
+    ("santiyeSefiOdaKayit", "Şantiye Şefi: Oda Kayıt"),
+    ("santiyeSefiIkametgah", "Şantiye Şefi: İkametgâh"),
+    ("santiyeSefiIsciSagligi", "Şantiye Şefi: İşçi Sağlığı"),
+    ("projeMuellifIkametgah", "Proje Müellifi: İkametgâh"),
+    ("projeMuellifOdaSicil", "Proje Müellifi: Oda Sicil"),
+    ("projeMuellifTcKimlik", "Proje Müellifi: TC Kimlik"),
+    ("projeMuellifTaahhutname", "Proje Müellifi: Taahhütname"),
+    ("belediyeRuhsat", "Belediye: Ruhsat"),
+    ("belediyeIsYeriTeslim", "Belediye: İş Yeri Teslim"),
+    ("belediyeTemelVize", "Belediye: Temel Vize"),
+    ("yapiDenetimProjeKontrol", "Yapı Denetim: Proje Kontrol"),
+    ("yapiDenetimSeviyeTespit", "Yapı Denetim: Seviye Tespit"),
+    ("yapiDenetimHakedis", "Yapı Denetim: Hakediş"),
+    ("yapiDenetimLabSonuclari", "Yapı Denetim: Lab Sonuçları"),
+    ("yapiDenetimCelikCekme", "Yapı Denetim: Çelik Çekme"),
+    ("yapiDenetimYdkTutanak", "Yapı Denetim: YDK Tutanağı"),
+    ("yapiDenetimYdkSozlesme", "Yapı Denetim: YDK Sözleşmesi"),
+    ("yapiDenetimYdkTaahhutname", "Yapı Denetim: YDK Taahhütnamesi"),
+    ("yapiDenetimYdkIsYeri", "Yapı Denetim: YDK İş Yeri"),
+]
+
+LICENSE_PROJE_TIPLERI = [
+    ("mimari", "Mimari"), ("statik", "Statik"), ("mekanik", "Mekanik"), ("elektrik", "Elektrik"),
+    ("tasDuvar", "Taş Duvar"), ("iskele", "İskele"), ("zeminEtut", "Zemin Etüt"), ("akustik", "Akustik"),
+]
+
+LICENSE_PROJE_ALANLARI = [
+    ("Denetlendi", "Denetlendi"),
+    ("Onaylandi", "Onaylandı"),
+    ("OnaylanmamaNedeni", "Onaylanmama Nedeni"),
+    ("DijitalArsiv", "Dijital Arşiv"),
+    ("BelediyeOnayliProjeArsivlendi", "Belediye Onaylı Proje Arşivlendi"),
+]
+
+LICENSE_EXPORT_COLUMNS = (
+    [("insaatIsmi", "İnşaat İsmi"), ("yibfNo", "YİBF No")]
+    + LICENSE_EVRAK_EXPORT_COLUMNS
+    + [(f"{tip}{alan}", f"{tip_adi} Proje: {alan_adi}") for tip, tip_adi in LICENSE_PROJE_TIPLERI for alan, alan_adi in LICENSE_PROJE_ALANLARI]
+    + [
+        ("dijitalArsivTarihi", "Dijital Arşiv Tarihi"),
+        ("belediyeTeslimTarihi", "Belediye Teslim Tarihi"),
+        ("ruhsatTarihi", "Ruhsat Tarihi"),
+        ("notlar", "Notlar"),
+        ("createdByName", "Oluşturan"),
+        ("createdAt", "Oluşturulma Tarihi"),
+    ]
+)
+
+# İçe aktarma başlıklarının tersi: dışa aktarılan dosya tekrar yüklenebilir
+CONSTRUCTION_EXPORT_COLUMNS = [(field, header) for header, field in CONSTRUCTION_COLUMN_MAPPING.items()]
+
+# entity -> (repository, filtre tanımı, sütunlar, dosya/sayfa adı)
+EXPORTS = {
+    "inspections": (inspections_repo, INSPECTION_LIST_QUERY, INSPECTION_EXPORT_COLUMNS, "Saha Denetimleri"),
+    "payments": (payments_repo, PAYMENT_LIST_QUERY, PAYMENT_EXPORT_COLUMNS, "Hakedisler"),
+    "licenses": (licenses_repo, LICENSE_LIST_QUERY, LICENSE_EXPORT_COLUMNS, "Ruhsat ve Projeler"),
+    "constructions": (constructions_repo, CONSTRUCTION_LIST_QUERY, CONSTRUCTION_EXPORT_COLUMNS, "Insaat Listesi"),
+}
+
+@api_router.get("/export/{entity}")
+async def export_records(
+    entity: str,
+    request: Request,
+    format: str = "xlsx",
+    sort: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Kayıtları CSV veya XLSX olarak dışa aktarır. Liste uçlarıyla aynı filtreler geçerlidir
+    (örn. /export/inspections?format=csv&ilce=Kadıköy&denetimTarihiFrom=2025-01-01).
+    Veri cursor'dan okunarak yazılır; kayıt sayısı bellek kullanımını artırmaz.
+    """
+    if entity not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen dışa aktarma türü: {entity}")
+    if format not in ("csv", "xlsx"):
+        raise HTTPException(status_code=400, detail="format 'csv' veya 'xlsx' olmalı")
+    
+    repo, spec, columns, title = EXPORTS[entity]
+    # Yalnızca tanımlı filtreler derlenir; diğer sorgu parametreleri (örn. spec=...) yok sayılır
+    params = {k: v for k, v in request.query_params.items() if k in spec.param_names}
+    query, sort_spec = compile_list_query(spec, sort, **params)
+    projection = {"_id": 0, **{field: 1 for field, _ in columns}}
+    docs = repo.stream(query, sort=sort_spec, projection=projection)
+    
+    filename = f"{title.replace(' ', '_')}_{datetime.now(timezone.utc).strftime('%Y%m%d')}.{format}"
+    await log_activity(entity, "export", f"Dışa aktarma ({format.upper()}): {title}", current_user)
+    
+    if format == "csv":
+        return csv_response(docs, columns, filename)
+    return await xlsx_response(docs, columns, filename, title)
+
+# ==================== TANILAMA (EVENT LOOP GECİKMESİ) ====================
+
+# Loop LOOP_LAG_THRESHOLD_MS'den uzun tıkanırsa o anki yığın ve route kaydedilir
+loop_lag_monitor = LoopLagMonitor(
+    route_templates=route_templates,
+    interval=float(os.environ.get('LOOP_LAG_INTERVAL_MS', '100')) / 1000,
+    threshold_ms=float(os.environ.get('LOOP_LAG_THRESHOLD_MS', '200')),
+    max_incidents=int(os.environ.get('LOOP_LAG_MAX_INCIDENTS', '100')),
+)
+
+@api_router.get("/diagnostics/loop-lag")
+async def get_loop_lag_incidents(limit: int = 50, current_user: User = Depends(get_current_user)):
+    """Son event loop tıkanmaları (en yeni önce) ve bloklayan kodun yığını"""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    return loop_lag_monitor.snapshot(min(max(limit, 1), 100))
+
+# ==================== TANILAMA (CPU / BELLEK PROFİLİ) ====================
+
+profiler = Profiler(
+    max_cpu_seconds=float(os.environ.get('PROFILE_MAX_CPU_SECONDS', '60')),
+    max_request_wait=float(os.environ.get('PROFILE_MAX_REQUEST_WAIT_SECONDS', '300')),
+    max_memory_seconds=float(os.environ.get('PROFILE_MAX_MEMORY_SECONDS', '600')),
+)
+
+def _profiler_call(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=f"Başka bir profil oturumu devam ediyor ({e})")
+    except ProfilerError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.get("/diagnostics/profile")
+async def get_profile_status(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    return profiler.status()
+
+@api_router.post("/diagnostics/profile/cpu")
+async def profile_cpu(
+    seconds: float = 10,
+    interval_ms: float = 5,
+    format: str = "collapsed",
+    current_user: User = Depends(get_current_user)
+):
+    """Tüm süreci `seconds` boyunca örnekler; collapsed (flamegraph) ya da json (en sık fonksiyonlar)"""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="Geçersiz format (collapsed, json)")
+    try:
+        stacks = await profiler.sample_cpu(seconds, interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=f"Başka bir profil oturumu devam ediyor ({e})")
+    except ProfilerError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await log_activity("diagnostics", "profile_cpu", f"{seconds:g} saniyelik CPU profili alındı", current_user)
+    if format == "json":
+        return {"seconds": seconds, "samples": sum(stacks.values()), "top": top_functions(stacks)}
+    return PlainTextResponse("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+
+@api_router.post("/diagnostics/profile/request")
+async def arm_request_profile(wait_seconds: float = 120, current_user: User = Depends(get_current_user)):
+    """Dönen anahtar `X-Profile-Token` başlığı ile gönderilen ilk istek cProfile ile profillenir"""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    return _profiler_call(profiler.arm_request, wait_seconds)
+
+@api_router.get("/diagnostics/profile/request")
+async def get_request_profile(
+    format: str = "text",
+    sort: str = "cumulative",
+    limit: int = 60,
+    current_user: User = Depends(get_current_user)
+):
+    """text: pstats tablosu; pstats: snakeviz / `python -m pstats` ile açılacak dosya"""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    if sort not in ("cumulative", "tottime", "ncalls"):
+        raise HTTPException(status_code=400, detail="Geçersiz sıralama (cumulative, tottime, ncalls)")
+    if format == "pstats":
+        data = _profiler_call(profiler.request_stats_dump)
+        return Response(data, media_type="application/octet-stream", headers={"Content-Disposition": 'attachment; filename="request.prof"'})
+    if format != "text":
+        raise HTTPException(status_code=400, detail="Geçersiz format (text, pstats)")
+    return PlainTextResponse(_profiler_call(profiler.request_stats_text, sort, min(max(limit, 1), 500)))
+
+@api_router.post("/diagnostics/memory/start")
+async def start_memory_profile(seconds: float = 300, frames: int = 10, current_user: User = Depends(get_current_user)):
+    """tracemalloc oturumu açar; süre dolunca kendiliğinden kapanır"""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    session = _profiler_call(profiler.memory_start, seconds, frames)
+    await log_activity("diagnostics", "memory_start", f"{seconds:g} saniyelik bellek profili başlatıldı", current_user)
+    return session
+
+@api_router.post("/diagnostics/memory/snapshot")
+async def take_memory_snapshot(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    # Snapshot alma büyük heap'lerde saniyeler sürebilir; loop'u bloklamasın
+    return await asyncio.to_thread(_profiler_call, profiler.memory_snapshot)
+
+@api_router.get("/diagnostics/memory/diff")
+async def get_memory_diff(
+    from_id: str,
+    to_id: Optional[str] = None,
+    group_by: str = "lineno",
+    limit: int = 30,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    if group_by not in ("lineno", "filename"):
+        raise HTTPException(status_code=400, detail="Geçersiz gruplama (lineno, filename)")
+    return await asyncio.to_thread(_profiler_call, profiler.memory_diff, from_id, to_id, min(max(limit, 1), 200), group_by)
+
+@api_router.get("/diagnostics/memory/routes")
+async def get_memory_by_route(current_user: User = Depends(get_current_user)):
+    """Bellek oturumu boyunca route başına net bellek değişimi (büyükten küçüğe)"""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    return profiler.memory_by_route()
+
+@api_router.post("/diagnostics/memory/stop")
+async def stop_memory_profile(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    profiler.memory_stop()
+    return {"message": "Bellek profili durduruldu"}
+
 # ==================== DASHBOARD STATS ====================
 
 @api_router.get("/dashboard/stats")
+@coalesce("dashboard.stats")
 async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
     inspections_count = await db.site_inspections.count_documents({})
     payments_count = await db.progress_payments.count_documents({})
@@ -2089,9 +3255,159 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
         "concrete_companies": concrete_companies
     }
 
+@api_router.get("/system/singleflight")
+async def get_singleflight_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Bu işlem için süper admin yetkisi gerekli")
+    return singleflight_group.stats()
+
+# ==================== PAGE BUNDLE (TOPLU OKUMA) ====================
+
+class BundleQuery(BaseModel):
+    name: str
+    resource: str
+    params: Dict[str, str] = Field(default_factory=dict)
+
+class BundleRequest(BaseModel):
+    queries: List[BundleQuery]
+
+# Bundle içinden çağrılabilen liste uçları: kaynak adı -> (handler, response modeli)
+BUNDLE_RESOURCES = {
+    "inspections": (get_inspections, SiteInspection),
+    "payments": (get_payments, ProgressPayment),
+    "workplans": (get_workplans, WorkPlan),
+    "licenses": (get_licenses, LicenseProject),
+    "activities": (get_activities, ActivityLog),
+    "constructions": (get_constructions, Construction),
+    "companies": (get_companies, Company),
+    "companies-by-type": (get_companies_by_type, Company),
+    "hakedis-evrak": (get_hakedis_evrak, HakedisEvrak),
+    "aylik-rapor": (get_aylik_raporlar, AylikSeviyeRaporu),
+    "aylik-rapor-by-license": (get_aylik_raporlar_by_license, AylikSeviyeRaporu),
+    "yilsonu-rapor": (get_yilsonu_raporlar, YilSonuSeviyeRaporu),
+    "yilsonu-rapor-by-license": (get_yilsonu_raporlar_by_license, YilSonuSeviyeRaporu),
+    "super-admin-reports": (get_super_admin_reports, SuperAdminReport),
+    "mesajlar": (get_all_mesajlar, Mesaj),
+    "mesajlar-by-proje": (get_mesajlar_by_proje, Mesaj),
+    "users": (get_users, User),
+    "dashboard-stats": (get_dashboard_stats, None),
+}
+BUNDLE_MAX_QUERIES = 10
+
+async def _run_bundle_query(query: BundleQuery, current_user: User):
+    handler, model = BUNDLE_RESOURCES[query.resource]
+    # Parametreler string gelir; bool parametreler (örn. include_archived) burada çevrilir
+    signature = inspect.signature(handler).parameters
+    accepted = {k: p for k, p in signature.items() if k != "current_user"}
+    unknown = sorted(set(query.params) - set(accepted))
+    missing = sorted(k for k, p in accepted.items() if p.default is inspect.Parameter.empty and k not in query.params)
+    if unknown or missing:
+        detail = f"Geçersiz parametreler: {query.resource} ({', '.join(unknown + missing)})"
+        return query.name, None, {"status": 400, "detail": detail}
+    params = {
+        k: v.lower() in ("1", "true", "yes") if signature[k].annotation is bool else v
+        for k, v in query.params.items()
+    }
+    # Parametreler yukarıda doğrulandı; handler'dan çıkan diğer hatalar 500 olarak yayılır
+    try:
+        data = await handler(**params, current_user=current_user)
+    except HTTPException as e:
+        return query.name, None, {"status": e.status_code, "detail": e.detail}
+    if model is not None and isinstance(data, list):
+        data = [model(**item).model_dump(mode="json") if isinstance(item, dict) else item for item in data]
+    return query.name, data, None
+
+@api_router.post("/bundle")
+async def get_page_bundle(input: BundleRequest, current_user: User = Depends(get_current_user)):
+    """
+    Bir sayfanın açılışta ihtiyaç duyduğu listeleri tek istekte döner.
+    Kimlik doğrulama bir kez yapılır, alt sorgular mevcut handler'lar üzerinden paralel çalışır.
+    """
+    if not input.queries:
+        raise HTTPException(status_code=400, detail="En az bir sorgu gerekli")
+    if len(input.queries) > BUNDLE_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"En fazla {BUNDLE_MAX_QUERIES} sorgu gönderilebilir")
+    
+    names = [q.name for q in input.queries]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Sorgu adları benzersiz olmalı")
+    for q in input.queries:
+        if q.resource not in BUNDLE_RESOURCES:
+            raise HTTPException(status_code=400, detail=f"Bilinmeyen kaynak: {q.resource}")
+    
+    outcomes = await asyncio.gather(*[_run_bundle_query(q, current_user) for q in input.queries])
+    
+    results = {}
+    errors = {}
+    for name, data, error in outcomes:
+        if error:
+            errors[name] = error
+        else:
+            results[name] = data
+    return {"results": results, "errors": errors}
+
 # Include router
 app.include_router(api_router)
 
+# ==================== METRİKLER ====================
+
+# Ayarlanırsa /metrics yalnızca `Authorization: Bearer <METRICS_TOKEN>` ile okunur
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metin formatında süreç metrikleri"""
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Geçersiz metrik erişim anahtarı")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+app.add_middleware(MetricsMiddleware, route_templates=route_templates)
+
+# İstek başına Mongo operasyon bütçesi (0 = kapalı); aşan istekler tekrar eden sorgu şekilleriyle loglanır
+app.add_middleware(
+    DbBudgetMiddleware,
+    route_templates=route_templates,
+    max_ops=int(os.environ.get('DB_BUDGET_MAX_OPS', '50')),
+    max_ms=float(os.environ.get('DB_BUDGET_MAX_MS', '1000')),
+    repeat_threshold=int(os.environ.get('DB_BUDGET_REPEAT_THRESHOLD', '10')),
+)
+
+# İşaretli istek profili ve bellek oturumu (bkz. /api/diagnostics)
+app.add_middleware(ProfilingMiddleware, profiler=profiler, route_templates=route_templates)
+
+# Yerel istek izleme: TRACE_SAMPLE_RATE oranında istek izlenir (0 = kapalı), TRACE_MIN_MS'den
+# kısa sürenler yazılmaz. Çıktı `python trace_report.py summary traces/spans.jsonl*` ile incelenir.
+trace_writer = TraceWriter(
+    Path(os.environ.get('TRACE_FILE', str(ROOT_DIR / 'traces' / 'spans.jsonl'))),
+    max_bytes=int(os.environ.get('TRACE_MAX_BYTES', str(10 * 1024 * 1024))),
+    backup_count=int(os.environ.get('TRACE_BACKUP_COUNT', '5')),
+)
+app.add_middleware(
+    TracingMiddleware,
+    route_templates=route_templates,
+    writer=trace_writer,
+    sample_rate=float(os.environ.get('TRACE_SAMPLE_RATE', '0')),
+    min_ms=float(os.environ.get('TRACE_MIN_MS', '0')),
+)
+
+# İş yükü kaydı: CAPTURE_FILE ayarlanırsa /api istekleri (hassas alanlar maskelenmiş) JSONL'e yazılır ve
+# `python -m benchmarks.replay` ile bir test ortamına tekrar oynatılabilir. CAPTURE_BODIES=1 gövde
+# değerlerini de saklar; aksi halde yalnızca gövde şekli tutulur.
+CAPTURE_FILE = os.environ.get('CAPTURE_FILE')
+capture_writer = TraceWriter(
+    Path(CAPTURE_FILE),
+    max_bytes=int(os.environ.get('CAPTURE_MAX_BYTES', str(50 * 1024 * 1024))),
+    backup_count=int(os.environ.get('CAPTURE_BACKUP_COUNT', '10')),
+) if CAPTURE_FILE else None
+if capture_writer is not None:
+    app.add_middleware(
+        CaptureMiddleware,
+        route_templates=route_templates,
+        writer=capture_writer,
+        sample_rate=float(os.environ.get('CAPTURE_SAMPLE_RATE', '1')),
+        bodies=os.environ.get('CAPTURE_BODIES', '0') == '1',
+    )
+
 cors_origins = os.environ.get('CORS_ORIGINS', '*').split(',')
 if '*' in cors_origins:
     logger.warning("⚠️  WARNING: CORS is open to all origins! Restrict this in production!")
@@ -2104,8 +3420,232 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("shutdown")
+async def ensure_indexes():
+    """Create indexes used by report queries"""
+    await db.aylik_seviye_raporlari.create_index([("ay", 1), ("licenseId", 1)])
+    await db.yilsonu_seviye_raporlari.create_index([("yil", 1), ("licenseId", 1)])
+    await db.license_projects.create_index([("createdAt", -1)])
+    await db.license_projects.create_index("id")
+    for collection, spec in LIST_QUERY_SPECS:
+        for keys in spec.indexes:
+            await collection.create_index([(field, 1) for field in keys])
+    # Arşiv taşıma sorguları ve soğuk katmandaki listeler için
+    await db.activity_logs.create_index("referansId")
+    await db.mesajlar.create_index("projeId")
+    for spec_collection, spec in LIST_QUERY_SPECS:
+        if spec_collection.name in ARCHIVED_COLLECTIONS:
+            for keys in spec.indexes:
+                await db[archive_name(spec_collection.name)].create_index([(field, 1) for field in keys])
+    for name in ("activity_logs", "mesajlar"):
+        await db[archive_name(name)].create_index([("createdAt", -1)])
+    await db[archive_name("mesajlar")].create_index("projeId")
+    await db[archive_name("site_inspections")].create_index("id")
+    for collection, period_field in [(db.aylik_seviye_raporlari, "ay"), (db.yilsonu_seviye_raporlari, "yil")]:
+        try:
+            await collection.create_index([("licenseId", 1), (period_field, 1)], unique=True)
+        except OperationFailure as e:
+            logger.warning(f"⚠️  {collection.name}: unique (licenseId, {period_field}) index oluşturulamadı, mükerrer kayıtları temizleyin: {e}")
+
+async def ensure_ttl_index(collection, field: str, seconds: int):
+    """TTL index'i oluşturur; süre değiştiyse collMod ile günceller, 0 ise kaldırır"""
+    name = f"{field}_ttl"
+    existing = await collection.index_information()
+    if seconds <= 0:
+        if name in existing:
+            await collection.drop_index(name)
+        return
+    if name in existing and existing[name].get("expireAfterSeconds") != seconds:
+        await db.command("collMod", collection.name, index={"name": name, "expireAfterSeconds": seconds})
+    elif name not in existing:
+        await collection.create_index([(field, 1)], name=name, expireAfterSeconds=seconds)
+
+async def ensure_rollup_indexes():
+    try:
+        await rollup_store.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Rollup index'leri oluşturulamadı: {e}")
+
+async def ensure_activity_log_storage():
+    try:
+        # createdAtDate alanı olmayan eski kayıtlar ISO string'den tek sorguda doldurulur
+        await db.activity_logs.update_many(
+            {"createdAtDate": {"$exists": False}},
+            [{"$set": {"createdAtDate": {"$convert": {"input": "$createdAt", "to": "date", "onError": None, "onNull": None}}}}]
+        )
+    except Exception as e:
+        logger.warning(f"Aktivite kayıtlarına createdAtDate eklenemedi: {e}")
+    try:
+        for collection in (db.activity_logs, db[archive_name("activity_logs")]):
+            for keys in ACTIVITY_FEED_INDEXES:
+                await collection.create_index(keys)
+        # Eski (ay, kullanıcı) tekil index'i gün kovalarına izin vermez
+        if "month_1_userId_1" in await db.activity_logs_monthly.index_information():
+            await db.activity_logs_monthly.drop_index("month_1_userId_1")
+        await db.activity_logs_monthly.create_index([("month", 1), ("userId", 1), ("day", 1)], unique=True)
+        retention = ACTIVITY_LOG_RETENTION_DAYS * 86400
+        await ensure_ttl_index(db.activity_logs, "createdAtDate", retention)
+        await ensure_ttl_index(db[archive_name("activity_logs")], "createdAtDate", retention)
+        await ensure_ttl_index(db.activity_logs_monthly, "lastAtDate", retention)
+    except Exception as e:
+        logger.warning(f"Aktivite kaydı index/saklama ayarları uygulanamadı: {e}")
+
+async def ensure_search_index():
+    """Arama indeksi boşsa mevcut kayıtlardan bir kez oluşturulur"""
+    try:
+        await search_index.ensure_indexes()
+        if await db.search_index.estimated_document_count() == 0:
+            for entity, repo in SEARCH_REPOS.items():
+                await search_index.rebuild(entity, repo.collection)
+    except Exception as e:
+        logger.warning(f"Arama indeksi hazırlanamadı: {e}")
+
+# İndeks yalnızca yazmayı yapan süreçte doğrudan güncellenir (repository hook'u yok). Excel içe aktarma ve
+# toplu silme iş kuyruğunda çalışır; işi worker.py ya da başka bir API worker'ı alabilir. Bu yazmalar bu
+# sürece yalnızca periyodik yenilemeyle yansır. 0 yalnızca tek süreçli kurulumda (iş worker'ı da bu süreçte) güvenlidir
+CONSTRUCTION_INDEX_REFRESH_SECONDS = int(os.environ.get('CONSTRUCTION_INDEX_REFRESH_SECONDS', '300'))
+
+async def load_construction_index():
+    """Yeni indeks thread'de kurulup tek adımda devralınır; arama bu sırada eski indeksten yanıt verir"""
+    construction_index.begin_rebuild()
+    try:
+        docs = await db.constructions.find({}, {"_id": 0}).to_list(None)
+        built = await asyncio.to_thread(ConstructionIndex.build, docs)
+    except BaseException:
+        construction_index.abort_rebuild()
+        raise
+    construction_index.swap(built)
+    logger.info(f"İnşaat arama indeksi yüklendi: {len(construction_index)} kayıt")
+
+async def refresh_construction_index_loop():
+    # Diğer süreçlerde çalışan içe aktarma/silme işleri periyodik olarak yansır
+    while True:
+        await asyncio.sleep(CONSTRUCTION_INDEX_REFRESH_SECONDS)
+        try:
+            await load_construction_index()
+        except Exception as e:
+            logger.warning(f"İnşaat arama indeksi yenilenemedi: {e}")
+
+async def start_construction_index():
+    try:
+        await load_construction_index()
+    except Exception as e:
+        logger.warning(f"İnşaat arama indeksi yüklenemedi, regex aramaya düşülecek: {e}")
+    if CONSTRUCTION_INDEX_REFRESH_SECONDS > 0:
+        app.state.background_tasks.append(asyncio.create_task(refresh_construction_index_loop()))
+
+async def start_job_worker():
+    try:
+        await job_queue.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"İş kuyruğu index'leri oluşturulamadı: {e}")
+    if JOB_WORKER_ENABLED:
+        app.state.job_worker_stop = asyncio.Event()
+        app.state.job_worker = asyncio.create_task(job_queue.run_worker(
+            f"api-{socket.gethostname()}-{os.getpid()}", app.state.job_worker_stop, JOB_WORKER_CONCURRENCY
+        ))
+
+async def stop_job_worker():
+    """Çalışan işler kuyruğa geri bırakılır; başka bir worker kaldığı yerden alır"""
+    if JOB_WORKER_ENABLED and hasattr(app.state, "job_worker"):
+        app.state.job_worker_stop.set()
+        await app.state.job_worker
+
+async def start_loop_lag_monitor():
+    loop_lag_monitor.start()
+
+async def stop_loop_lag_monitor():
+    await loop_lag_monitor.stop()
+
+async def stop_trace_writer():
+    """Kuyruktaki izler dosyaya yazılıp yazıcı thread'i durdurulur"""
+    trace_writer.close()
+    if capture_writer is not None:
+        capture_writer.close()
+
 async def shutdown_db_client():
     """Close MongoDB connection on shutdown"""
     client.close()
-    logger.info("MongoDB connection closed")
\ No newline at end of file
+    logger.info("MongoDB connection closed")
+# ==================== BAŞLATMA / KAPATMA (LIFESPAN) ====================
+
+REFERENCE_CACHE_REFRESH_SECONDS = int(os.environ.get('REFERENCE_CACHE_REFRESH_SECONDS', '60'))
+READINESS_PING_TIMEOUT_SECONDS = float(os.environ.get('READINESS_PING_TIMEOUT_SECONDS', '2'))
+
+async def warm_mongo_pool():
+    """Eşzamanlı ping'ler havuzdan ayrı bağlantılar alır; ilk istekler bağlantı kurma maliyetini ödemez"""
+    try:
+        await asyncio.gather(*[client.admin.command("ping") for _ in range(max(MONGO_WARM_CONNECTIONS, 1))])
+        logger.info(f"MongoDB bağlantı havuzu ısıtıldı ({MONGO_WARM_CONNECTIONS} bağlantı)")
+    except Exception as e:
+        logger.warning(f"MongoDB bağlantıları önceden açılamadı: {e}")
+
+async def refresh_reference_caches_loop():
+    # Diğer worker'lardaki yazmalar (firma ekleme/güncelleme/silme) en geç bu aralıkla yansır
+    while True:
+        await asyncio.sleep(REFERENCE_CACHE_REFRESH_SECONDS)
+        for cache in (company_cache,):
+            try:
+                await cache.load()
+            except Exception as e:
+                logger.warning(f"{cache.repo.name} önbelleği yenilenemedi: {e}")
+
+async def warm_reference_caches():
+    if REFERENCE_CACHE_REFRESH_SECONDS <= 0:
+        return
+    for cache in (company_cache,):
+        try:
+            await cache.load()
+        except Exception as e:
+            logger.warning(f"{cache.repo.name} önbelleği yüklenemedi, istekler veritabanından okunacak: {e}")
+    app.state.background_tasks.append(asyncio.create_task(refresh_reference_caches_loop()))
+
+async def cancel_background_tasks():
+    for task in app.state.background_tasks:
+        task.cancel()
+    await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+    app.state.background_tasks = []
+
+async def startup():
+    app.state.ready = False
+    app.state.background_tasks = []
+    await warm_mongo_pool()
+    await ensure_indexes()
+    await ensure_rollup_indexes()
+    await ensure_activity_log_storage()
+    await ensure_search_index()
+    await start_construction_index()
+    await warm_reference_caches()
+    await start_job_worker()
+    await start_loop_lag_monitor()
+    app.state.ready = True
+    logger.info("Uygulama hazır")
+
+async def shutdown():
+    # Önce hazır değil olarak işaretlenir; yük dengeleyici yeni istek göndermeyi bırakır
+    app.state.ready = False
+    await stop_job_worker()
+    await stop_loop_lag_monitor()
+    await cancel_background_tasks()
+    await stop_trace_writer()
+    await shutdown_db_client()
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Canlılık: süreç ve event loop yanıt veriyor (veritabanına bakılmaz)"""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Hazırlık: başlatma tamamlandı (havuz, index'ler, önbellekler) ve MongoDB erişilebilir"""
+    checks = {
+        "startup": bool(getattr(app.state, "ready", False)),
+        "companyCache": company_cache.loaded,
+        "constructionIndex": construction_index.loaded,
+    }
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), READINESS_PING_TIMEOUT_SECONDS)
+        checks["mongo"] = True
+    except Exception:
+        checks["mongo"] = False
+    ready = checks["startup"] and checks["mongo"]
+    return JSONResponse({"status": "ready" if ready else "not_ready", "checks": checks}, status_code=200 if ready else 503)
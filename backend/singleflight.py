@@ -0,0 +1,58 @@
+"""
+Aynı anda gelen özdeş okuma isteklerini tek bir hesaplamada birleştirir (single-flight).
+
+Örn. onlarca tarayıcı aynı anda /dashboard/stats çağırdığında sorgular yalnızca bir kez
+çalışır, bekleyen diğer istekler aynı sonucu paylaşır.
+"""
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _stat(self, name: str) -> Dict[str, int]:
+        return self._stats.setdefault(name, {"requests": 0, "executions": 0, "deduplicated": 0})
+
+    async def do(self, name: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        stat = self._stat(name)
+        stat["requests"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            stat["executions"] += 1
+            # Ayrı task: ilk isteği yapan istemci bağlantıyı kesse bile diğerleri sonucu alır
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            stat["deduplicated"] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": len(self._inflight),
+            "routes": {name: dict(stat) for name, stat in self._stats.items()},
+        }
+
+
+group = SingleFlight()
+
+
+def coalesce(name: str, scope: Callable[[Any], Hashable] = lambda user: user.role):
+    """
+    Handler'ı single-flight ile sarar. Anahtar: route adı + parametreler + yetki kapsamı.
+    Varsayılan kapsam kullanıcının rolüdür; kullanıcıya özel sonuç dönen uçlarda
+    `scope=lambda user: user.id` verilmelidir.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            user = kwargs.get("current_user")
+            params = tuple(sorted((k, repr(v)) for k, v in kwargs.items() if k != "current_user"))
+            key = (name, scope(user) if user is not None else None, params, repr(args))
+            return await group.do(name, key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
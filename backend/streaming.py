@@ -0,0 +1,41 @@
+"""
+Büyük koleksiyon okumaları için artımlı (streaming) JSON yanıtları.
+
+Motor cursor'ı batch'ler halinde okunur ve her doküman ayrı ayrı serileştirilerek
+gönderilir; sunucu belleği sonuç boyutundan bağımsız kalır ve ilk byte hemen gider.
+"""
+from typing import AsyncIterator, Dict, Any, Optional, Type
+
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+async def _json_array(docs: AsyncIterator[Dict[str, Any]], model: Type[BaseModel]) -> AsyncIterator[bytes]:
+    yield b"["
+    first = True
+    async for doc in docs:
+        item = model(**doc).model_dump_json().encode("utf-8")
+        if first:
+            first = False
+            yield item
+        else:
+            yield b"," + item
+    yield b"]"
+
+
+async def _ndjson(docs: AsyncIterator[Dict[str, Any]], model: Type[BaseModel]) -> AsyncIterator[bytes]:
+    async for doc in docs:
+        yield model(**doc).model_dump_json().encode("utf-8") + b"\n"
+
+
+def stream_documents(docs: AsyncIterator[Dict[str, Any]], model: Type[BaseModel], accept: Optional[str] = None) -> StreamingResponse:
+    """Varsayılan olarak geçerli bir JSON dizisi, `Accept: application/x-ndjson` ile NDJSON döner"""
+    if wants_ndjson(accept):
+        return StreamingResponse(_ndjson(docs, model), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_json_array(docs, model), media_type="application/json")
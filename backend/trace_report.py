@@ -0,0 +1,111 @@
+"""
+tracing.py'nin yazdığı JSONL iz dosyalarını özetler.
+
+    python trace_report.py summary traces/spans.jsonl*
+    python trace_report.py summary traces/spans.jsonl --route "/api/inspections"
+    python trace_report.py collapsed traces/spans.jsonl* > stacks.txt
+
+`summary` endpoint başına istek sayısı, p50/p95/p99 süreleri ve span adına göre ortalama
+öz süreyi (alt span'ler hariç) listeler. `collapsed` her satırı `yığın;yolu mikro-saniye`
+biçiminde yazar; çıktı flamegraph.pl veya speedscope ile görselleştirilebilir.
+"""
+import argparse
+import json
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+def read_traces(paths: Iterable[str], route: str = None, method: str = None) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    trace = json.loads(line)
+                except ValueError:
+                    continue
+                if route and trace.get("route") != route:
+                    continue
+                if method and trace.get("method") != method.upper():
+                    continue
+                yield trace
+
+
+def self_times(trace: Dict[str, Any]) -> Iterator[Tuple[List[str], float]]:
+    """(kökten span'e isim yolu, öz süre ms); eşzamanlı alt span'ler nedeniyle öz süre 0'ın altına inmez"""
+    spans = {s["id"]: s for s in trace["spans"]}
+    child_time: Dict[int, float] = defaultdict(float)
+    for s in trace["spans"]:
+        if s["parent"] is not None:
+            child_time[s["parent"]] += s["dur"]
+
+    def path(s) -> List[str]:
+        names = []
+        while s is not None:
+            names.append(s["name"])
+            s = spans.get(s["parent"])
+        return names[::-1]
+
+    for s in trace["spans"]:
+        yield path(s), max(s["dur"] - child_time[s["id"]], 0.0)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def summary(traces: Iterable[Dict[str, Any]], out=sys.stdout):
+    durations: Dict[str, List[float]] = defaultdict(list)
+    breakdown: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for trace in traces:
+        endpoint = f"{trace.get('method')} {trace.get('route')}"
+        durations[endpoint].append(trace["durationMs"])
+        for names, ms in self_times(trace):
+            breakdown[endpoint][names[-1]] += ms
+
+    for endpoint in sorted(durations, key=lambda e: -sum(durations[e])):
+        values = durations[endpoint]
+        n = len(values)
+        out.write(
+            f"\n{endpoint}  n={n}  p50={percentile(values, 0.5):.1f}ms  "
+            f"p95={percentile(values, 0.95):.1f}ms  p99={percentile(values, 0.99):.1f}ms\n"
+        )
+        total = sum(values) or 1.0
+        for name, ms in sorted(breakdown[endpoint].items(), key=lambda item: -item[1]):
+            out.write(f"    {name:<28} {ms / n:9.2f}ms/istek  {ms / total * 100:5.1f}%\n")
+
+
+def collapsed(traces: Iterable[Dict[str, Any]], out=sys.stdout):
+    stacks: Dict[str, float] = defaultdict(float)
+    for trace in traces:
+        endpoint = f"{trace.get('method')} {trace.get('route')}"
+        for names, ms in self_times(trace):
+            stacks[";".join([endpoint] + names)] += ms
+    for stack, ms in sorted(stacks.items()):
+        micros = int(ms * 1000)
+        if micros:
+            out.write(f"{stack} {micros}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSONL iz dosyalarını özetler")
+    parser.add_argument("command", choices=["summary", "collapsed"])
+    parser.add_argument("files", nargs="+", help="tracing.py çıktısı (dönen dosyalar dahil)")
+    parser.add_argument("--route", help="yalnızca bu route şablonu, örn. /api/inspections")
+    parser.add_argument("--method", help="yalnızca bu HTTP metodu")
+    args = parser.parse_args(argv)
+    traces = read_traces(args.files, args.route, args.method)
+    if args.command == "summary":
+        summary(traces)
+    else:
+        collapsed(traces)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Yerel istek izleme (tracing).
+
+Örneklenen her HTTP isteği için bir iz (trace) açılır; kimlik doğrulama, Mongo komutları,
+endpoint, istek doğrulama, yanıt serileştirme ve `log_activity` gibi adımlar span olarak
+kaydedilir. İz ve geçerli span contextvar'larda tutulur; asyncio görevleri ve motor'un
+thread havuzu context'i kopyaladığından span'ler doğru ebeveyne bağlanır.
+
+İzler dönen (rotating) bir JSONL dosyasına satır başına bir iz olarak yazılır; dosya yazımı
+bir kuyruk üzerinden ayrı thread'de yapılır. `trace_report.py` bu dosyalardan endpoint
+bazında dağılım ve flamegraph için collapsed-stack çıktısı üretir.
+"""
+import functools
+import inspect
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+from metrics import IGNORED_COMMANDS, RouteTemplates, command_collection
+
+
+class Span:
+    __slots__ = ("id", "parent", "name", "start", "end", "attrs")
+
+    def __init__(self, id: int, parent: Optional[int], name: str, start: float, attrs: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.parent = parent
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attrs = attrs or None
+
+
+class Trace:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+
+    def begin(self, name: str, parent: Optional[int], attrs: Optional[Dict[str, Any]] = None, start: Optional[float] = None) -> Span:
+        span = Span(next(self._ids), parent, name, time.perf_counter() if start is None else start, attrs)
+        self.spans.append(span)
+        return span
+
+    def add(self, name: str, parent: Optional[int], start: float, end: float, attrs: Optional[Dict[str, Any]] = None) -> Span:
+        span = self.begin(name, parent, attrs, start)
+        span.end = end
+        return span
+
+    def split_route(self, route: Span):
+        """
+        'route' span'ını endpoint öncesi (doğrulama + bağımlılıklar) ve sonrası (serileştirme)
+        olarak böler; endpoint öncesinde biten alt span'ler (örn. auth) doğrulamanın altına taşınır.
+        """
+        endpoint = next((s for s in self.spans if s.parent == route.id and s.name == "endpoint"), None)
+        if endpoint is None or endpoint.end is None or route.end is None:
+            return
+        validation = self.add("validation", route.id, route.start, endpoint.start)
+        for span in self.spans:
+            if span.parent == route.id and span is not endpoint and span is not validation and (span.end or 0) <= endpoint.start:
+                span.parent = validation.id
+        self.add("serialization", route.id, endpoint.end, route.end)
+
+    def record(self, **fields) -> Dict[str, Any]:
+        to_ms = lambda t: round((t - self.start) * 1000, 3)
+        return {
+            "traceId": self.id,
+            **fields,
+            "spans": [
+                {
+                    "id": s.id,
+                    "parent": s.parent,
+                    "name": s.name,
+                    "start": to_ms(s.start),
+                    "dur": round(((s.end or s.start) - s.start) * 1000, 3),
+                    **({"attrs": s.attrs} if s.attrs else {}),
+                }
+                for s in self.spans
+            ],
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_span: ContextVar[Optional[int]] = ContextVar("trace_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """İz yoksa (örneklenmemiş istek, worker) yalnızca bir contextvar okuması kadar maliyetlidir"""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.begin(name, _span.get(), attrs)
+    token = _span.set(current.id)
+    try:
+        yield current
+    finally:
+        _span.reset(token)
+        current.end = time.perf_counter()
+
+
+def traced(name: Optional[str] = None):
+    """Fonksiyonu span ile sarar; sync ve async fonksiyonlarda çalışır, imzayı korur (FastAPI bağımlılıkları için)"""
+    def decorator(fn):
+        span_name = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracedRoute(APIRoute):
+    """Endpoint'i 'endpoint', route handler'ını 'route' span'ı ile sarar"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        if not getattr(endpoint, "__traced__", False):
+            # include_router route'ları aynı endpoint ile yeniden oluşturur; iki kez sarılmaz
+            endpoint = traced("endpoint")(endpoint)
+            endpoint.__traced__ = True
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            trace = _trace.get()
+            if trace is None:
+                return await handler(request)
+            try:
+                with span("route") as route:
+                    return await handler(request)
+            finally:
+                trace.split_route(route)
+
+        return traced_handler
+
+
+class TraceDbListener(monitoring.CommandListener):
+    """Mongo komutlarını, komutu başlatan kodun span'ının altına ekler"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, int], Tuple[Trace, Optional[int], str, Dict[str, Any]]] = {}
+
+    def started(self, event):
+        trace = _trace.get()
+        if trace is None or event.command_name in IGNORED_COMMANDS:
+            return
+        collection = command_collection(event.command_name, event.command)
+        self._pending[(event.request_id, event.operation_id)] = (
+            trace, _span.get(), f"mongo.{event.command_name}", {"collection": collection},
+        )
+
+    def succeeded(self, event):
+        pending = self._pending.pop((event.request_id, event.operation_id), None)
+        if pending is not None:
+            trace, parent, name, attrs = pending
+            end = time.perf_counter()
+            trace.add(name, parent, end - event.duration_micros / 1e6, end, attrs)
+
+    def failed(self, event):
+        pending = self._pending.pop((event.request_id, event.operation_id), None)
+        if pending is not None:
+            trace, parent, name, attrs = pending
+            end = time.perf_counter()
+            trace.add(name, parent, end - event.duration_micros / 1e6, end, {**attrs, "error": True})
+
+
+class TraceWriter:
+    """İzleri dönen JSONL dosyasına yazar; disk I/O'su event loop dışında, QueueListener thread'inde yapılır"""
+
+    def __init__(self, path: Path, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue: "queue.Queue" = queue.Queue(maxsize=10000)
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def write(self, record: Dict[str, Any]):
+        if self._listener is None:
+            with self._lock:
+                if self._listener is None:
+                    self._start()
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        try:
+            self._queue.put_nowait(logging.makeLogRecord({"msg": line, "levelno": logging.INFO, "levelname": "INFO"}))
+        except queue.Full:
+            # Disk yavaşsa iz düşürülür; istek beklemez
+            pass
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+class TracingMiddleware:
+    """
+    Saf ASGI middleware. `sample_rate` oranındaki istekler izlenir (0 = kapalı); izlenen
+    istekten yalnızca `min_ms`'den uzun sürenler dosyaya yazılır. Yanıta X-Trace-Id eklenir.
+    """
+
+    def __init__(self, app, route_templates: RouteTemplates, writer: TraceWriter, sample_rate: float = 0.0, min_ms: float = 0.0):
+        self.app = app
+        self.route_template = route_templates
+        self.writer = writer
+        self.sample_rate = sample_rate
+        self.min_ms = min_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        trace = Trace()
+        trace_token = _trace.set(trace)
+        root = trace.begin("request", None, start=trace.start)
+        span_token = _span.set(root.id)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _span.reset(span_token)
+            _trace.reset(trace_token)
+            root.end = time.perf_counter()
+            duration_ms = (root.end - root.start) * 1000
+            if duration_ms >= self.min_ms:
+                self.writer.write(trace.record(
+                    ts=datetime.now(timezone.utc).isoformat(),
+                    method=scope["method"],
+                    route=self.route_template(scope),
+                    status=status,
+                    durationMs=round(duration_ms, 3),
+                ))
@@ -0,0 +1,34 @@
+"""
+API sürecinden bağımsız iş worker'ı.
+
+    cd backend && python worker.py
+
+API süreçlerinde JOB_WORKER_ENABLED=false verilirse işler yalnızca bu süreçte çalışır. Bu durumda
+içe aktarılan/silinen inşaatlar API süreçlerinin arama indeksine CONSTRUCTION_INDEX_REFRESH_SECONDS
+aralığıyla yansır (0 verilmemeli).
+SIGTERM/SIGINT alındığında çalışan işler kuyruğa geri bırakılır.
+"""
+import asyncio
+import os
+import signal
+import socket
+
+import server
+
+
+async def main():
+    await server.job_queue.ensure_indexes()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await server.job_queue.run_worker(
+            f"worker-{socket.gethostname()}-{os.getpid()}", stop, server.JOB_WORKER_CONCURRENCY
+        )
+    finally:
+        server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
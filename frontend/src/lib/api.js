@@ -33,4 +33,16 @@ api.interceptors.response.use(
   }
 );
 
+// Arka plan işini tamamlanana kadar izler; onProgress({done, total, message}) ile ilerleme bildirir
+export const waitForJob = async (jobId, onProgress, intervalMs = 1000) => {
+  for (;;) {
+    const { data: job } = await api.get(`/jobs/${jobId}`);
+    if (onProgress) onProgress(job.progress || {});
+    if (job.status === 'succeeded') return job.result;
+    if (job.status === 'failed') throw new Error(job.error || 'İş başarısız oldu');
+    if (job.status === 'cancelled') throw new Error('İş iptal edildi');
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 export default api;
\ No newline at end of file
@@ -54,6 +54,11 @@ export const HAKEDIS_DURUM_OPTIONS = [
   'İptal veya Fesihli'
 ];
 
+// Ödemesi tamamlanmamış / iptal edilmemiş hakedişler (listelerin varsayılan filtresi)
+export const HAKEDIS_ACIK_DURUMLAR = HAKEDIS_DURUM_OPTIONS.filter(
+  (durum) => !['Ödeme Alındı', 'Ödeme Yapıldı', 'İptal veya Fesihli'].includes(durum)
+);
+
 export const EKSIK_OPTIONS = [
   'Eksik Yok',
   'Evrak Eksiği Var',
@@ -5,7 +5,7 @@ import { Card, CardContent, CardHeader } from '@/components/ui/card';
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
 import { Upload, Search, Loader2, Building2, Trash2, FileSpreadsheet, AlertCircle } from 'lucide-react';
 import { Alert, AlertDescription } from '@/components/ui/alert';
-import api from '@/lib/api';
+import api, { waitForJob } from '@/lib/api';
 import { toast } from 'sonner';
 import { useAuth } from '@/contexts/AuthContext';
 
@@ -14,6 +14,7 @@ const Constructions = () => {
   const [constructions, setConstructions] = useState([]);
   const [loading, setLoading] = useState(true);
   const [uploading, setUploading] = useState(false);
+  const [uploadProgress, setUploadProgress] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
   const fileInputRef = useRef(null);
 
@@ -61,15 +62,19 @@ const Constructions = () => {
           'Content-Type': 'multipart/form-data',
         },
       });
+      const result = await waitForJob(response.data.jobId, (progress) => {
+        if (progress.total) setUploadProgress(`${progress.done}/${progress.total}`);
+      });
 
       toast.success(
-        `Excel yüklendi: ${response.data.imported} yeni, ${response.data.updated} güncellendi`
+        `Excel yüklendi: ${result.imported} yeni, ${result.updated} güncellendi`
       );
       fetchConstructions();
     } catch (error) {
       toast.error(getErrorMessage(error));
     } finally {
       setUploading(false);
+      setUploadProgress('');
       if (fileInputRef.current) {
         fileInputRef.current.value = '';
       }
@@ -81,7 +86,9 @@ const Constructions = () => {
     
     try {
       const response = await api.delete('/constructions');
-      toast.success(response.data.message);
+      toast.info(response.data.message);
+      const result = await waitForJob(response.data.jobId);
+      toast.success(result.message);
       fetchConstructions();
     } catch (error) {
       toast.error(getErrorMessage(error));
@@ -141,7 +148,7 @@ const Constructions = () => {
               {uploading ? (
                 <>
                   <Loader2 className="w-4 h-4 mr-2 animate-spin" />
-                  Yükleniyor...
+                  Yükleniyor... {uploadProgress}
                 </>
               ) : (
                 <>
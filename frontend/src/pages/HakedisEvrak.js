@@ -11,6 +11,7 @@ import { Plus, Edit, Trash2, Loader2, FileText } from 'lucide-react';
 import api from '@/lib/api';
 import { toast } from 'sonner';
 import { useAuth } from '@/contexts/AuthContext';
+import { HAKEDIS_ACIK_DURUMLAR } from '@/lib/constants';
 
 // CheckboxField component defined outside
 const CheckboxField = ({ id, label, checked, onChange }) => (
@@ -73,14 +74,15 @@ const HakedisEvrak = () => {
     fetchData();
   }, []);
 
+  // Hakediş seçimi yalnızca form açıkken gerekir; açık hakedişler sunucuda filtrelenir
+  useEffect(() => {
+    if (dialogOpen) fetchPayments();
+  }, [dialogOpen]);
+
   const fetchData = async () => {
     try {
-      const [evrakRes, paymentsRes] = await Promise.all([
-        api.get('/hakedis-evrak'),
-        api.get('/payments')
-      ]);
-      setEvraklar(evrakRes.data);
-      setPayments(paymentsRes.data);
+      const response = await api.get('/hakedis-evrak');
+      setEvraklar(response.data);
     } catch (error) {
       toast.error('Veriler yüklenirken hata oluştu');
     } finally {
@@ -88,6 +90,15 @@ const HakedisEvrak = () => {
     }
   };
 
+  const fetchPayments = async () => {
+    try {
+      const response = await api.get('/payments', { params: { hakedisDurumu: HAKEDIS_ACIK_DURUMLAR.join(',') } });
+      setPayments(response.data);
+    } catch (error) {
+      toast.error('Hakedişler yüklenirken hata oluştu');
+    }
+  };
+
   const handlePaymentSelect = (paymentId) => {
     const payment = payments.find(p => p.id === paymentId);
     if (payment) {
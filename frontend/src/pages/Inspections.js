@@ -14,6 +14,22 @@ import { KONTROL_BOLUM_OPTIONS } from '@/lib/constants';
 import { useAuth } from '@/contexts/AuthContext';
 import ConstructionCombobox from '@/components/ConstructionCombobox';
 
+const daysAgo = (days) => {
+  const date = new Date();
+  date.setDate(date.getDate() - days);
+  return date.toISOString().slice(0, 10);
+};
+
+// Filtreli listeler denetim tarihine göre sıralanır (sunucu yalnızca index'li sıralamayı kabul eder)
+const inspectionParams = (filters) => {
+  const params = { sort: '-denetimTarihi' };
+  if (filters.ilce !== 'all') params.ilce = filters.ilce;
+  if (filters.teslimAlindi !== 'all') params.teslimAlindi = filters.teslimAlindi;
+  if (filters.denetimTarihiFrom) params.denetimTarihiFrom = filters.denetimTarihiFrom;
+  if (filters.denetimTarihiTo) params.denetimTarihiTo = filters.denetimTarihiTo;
+  return params;
+};
+
 const Inspections = () => {
   const { user } = useAuth();
   const [inspections, setInspections] = useState([]);
@@ -27,6 +43,13 @@ const Inspections = () => {
   const [selectedConstruction, setSelectedConstruction] = useState(null);
   const [hakedisOneriler, setHakedisOneriler] = useState(null);
   const [loadingHakedis, setLoadingHakedis] = useState(false);
+  // Sunucu tarafı filtreler; varsayılan olarak son 3 ayın denetimleri indirilir
+  const [filters, setFilters] = useState({
+    ilce: 'all',
+    teslimAlindi: 'all',
+    denetimTarihiFrom: daysAgo(90),
+    denetimTarihiTo: ''
+  });
 
   const getErrorMessage = (error) => {
     if (error.response?.data?.detail) {
@@ -66,11 +89,14 @@ const Inspections = () => {
   });
 
   useEffect(() => {
-    fetchInspections();
     fetchConstructions();
     fetchCompanies();
   }, []);
 
+  useEffect(() => {
+    fetchInspections();
+  }, [filters]);
+
   const fetchConstructions = async () => {
     try {
       const response = await api.get('/constructions');
@@ -119,7 +145,7 @@ const Inspections = () => {
 
   const fetchInspections = async () => {
     try {
-      const response = await api.get('/inspections');
+      const response = await api.get('/inspections', { params: inspectionParams(filters) });
       setInspections(response.data);
     } catch (error) {
       toast.error('Denetimler yüklenirken hata oluştu');
@@ -212,6 +238,8 @@ const Inspections = () => {
     );
   });
 
+  const ilceOptions = [...new Set(constructions.map(c => c.ilce).filter(Boolean))].sort((a, b) => a.localeCompare(b, 'tr'));
+
   const canEdit = user?.role === 'super_admin' || user?.role === 'admin';
   const canDelete = user?.role === 'super_admin' || user?.role === 'admin';
 
@@ -731,6 +759,56 @@ const Inspections = () => {
               />
             </div>
           </div>
+          <div className="grid grid-cols-1 md:grid-cols-4 gap-4 mt-4">
+            <div className="space-y-1">
+              <Label>İlçe</Label>
+              <Select value={filters.ilce} onValueChange={(value) => setFilters({ ...filters, ilce: value })}>
+                <SelectTrigger data-testid="filter-ilce-select">
+                  <SelectValue />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="all">Tümü</SelectItem>
+                  {ilceOptions.map((ilce) => (
+                    <SelectItem key={ilce} value={ilce}>{ilce}</SelectItem>
+                  ))}
+                </SelectContent>
+              </Select>
+            </div>
+            <div className="space-y-1">
+              <Label>Teslim Durumu</Label>
+              <Select value={filters.teslimAlindi} onValueChange={(value) => setFilters({ ...filters, teslimAlindi: value })}>
+                <SelectTrigger data-testid="filter-teslim-select">
+                  <SelectValue />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="all">Tümü</SelectItem>
+                  <SelectItem value="beklemede">Beklemede</SelectItem>
+                  <SelectItem value="alindi">Teslim Alındı</SelectItem>
+                  <SelectItem value="alinmadi">Teslim Alınmadı</SelectItem>
+                </SelectContent>
+              </Select>
+            </div>
+            <div className="space-y-1">
+              <Label htmlFor="filter-denetim-from">Denetim Tarihi (Başlangıç)</Label>
+              <Input
+                id="filter-denetim-from"
+                type="date"
+                value={filters.denetimTarihiFrom}
+                onChange={(e) => setFilters({ ...filters, denetimTarihiFrom: e.target.value })}
+                data-testid="filter-denetim-from"
+              />
+            </div>
+            <div className="space-y-1">
+              <Label htmlFor="filter-denetim-to">Denetim Tarihi (Bitiş)</Label>
+              <Input
+                id="filter-denetim-to"
+                type="date"
+                value={filters.denetimTarihiTo}
+                onChange={(e) => setFilters({ ...filters, denetimTarihiTo: e.target.value })}
+                data-testid="filter-denetim-to"
+              />
+            </div>
+          </div>
         </CardHeader>
         <CardContent>
           <div className="overflow-x-auto">
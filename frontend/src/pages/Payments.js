@@ -9,7 +9,7 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@
 import { Plus, Edit, Trash2, Search, Loader2 } from 'lucide-react';
 import api from '@/lib/api';
 import { toast } from 'sonner';
-import { HAKEDIS_TIPI_OPTIONS, HAKEDIS_DURUM_OPTIONS, EKSIK_OPTIONS } from '@/lib/constants';
+import { HAKEDIS_TIPI_OPTIONS, HAKEDIS_DURUM_OPTIONS, HAKEDIS_ACIK_DURUMLAR, EKSIK_OPTIONS } from '@/lib/constants';
 import { useAuth } from '@/contexts/AuthContext';
 import ConstructionCombobox from '@/components/ConstructionCombobox';
 
@@ -23,6 +23,8 @@ const Payments = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [saving, setSaving] = useState(false);
   const [selectedConstruction, setSelectedConstruction] = useState(null);
+  // Sunucu tarafı durum filtresi: 'acik' açık hakedişler, 'all' tümü, diğerleri tek durum
+  const [durumFilter, setDurumFilter] = useState('acik');
   
   const [formData, setFormData] = useState({
     insaatIsmi: '',
@@ -41,10 +43,13 @@ const Payments = () => {
   });
 
   useEffect(() => {
-    fetchPayments();
     fetchConstructions();
   }, []);
 
+  useEffect(() => {
+    fetchPayments();
+  }, [durumFilter]);
+
   const fetchConstructions = async () => {
     try {
       const response = await api.get('/constructions');
@@ -68,7 +73,10 @@ const Payments = () => {
 
   const fetchPayments = async () => {
     try {
-      const response = await api.get('/payments');
+      const params = {};
+      if (durumFilter === 'acik') params.hakedisDurumu = HAKEDIS_ACIK_DURUMLAR.join(',');
+      else if (durumFilter !== 'all') params.hakedisDurumu = durumFilter;
+      const response = await api.get('/payments', { params });
       setPayments(response.data);
     } catch (error) {
       toast.error('Hakediş kayıtları yüklenirken hata oluştu');
@@ -429,6 +437,20 @@ const Payments = () => {
                 data-testid="search-input"
               />
             </div>
+            <div className="w-64">
+              <Select value={durumFilter} onValueChange={setDurumFilter}>
+                <SelectTrigger data-testid="filter-durum-select">
+                  <SelectValue />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="acik">Açık Hakedişler</SelectItem>
+                  <SelectItem value="all">Tümü</SelectItem>
+                  {HAKEDIS_DURUM_OPTIONS.map((durum) => (
+                    <SelectItem key={durum} value={durum}>{durum}</SelectItem>
+                  ))}
+                </SelectContent>
+              </Select>
+            </div>
           </div>
         </CardHeader>
         <CardContent>
@@ -32,40 +32,13 @@ const Reports = () => {
 
   const fetchEksikRaporlar = async () => {
     try {
-      // Tüm lisansları ve raporları çek
-      const [licensesRes, aylikRes, yilsonuRes] = await Promise.all([
-        api.get('/licenses'),
-        api.get('/aylik-rapor'),
-        api.get('/yilsonu-rapor')
+      // Eksik raporlar sunucuda hesaplanır (bu ay ve geçen yıl)
+      const [aylikRes, yilsonuRes] = await Promise.all([
+        api.get('/reports/compliance', { params: { period: 'monthly', missing_only: true } }),
+        api.get('/reports/compliance', { params: { period: 'yearly', missing_only: true } })
       ]);
 
-      const licenses = licensesRes.data;
-      const aylikRaporlar = aylikRes.data;
-      const yilsonuRaporlar = yilsonuRes.data;
-
-      // Bugünün tarihi
-      const bugun = new Date();
-      const suAnkiAy = `${bugun.getFullYear()}-${String(bugun.getMonth() + 1).padStart(2, '0')}`;
-      const suAnkiYil = bugun.getFullYear().toString();
-
-      // Aylık rapor eksikleri
-      const aylikEksik = licenses.filter(license => {
-        const mevcutRapor = aylikRaporlar.find(r => 
-          r.yibfNo === license.yibfNo && r.ay === suAnkiAy
-        );
-        return !mevcutRapor || !mevcutRapor.raporVarMi;
-      });
-
-      // Yıl sonu rapor eksikleri (geçen yıl için)
-      const gecenYil = (bugun.getFullYear() - 1).toString();
-      const yilsonuEksik = licenses.filter(license => {
-        const mevcutRapor = yilsonuRaporlar.find(r => 
-          r.yibfNo === license.yibfNo && r.yil === gecenYil
-        );
-        return !mevcutRapor || !mevcutRapor.raporVarMi;
-      });
-
-      setEksikRaporlar({ aylik: aylikEksik, yilsonu: yilsonuEksik });
+      setEksikRaporlar({ aylik: aylikRes.data.satirlar, yilsonu: yilsonuRes.data.satirlar });
     } catch (error) {
       console.error('Eksik raporlar yüklenemedi:', error);
     }
@@ -0,0 +1,170 @@
+"""
+API testleri için ortak fixture'lar.
+
+Uygulama süreç içinde (httpx.ASGITransport) ve lifespan ile çalıştırılır; veritabanı oturum başında
+benchmarks.dataset ile sorgu bütçesi kontrolünün kullandığı küçük, sabit tohumlu veri setiyle doldurulur.
+
+- TEST_MONGO_URL tanımlıysa gerçek MongoDB kullanılır (explain gibi sunucuya özgü kontroller çalışır);
+  test veritabanı oturum başında ve sonunda silinir.
+- Tanımlı değilse mongomock-motor ile bellek içi veritabanı kullanılır; GridFS bellek içi bir
+  bucket ile değiştirilir ve komut olayları mock_commands ile üretilir (dbstats sayımları çalışır).
+
+Testler senkron yazılır; asenkron çağrılar oturum boyunca tek event loop'ta `run(...)` ile çalıştırılır
+(Motor istemcisi tek loop'a bağlıdır).
+"""
+import asyncio
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+TEST_DB_NAME = "test_yapi_denetim"
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL")
+REAL_MONGO = bool(TEST_MONGO_URL)
+
+os.environ["MONGO_URL"] = TEST_MONGO_URL or "mongodb://localhost:27017"
+os.environ["DB_NAME"] = TEST_DB_NAME
+os.environ["JOB_WORKER_ENABLED"] = "false"
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-for-pytest-only-000000")
+
+requires_mongo = pytest.mark.skipif(not REAL_MONGO, reason="TEST_MONGO_URL tanımlı değil (gerçek MongoDB gerekir)")
+
+
+class MemoryGridFSBucket:
+    """mongomock GridFS desteklemez; iş kuyruğunun kullandığı kadarı bellekte tutulur"""
+
+    def __init__(self, db, bucket_name: str = "fs"):
+        self.files = {}
+
+    async def upload_from_stream(self, filename, source):
+        from bson import ObjectId
+
+        file_id = ObjectId()
+        self.files[file_id] = source
+        return file_id
+
+    async def open_download_stream(self, file_id):
+        data = self.files[file_id]
+
+        class Stream:
+            async def read(self):
+                return data
+
+        return Stream()
+
+    async def delete(self, file_id):
+        self.files.pop(file_id, None)
+
+
+def _use_mongomock():
+    import motor.motor_asyncio
+
+    from tests import mock_commands
+
+    motor.motor_asyncio.AsyncIOMotorClient = mock_commands.install()
+
+    import jobs
+
+    jobs.AsyncIOMotorGridFSBucket = MemoryGridFSBucket
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def run(loop):
+    return loop.run_until_complete
+
+
+@pytest.fixture(scope="session")
+def server(run):
+    if not REAL_MONGO:
+        _use_mongomock()
+    import server
+
+    return server
+
+
+@pytest.fixture(scope="session")
+def dataset(server, run):
+    from benchmarks.dataset import DatasetBuilder, spec_from_args
+
+    from benchmarks.query_shapes import SHAPES_SPEC
+
+    run(server.client.drop_database(TEST_DB_NAME))
+    # Sorgu bütçeleri (BUDGETS) bu veri seti boyutuna göre yazıldı
+    builder = DatasetBuilder(server, spec_from_args("small", SHAPES_SPEC), seed=42)
+    run(builder.build())
+    return builder
+
+
+@pytest.fixture(scope="session")
+def http(server, dataset, run):
+    """Veri seti yüklendikten sonra açılan uygulamaya bağlı istemci (önbellekler veri setini görür)"""
+    import httpx
+
+    app = server.app
+    lifespan = app.router.lifespan_context(app)
+    run(lifespan.__aenter__())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60)
+    yield client
+    run(client.aclose())
+    if REAL_MONGO:
+        run(server.client.drop_database(TEST_DB_NAME))
+    run(lifespan.__aexit__(None, None, None))
+
+
+@pytest.fixture(scope="session")
+def tokens(server, dataset):
+    """Rol başına veri setindeki ilk kullanıcının token'ı (parola doğrulaması atlanır)"""
+    from benchmarks.dataset import user_email
+
+    by_email = {u["email"]: u for u in dataset.users}
+    return {
+        role: server.create_access_token({"sub": by_email[user_email(role, 0)]["id"]})
+        for role in ("super_admin", "admin", "user")
+    }
+
+
+@pytest.fixture(scope="session")
+def api(http, tokens, run):
+    """api("GET", url, role="super_admin", **kwargs) -> httpx.Response"""
+
+    def call(method: str, url: str, role: str = "super_admin", **kwargs):
+        headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+        return run(http.request(method, url, headers=headers, **kwargs))
+
+    return call
+
+
+@pytest.fixture
+def db_ops(http):
+    """
+    İstek başına Mongo komut sayısını sınırlar (dbstats.capture_requests + assert_max_ops):
+
+        with db_ops(max_ops=2) as captured:
+            api("GET", "/api/inspections")
+
+    Blok içinde en az bir istek tamamlanmalıdır; `commands=True` komutların kendisini de tutar.
+    """
+    from dbstats import assert_max_ops, capture_requests
+
+    @contextmanager
+    def capture(max_ops=None, route=None, commands=False):
+        with capture_requests(commands=commands) as captured:
+            yield captured
+        assert captured, "blok içinde tamamlanan istek yok"
+        if max_ops is not None:
+            assert_max_ops(captured, max_ops, route)
+
+    return capture
@@ -0,0 +1,241 @@
+"""
+mongomock-motor için komut olayları.
+
+mongomock pymongo'nun CommandListener'larını tetiklemez; bu yüzden mock modda dbstats'ın istek başına
+komut sayımı (capture_requests / assert_max_ops) boş kalırdı. `install()` async mongomock çağrılarını
+sarar ve gerçek sürücünün göndereceği komut adlarıyla (find, aggregate, update, findAndModify ...)
+istemciye verilen `event_listeners`'a started/succeeded/failed olayları gönderir.
+
+Komut gövdeleri sorgu şekli ve explain için gereken alanlarla sınırlıdır; getMore gibi sürücü
+ayrıntıları taklit edilmez. Motor'daki gibi `to_list(n)` en fazla n belge döndürür.
+"""
+import itertools
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import mongomock_motor
+from pymongo.operations import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+_listeners: List[Any] = []
+_ids = itertools.count(1)
+
+
+class ListeningMockClient(mongomock_motor.AsyncMongoMockClient):
+    """AsyncIOMotorClient yerine kullanılır; event_listeners bu modülde saklanır"""
+
+    def __init__(self, *args, event_listeners=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        _listeners[:] = list(event_listeners)
+
+
+class _Command:
+    def __init__(self, database: str, name: str, body: Dict[str, Any]):
+        self.started = SimpleNamespace(
+            command_name=name, command=body, database_name=database, request_id=next(_ids), operation_id=None,
+        )
+        self.started.operation_id = self.started.request_id
+        self.start = time.perf_counter()
+        for listener in _listeners:
+            listener.started(self.started)
+
+    def _finished(self, **fields) -> SimpleNamespace:
+        return SimpleNamespace(
+            command_name=self.started.command_name, request_id=self.started.request_id,
+            operation_id=self.started.operation_id, duration_micros=int((time.perf_counter() - self.start) * 1e6), **fields,
+        )
+
+    def succeeded(self, reply: Dict[str, Any]):
+        event = self._finished(reply=reply)
+        for listener in _listeners:
+            listener.succeeded(event)
+
+    def failed(self, error: Exception):
+        event = self._finished(failure={"errmsg": str(error)})
+        for listener in _listeners:
+            listener.failed(event)
+
+
+def _names(collection) -> tuple:
+    return collection.database.name, collection.name
+
+
+def _batch(docs: List[Any]) -> Dict[str, Any]:
+    return {"cursor": {"firstBatch": docs}, "ok": 1}
+
+
+def _write_reply(result) -> Dict[str, Any]:
+    return {"n": getattr(result, "modified_count", None) or getattr(result, "deleted_count", None) or 0, "ok": 1}
+
+
+def _command_for(method: str, collection: str, args, kwargs):
+    """(komut adı, gövde, yanıt üretici) — pymongo'nun aynı çağrı için gönderdiği komut"""
+    flt = args[0] if args else kwargs.get("filter")
+    if method == "find_one":
+        projection = args[1] if len(args) > 1 else kwargs.get("projection")
+        body = {"find": collection, "filter": flt or {}, "limit": 1}
+        if projection:
+            body["projection"] = projection
+        return "find", body, lambda doc: _batch([doc] if doc is not None else [])
+    if method == "count_documents":
+        pipeline = [{"$match": flt or {}}, {"$group": {"_id": 1, "n": {"$sum": 1}}}]
+        return "aggregate", {"aggregate": collection, "pipeline": pipeline}, lambda n: _batch([{"_id": 1, "n": n}])
+    if method == "estimated_document_count":
+        return "count", {"count": collection}, lambda n: {"n": n, "ok": 1}
+    if method == "distinct":
+        key = args[0] if args else kwargs.get("key")
+        query = args[1] if len(args) > 1 else kwargs.get("filter")
+        return "distinct", {"distinct": collection, "key": key, "query": query or {}}, lambda values: {"values": values, "ok": 1}
+    if method in ("insert_one", "insert_many"):
+        docs = [flt] if method == "insert_one" else list(flt)
+        return "insert", {"insert": collection, "documents": docs}, lambda result: {"n": len(docs), "ok": 1}
+    if method in ("update_one", "update_many", "replace_one"):
+        update = args[1] if len(args) > 1 else kwargs.get("update", kwargs.get("replacement"))
+        body = {"update": collection, "updates": [{"q": flt, "u": update, "multi": method == "update_many"}]}
+        return "update", body, _write_reply
+    if method in ("delete_one", "delete_many"):
+        body = {"delete": collection, "deletes": [{"q": flt, "limit": 0 if method == "delete_many" else 1}]}
+        return "delete", body, _write_reply
+    if method.startswith("find_one_and_"):
+        return "findAndModify", {"findAndModify": collection, "query": flt}, lambda doc: {"value": doc, "ok": 1}
+    raise ValueError(method)
+
+
+_BULK_COMMANDS = {
+    InsertOne: ("insert", "documents", lambda r: r._doc),
+    UpdateOne: ("update", "updates", lambda r: {"q": r._filter, "u": r._doc, "multi": False}),
+    UpdateMany: ("update", "updates", lambda r: {"q": r._filter, "u": r._doc, "multi": True}),
+    ReplaceOne: ("update", "updates", lambda r: {"q": r._filter, "u": r._doc, "multi": False}),
+    DeleteOne: ("delete", "deletes", lambda r: {"q": r._filter, "limit": 1}),
+    DeleteMany: ("delete", "deletes", lambda r: {"q": r._filter, "limit": 0}),
+}
+
+
+def _bulk_commands(collection: str, requests) -> List[tuple]:
+    """Sürücü gibi ardışık aynı türdeki işlemleri tek komutta birleştirir"""
+    commands: List[tuple] = []
+    for request in requests:
+        name, field, item = _BULK_COMMANDS[type(request)]
+        if commands and commands[-1][0] == name:
+            commands[-1][1][field].append(item(request))
+        else:
+            commands.append((name, {name: collection, field: [item(request)]}))
+    return commands
+
+
+def _wrap_method(method: str):
+    original = getattr(mongomock_motor.AsyncMongoMockCollection, method)
+
+    async def wrapper(self, *args, **kwargs):
+        database, collection = _names(self)
+        name, body, reply = _command_for(method, collection, args, kwargs)
+        command = _Command(database, name, body)
+        try:
+            result = await original(self, *args, **kwargs)
+        except Exception as e:
+            command.failed(e)
+            raise
+        command.succeeded(reply(result))
+        return result
+
+    return wrapper
+
+
+def _wrap_bulk_write():
+    original = mongomock_motor.AsyncMongoMockCollection.bulk_write
+
+    async def bulk_write(self, requests, *args, **kwargs):
+        database, collection = _names(self)
+        requests = list(requests)
+        commands = [_Command(database, name, body) for name, body in _bulk_commands(collection, requests)]
+        try:
+            result = await original(self, requests, *args, **kwargs)
+        except Exception as e:
+            for command in commands:
+                command.failed(e)
+            raise
+        for command in commands:
+            command.succeeded({"ok": 1})
+        return result
+
+    return bulk_write
+
+
+def _find(self, *args, **kwargs):
+    database, name = _names(self)
+    inner = self._AsyncMongoMockCollection__collection.find(*args, **kwargs)
+    cursor = mongomock_motor.AsyncCursor(inner)
+
+    def body():
+        # sort/limit find() sonrasında zincirlenir; gövde okuma anında kurulur
+        command = {"find": name, "filter": inner._spec or {}}
+        for key, value in (("projection", inner._projection), ("sort", dict(inner._sort or ())),
+                           ("skip", inner._skip), ("limit", inner._limit)):
+            if value:
+                command[key] = value
+        return command
+
+    cursor._pending_command = (database, "find", body, lambda: list(inner.clone()))
+    return cursor
+
+
+def _aggregate(self, pipeline, *args, **kwargs):
+    database, name = _names(self)
+    body = {"aggregate": name, "pipeline": list(pipeline)}
+    try:
+        inner = self._AsyncMongoMockCollection__collection.aggregate(pipeline, *args, **kwargs)
+    except Exception as e:
+        _Command(database, "aggregate", body).failed(e)
+        raise
+    cursor = mongomock_motor.AsyncLatentCommandCursor(inner)
+    cursor._pending_command = (database, "aggregate", lambda: body, lambda: list(inner._data))
+    return cursor
+
+
+def _emit_once(cursor, docs=None):
+    """İmleç ilk kez okunduğunda komutu bildirir (sürücü de komutu ilk okumada gönderir)"""
+    pending = cursor.__dict__.pop("_pending_command", None)
+    if pending is not None:
+        database, name, body, all_docs = pending
+        _Command(database, name, body()).succeeded(_batch(all_docs() if docs is None else docs))
+
+
+def _wrap_to_list(cls):
+    original = cls.to_list
+
+    async def to_list(self, length=None, *args, **kwargs):
+        docs = await original(self, length, *args, **kwargs)
+        if length:
+            docs = docs[:length]
+        _emit_once(self, docs)
+        return docs
+
+    return to_list
+
+
+def _wrap_next(cls):
+    original = cls.next
+
+    async def next_(self):
+        _emit_once(self)
+        return await original(self)
+
+    return next_
+
+
+def install():
+    """mongomock_motor sınıflarını yamalar; istemci oluşturulmadan önce çağrılmalıdır"""
+    collection = mongomock_motor.AsyncMongoMockCollection
+    for method in (
+        "find_one", "count_documents", "estimated_document_count", "distinct", "insert_one", "insert_many",
+        "update_one", "update_many", "replace_one", "delete_one", "delete_many",
+        "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+    ):
+        setattr(collection, method, _wrap_method(method))
+    collection.bulk_write = _wrap_bulk_write()
+    collection.find = _find
+    collection.aggregate = _aggregate
+    for cls in (mongomock_motor.AsyncCursor, mongomock_motor.AsyncLatentCommandCursor):
+        cls.to_list = _wrap_to_list(cls)
+        cls.next = cls.__anext__ = _wrap_next(cls)
+    return ListeningMockClient
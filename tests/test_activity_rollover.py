@@ -0,0 +1,39 @@
+"""Aktivite kaydı saklama ve rollover kovaları"""
+from datetime import datetime, timezone
+
+
+def _activity(i: int, day: int) -> dict:
+    created = datetime(1999, 12, day, 10, i, tzinfo=timezone.utc)
+    return {
+        "id": f"test-rollover-{day}-{i}", "tip": "saha_denetim", "aksiyon": "update", "aciklama": "test",
+        "userId": "test-rollover-user", "userName": "Test", "referansId": None,
+        "createdAt": created.isoformat(), "createdAtDate": created,
+    }
+
+
+def test_activity_logs_have_no_ttl_by_default(server, http, run):
+    assert server.ACTIVITY_LOG_RETENTION_DAYS == 0
+    assert "createdAtDate_ttl" not in run(server.db.activity_logs.index_information())
+
+
+def test_rollover_buckets_by_day_and_merges_month(server, api, run):
+    docs = [_activity(i, day) for day in (1, 2) for i in range(3)]
+    run(server.db.activity_logs.insert_many([dict(d) for d in docs]))
+    before = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    assert run(server.rollover_activity_logs(before)) == 6
+    buckets = run(server.db.activity_logs_monthly.find({"userId": "test-rollover-user"}).to_list(None))
+    assert sorted((b["day"], len(b["entries"])) for b in buckets) == [("1999-12-01", 3), ("1999-12-02", 3)]
+
+    # Yarıda kalan çalışmanın tekrarı aynı girdileri ikinci kez yazmaz
+    run(server.db.activity_logs.insert_many([dict(d) for d in docs[:2]]))
+    assert run(server.rollover_activity_logs(before)) == 2
+    buckets = run(server.db.activity_logs_monthly.find({"userId": "test-rollover-user"}).to_list(None))
+    assert sum(len(b["entries"]) for b in buckets) == 6
+
+    response = api("GET", "/api/activities/monthly?month=1999-12&userId=test-rollover-user")
+    assert response.status_code == 200
+    [merged] = response.json()
+    assert merged["count"] == 6
+    assert merged["entries"][0]["id"] == "test-rollover-2-2"
+    run(server.db.activity_logs_monthly.delete_many({"userId": "test-rollover-user"}))
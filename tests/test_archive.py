@@ -0,0 +1,27 @@
+"""Arşiv taşıma: denetimle birlikte taşınan bağlı kayıtlar"""
+
+
+def test_archiving_inspection_keeps_pending_work_plans_hot(server, http, run):
+    inspection = {"id": "test-arsiv-denetim", "yibfNo": "9999999", "denetimTarihi": "2020-01-01"}
+    plans = [
+        {"id": "test-arsiv-plan-bekleyen", "referansId": inspection["id"], "durum": "beklemede"},
+        {"id": "test-arsiv-plan-tamam", "referansId": inspection["id"], "durum": "tamamlandi"},
+    ]
+    hot, cold = server.archiver.collections("work_plans", False)
+    run(hot.insert_many([dict(p) for p in plans]))
+    ids = {"$in": [p["id"] for p in plans]}
+
+    moved = {}
+    run(server._archive_batch_hook(False, moved)("site_inspections", [inspection]))
+    assert moved["work_plans"] == 1
+    assert [d["id"] for d in run(hot.find({"id": ids}).to_list(None))] == ["test-arsiv-plan-bekleyen"]
+    assert [d["id"] for d in run(cold.find({"id": ids}).to_list(None))] == ["test-arsiv-plan-tamam"]
+
+    # Geri alırken durum filtresi uygulanmaz: arşivdeki tüm bağlı planlar döner
+    run(cold.update_one({"id": "test-arsiv-plan-tamam"}, {"$set": {"durum": "beklemede"}}))
+    moved = {}
+    run(server._archive_batch_hook(True, moved)("site_inspections", [inspection]))
+    assert moved["work_plans"] == 1
+    assert run(cold.count_documents({"id": ids})) == 0
+    assert run(hot.count_documents({"id": ids})) == 2
+    run(hot.delete_many({"id": ids}))
@@ -0,0 +1,16 @@
+"""Kimlik doğrulama: kullanıcı her istekte veritabanından okunur"""
+import httpx
+
+
+def test_deleted_user_is_rejected_immediately(server, http, run):
+    user = server.User(email="silinecek@example.com", name="Silinecek", role=server.UserRole.USER)
+    run(server.db.users.insert_one(dict(user.model_dump(), password="x")))
+    headers = {"Authorization": f"Bearer {server.create_access_token({'sub': user.id})}"}
+
+    def me() -> httpx.Response:
+        return run(http.get("/api/auth/me", headers=headers))
+
+    assert me().status_code == 200
+    # Başka bir süreçteki silme: bu sürecin hook'ları çalışmaz
+    run(server.db.users.delete_one({"id": user.id}))
+    assert me().status_code == 401
@@ -0,0 +1,24 @@
+"""Toplu okuma (/bundle): parametre doğrulaması"""
+
+
+def _bundle(api, *queries):
+    response = api("POST", "/api/bundle", json={"queries": list(queries)})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_bundle_rejects_unknown_param(api):
+    body = _bundle(
+        api,
+        {"name": "ok", "resource": "inspections", "params": {"include_archived": "false"}},
+        {"name": "bad", "resource": "inspections", "params": {"spec": "x"}},
+    )
+    assert isinstance(body["results"]["ok"], list)
+    assert body["errors"]["bad"]["status"] == 400
+    assert "spec" in body["errors"]["bad"]["detail"]
+
+
+def test_bundle_rejects_missing_required_param(api):
+    body = _bundle(api, {"name": "bad", "resource": "companies-by-type", "params": {}})
+    assert body["errors"]["bad"]["status"] == 400
+    assert "company_type" in body["errors"]["bad"]["detail"]
@@ -0,0 +1,39 @@
+"""İnşaat arama indeksinin arka planda yeniden kurulması"""
+from autocomplete import ConstructionIndex
+
+
+def _doc(i: int, baslik: str) -> dict:
+    return {"id": f"c{i}", "yibfNo": str(1000000 + i), "isBaslik": baslik, "ilce": "Çankaya"}
+
+
+def test_swap_replaces_contents_and_replays_writes_made_during_rebuild():
+    live = ConstructionIndex()
+    live.load([_doc(1, "Eski Başlık"), _doc(2, "Silinecek Sitesi")])
+
+    live.begin_rebuild()
+    snapshot = [_doc(1, "Yeni Başlık"), _doc(2, "Silinecek Sitesi")]
+    # Kaynak okunduktan sonra gelen yazmalar
+    live.upsert(_doc(3, "Vadi Konutları"))
+    live.remove("c2")
+    built = ConstructionIndex.build(snapshot)
+    assert [d["id"] for d in live.search("eski")] == ["c1"]  # kurulum sürerken eski indeks yanıt verir
+
+    live.swap(built)
+    assert live.loaded
+    assert sorted(d["id"] for d in live.search("1000")) == ["c1", "c3"]
+    assert live.search("eski") == []
+    assert [d["id"] for d in live.search("yeni")] == ["c1"]
+    assert [d["id"] for d in live.search("vadi")] == ["c3"]
+
+    # Devralmadan sonra yazmalar kaydedilmez
+    live.upsert(_doc(4, "Park Evleri"))
+    assert live._journal is None
+
+
+def test_abort_rebuild_stops_journal():
+    live = ConstructionIndex()
+    live.begin_rebuild()
+    live.abort_rebuild()
+    live.upsert(_doc(1, "Test"))
+    assert live._journal is None
+    assert len(live) == 1
@@ -0,0 +1,52 @@
+"""İstek başına Mongo komut sayımı (dbstats)"""
+from types import SimpleNamespace
+
+import pytest
+
+
+def test_inspection_list_is_single_query(api, db_ops):
+    with db_ops(max_ops=2, commands=True) as captured:
+        response = api("GET", "/api/inspections?ilce=Çankaya&sort=-denetimTarihi")
+    assert response.status_code == 200
+    stats = captured[-1]
+    assert stats.route == "/api/inspections"
+    assert [c["name"] for c in stats.commands if c["collection"] == "site_inspections"] == ["find"]
+    assert sum(c["docs"] for c in stats.commands) >= len(response.json())
+
+
+def test_db_ops_reports_budget_overrun(api, db_ops):
+    with pytest.raises(AssertionError, match="Mongo operasyonu"):
+        with db_ops(max_ops=0):
+            api("GET", "/api/inspections")
+
+
+def test_server_timing_header(api):
+    response = api("GET", "/api/auth/me")
+    assert 'db;dur=' in response.headers["server-timing"]
+
+
+def test_failed_commands_are_counted_separately():
+    from dbstats import RequestDbListener, RequestDbStats, _current
+
+    listener = RequestDbListener()
+    stats = RequestDbStats(keep_commands=True)
+    token = _current.set(stats)
+    try:
+        for request_id in (1, 2):
+            listener.started(SimpleNamespace(
+                command_name="find", command={"find": "users", "filter": {"id": "x"}}, database_name="test",
+                request_id=request_id, operation_id=request_id,
+            ))
+    finally:
+        _current.reset(token)
+    listener.succeeded(SimpleNamespace(
+        request_id=1, operation_id=1, duration_micros=1000, reply={"cursor": {"firstBatch": [{"id": "x"}]}},
+    ))
+    listener.failed(SimpleNamespace(request_id=2, operation_id=2, duration_micros=500, failure={"errmsg": "boom"}))
+
+    assert stats.ops == 2
+    assert stats.failures == 1
+    assert [c["failed"] for c in stats.commands] == [False, True]
+    assert stats.commands[1]["error"] == "boom"
+    assert stats.commands[1]["docs"] == 0
+    assert stats.as_dict()["failures"] == 1
@@ -0,0 +1,52 @@
+"""Excel içe aktarma işi"""
+import asyncio
+import random
+import time
+
+from benchmarks.dataset import construction_row, construction_workbook
+
+
+def test_import_parses_off_the_event_loop(server, http, run, monkeypatch):
+    rng = random.Random(7)
+    rows = [dict(construction_row(rng, i), yibfNo=str(9100000 + i)) for i in range(5)]
+    rows.append(dict(rows[0], isBaslik="Güncel Başlık"))
+    contents = construction_workbook(rows, server.CONSTRUCTION_COLUMN_MAPPING)
+    user = server.User(id="test-excel", email="excel@example.com", name="Test", role=server.UserRole.SUPER_ADMIN)
+
+    parse = server.parse_constructions_excel
+
+    def slow_parse(*args):
+        time.sleep(0.3)
+        return parse(*args)
+
+    monkeypatch.setattr(server, "parse_constructions_excel", slow_parse)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            result = await server.import_constructions_excel(contents, user)
+        finally:
+            task.cancel()
+        return result, ticks
+
+    result, ticks = run(scenario())
+    try:
+        # Ayrıştırma sürerken loop diğer işleri çalıştırmaya devam eder
+        assert ticks >= 10
+        assert (result["imported"], result["updated"], result["skipped"]) == (5, 1, 0)
+        saved = run(server.db.constructions.find_one({"yibfNo": "9100000"}, {"_id": 0}))
+        assert saved["isBaslik"] == "Güncel Başlık"
+        assert [d["yibfNo"] for d in server.construction_index.search("9100000")] == ["9100000"]
+    finally:
+        docs = run(server.db.constructions.find({"yibfNo": {"$regex": "^9100"}}, {"id": 1}).to_list(None))
+        run(server.db.constructions.delete_many({"yibfNo": {"$regex": "^9100"}}))
+        for doc in docs:
+            server.construction_index.remove(doc["id"])
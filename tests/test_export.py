@@ -0,0 +1,22 @@
+"""Dışa aktarma: liste filtreleri uygulanır, tanımsız sorgu parametreleri yok sayılır"""
+
+
+def test_export_ignores_unknown_query_params(api):
+    response = api("GET", "/api/export/inspections?format=csv&spec=x&current_user=y&foo=1")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+
+
+def test_export_applies_list_filters(api):
+    ilce = api("GET", "/api/inspections?limit=1").json()[0]["ilce"]
+    params = {"ilce": ilce, "sort": "-denetimTarihi"}
+    expected = len(api("GET", "/api/inspections", params=params).json())
+    response = api("GET", "/api/export/inspections", params={"format": "csv", **params})
+    assert response.status_code == 200, response.text
+    rows = [line for line in response.text.lstrip("\ufeff").splitlines()[1:] if line]
+    assert len(rows) == expected
+
+
+def test_export_rejects_invalid_filter(api):
+    response = api("GET", "/api/export/inspections", params={"format": "csv", "denetimTarihiFrom": "dün"})
+    assert response.status_code == 400
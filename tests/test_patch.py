@@ -0,0 +1,61 @@
+"""PATCH uçları: yalnızca gönderilen alanlar yazılır, None kabul etmeyen alanlara null yazılmaz"""
+
+
+def _first_license(api):
+    response = api("GET", "/api/licenses?limit=1")
+    assert response.status_code == 200, response.text
+    return response.json()[0]
+
+
+def test_patch_license_updates_only_sent_fields(api):
+    license = _first_license(api)
+    response = api("PATCH", f"/api/licenses/{license['id']}", json={"yapiSahibiTapu": not license["yapiSahibiTapu"]})
+    assert response.status_code == 200, response.text
+    updated = response.json()
+    assert updated["yapiSahibiTapu"] is not license["yapiSahibiTapu"]
+    assert updated["yapiSahibiKimlik"] == license["yapiSahibiKimlik"]
+    assert updated["insaatIsmi"] == license["insaatIsmi"]
+
+
+def test_patch_license_rejects_null_for_default_field(api):
+    license = _first_license(api)
+    response = api("PATCH", f"/api/licenses/{license['id']}", json={"yapiSahibiTapu": None})
+    assert response.status_code == 400
+    assert "yapiSahibiTapu" in response.json()["detail"]
+    # Kayıt değişmemeli ve okunabilir kalmalı
+    after = api("GET", f"/api/licenses/{license['id']}")
+    assert after.status_code == 200
+    assert after.json()["yapiSahibiTapu"] == license["yapiSahibiTapu"]
+
+
+def test_patch_license_rejects_null_for_required_field(api):
+    license = _first_license(api)
+    response = api("PATCH", f"/api/licenses/{license['id']}", json={"yibfNo": None})
+    assert response.status_code == 400
+
+
+def test_patch_license_rejects_empty_body(api):
+    license = _first_license(api)
+    assert api("PATCH", f"/api/licenses/{license['id']}", json={}).status_code == 400
+
+
+def test_patch_license_forbidden_for_user(api):
+    license = _first_license(api)
+    response = api("PATCH", f"/api/licenses/{license['id']}", role="user", json={"yapiSahibiTapu": True})
+    assert response.status_code == 403
+
+
+def test_patch_hakedis_evrak_allows_null_for_optional_field(api):
+    created = api("POST", "/api/hakedis-evrak", json={
+        "hakedisId": "test-hakedis", "insaatIsmi": "Test İnşaatı", "yibfNo": "1000001", "hakedisNo": "1", "notlar": "not",
+    })
+    assert created.status_code == 200, created.text
+    evrak_id = created.json()["id"]
+
+    response = api("PATCH", f"/api/hakedis-evrak/{evrak_id}", json={"notlar": None, "ydFatura": True})
+    assert response.status_code == 200, response.text
+    assert response.json()["notlar"] is None
+    assert response.json()["ydFatura"] is True
+
+    response = api("PATCH", f"/api/hakedis-evrak/{evrak_id}", json={"ydFatura": None})
+    assert response.status_code == 400
@@ -0,0 +1,20 @@
+"""İşaretli istek profili (profiling.Profiler)"""
+import pytest
+
+from profiling import REQUEST, Profiler, ProfilerBusy
+
+
+def test_arm_request_while_busy_keeps_current_token_and_result(run):
+    profiler = Profiler()
+
+    async def scenario():
+        armed = profiler.arm_request(30)
+        profiler.request_result = {"path": "/api/onceki"}
+        with pytest.raises(ProfilerBusy):
+            profiler.arm_request(30)
+        assert profiler.request_token == armed["token"]
+        assert profiler.request_result == {"path": "/api/onceki"}
+        assert profiler.take_request_token(armed["token"])
+        profiler._release(REQUEST)
+
+    run(scenario())
@@ -0,0 +1,35 @@
+"""Liste filtreleri: index'le desteklenmeyen varsayılan sıralama sessizce değiştirilmez"""
+import pytest
+
+from query_filters import ListQuerySpec
+
+SPEC = ListQuerySpec(
+    eq_fields=("ilce",),
+    range_fields=("denetimTarihi",),
+    sort_fields=("createdAt", "denetimTarihi"),
+    indexes=[("createdAt",), ("denetimTarihi",), ("ilce", "denetimTarihi")],
+    default_sort=("createdAt", -1),
+)
+
+
+def test_default_sort_when_index_backed():
+    assert SPEC.compile({}) == ({}, [("createdAt", -1)])
+
+
+def test_unbacked_default_sort_is_rejected_with_hint():
+    with pytest.raises(ValueError, match="sort=-denetimTarihi"):
+        SPEC.compile({"ilce": "Kadıköy"})
+    with pytest.raises(ValueError, match="sort=-denetimTarihi"):
+        SPEC.compile({"denetimTarihiFrom": "2025-01-01"})
+
+
+def test_explicit_sort_is_used():
+    query, sort = SPEC.compile({"ilce": "Kadıköy"}, "-denetimTarihi")
+    assert query == {"ilce": "Kadıköy"}
+    assert sort == [("denetimTarihi", -1)]
+
+
+def test_list_endpoint_returns_400_for_unbacked_default_sort(api):
+    response = api("GET", "/api/inspections?ilce=Kadıköy")
+    assert response.status_code == 400
+    assert "sort=-denetimTarihi" in response.json()["detail"]
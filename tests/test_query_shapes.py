@@ -0,0 +1,35 @@
+"""
+Endpoint başına sorgu bütçeleri (benchmarks.query_shapes.BUDGETS).
+
+Komut sayısı, dönen belge ve alan sayısı her ortamda kontrol edilir; explain planları (COLLSCAN)
+yalnızca gerçek MongoDB ile (TEST_MONGO_URL) kontrol edilir.
+"""
+import pytest
+
+from benchmarks.query_shapes import BUDGETS, check
+from tests.conftest import REAL_MONGO, requires_mongo
+
+
+def _budget_id(budget) -> str:
+    return f"{budget.method} {budget.url}"
+
+
+def _report(result) -> str:
+    lines = [f"{result['method']} {result['url']}: " + "; ".join(result["violations"])]
+    lines += [f"  {c['name']} {c['collection']} docs={c['docs']} {c.get('stages', '')}" for c in result["commands"]]
+    return "\n".join(lines)
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=_budget_id)
+def test_query_budget(budget, server, http, tokens, run):
+    result = run(check(http, server, budget, tokens, explain_plans=False))
+    assert not result["violations"], _report(result)
+
+
+@requires_mongo
+@pytest.mark.parametrize("budget", BUDGETS, ids=_budget_id)
+def test_query_plans(budget, server, http, tokens, run):
+    assert REAL_MONGO
+    result = run(check(http, server, budget, tokens, explain_plans=True))
+    assert not [c for c in result["commands"] if "explainError" in c], _report(result)
+    assert not result["violations"], _report(result)
@@ -0,0 +1,64 @@
+"""Rollup sayaçlarının artımlı güncellenmesi"""
+import pytest
+
+from rollups import Rollup, RollupStore
+
+
+@pytest.fixture
+def store(server, run):
+    db = server.client["test_yapi_denetim_rollups"]
+    store = RollupStore(db, [
+        Rollup("by_ilce", "inspections", group_field="ilce", period_field="denetimTarihi"),
+        Rollup("by_firma", "inspections", group_field="betonFirma", period_field="denetimTarihi"),
+    ])
+    run(store.ensure_indexes())
+    yield store
+    run(server.client.drop_database("test_yapi_denetim_rollups"))
+
+
+def _counts(store, run):
+    docs = run(store.collection.find({}, {"_id": 0}).to_list(None))
+    return {(d["rollup"], d["group"], d["period"]): d["count"] for d in docs if d["count"]}
+
+
+def _commands(apply, run):
+    """apply çağrısının gönderdiği Mongo komut adları"""
+    from dbstats import RequestDbStats, _current
+
+    stats = RequestDbStats(keep_commands=True)
+    token = _current.set(stats)
+    try:
+        run(apply)
+    finally:
+        _current.reset(token)
+    return [c["name"] for c in stats.commands]
+
+
+def test_apply_moves_counts_between_buckets(store, run):
+    doc = {"ilce": "Çankaya", "betonFirma": "Beton A", "denetimTarihi": "2025-01-10"}
+    run(store.apply("inspections", "create", "d1", doc))
+    run(store.apply("inspections", "create", "d2", dict(doc, betonFirma=None)))
+    assert _counts(store, run) == {
+        ("by_ilce", "Çankaya", "2025-01"): 2,
+        ("by_firma", "Beton A", "2025-01"): 1,
+    }
+
+    run(store.apply("inspections", "update", "d1", dict(doc, ilce="Mamak", denetimTarihi="2025-02-01")))
+    assert _counts(store, run) == {
+        ("by_ilce", "Çankaya", "2025-01"): 1,
+        ("by_ilce", "Mamak", "2025-02"): 1,
+        ("by_firma", "Beton A", "2025-02"): 1,
+    }
+
+    run(store.apply("inspections", "delete", "d1", None))
+    run(store.apply("inspections", "delete", "d2", None))
+    run(store.apply("inspections", "delete", "yok", None))
+    assert _counts(store, run) == {}
+    assert run(store.contributions.count_documents({})) == 0
+
+
+def test_apply_uses_one_find_and_modify_per_rollup_and_one_bulk_write(store, run):
+    doc = {"ilce": "Çankaya", "betonFirma": "Beton A", "denetimTarihi": "2025-01-10"}
+    assert _commands(store.apply("inspections", "create", "d1", doc), run) == ["findAndModify", "findAndModify", "update"]
+    # Kova değişmediyse sayaçlara yazılmaz
+    assert _commands(store.apply("inspections", "update", "d1", doc), run) == ["findAndModify", "findAndModify"]
@@ -0,0 +1,37 @@
+"""Arama indeksi yeniden kurulumu"""
+
+
+def _run_submitted(server, run, job):
+    """Kuyruğa bırakılan işi bu süreçte çalıştırır (testlerde iş worker'ı kapalı)"""
+    run(server.job_queue.collection.update_one(
+        {"id": job["id"]}, {"$set": {"status": "running", "workerId": "test", "attempts": 1}},
+    ))
+    claimed = run(server.job_queue.get(job["id"]))
+    run(server.job_queue.run_job(claimed, "test"))
+    return run(server.job_queue.get(job["id"]))
+
+
+def test_rebuild_keeps_entries_and_drops_stale(server, run):
+    index = server.search_index
+    source = server.inspections_repo.collection
+    stale = {"entity": "inspections", "refId": "silinmis-denetim", "title": "Silinmiş", "subtitle": "",
+             "tokens": ["silinmis"], "updatedAt": "2000-01-01T00:00:00+00:00"}
+    run(index.collection.insert_one(stale))
+
+    count = run(index.rebuild("inspections", source))
+
+    assert count == run(source.count_documents({}))
+    assert run(index.collection.find_one({"entity": "inspections", "refId": "silinmis-denetim"})) is None
+    assert run(index.collection.count_documents({"entity": "inspections"})) == count
+
+
+def test_rebuild_route_submits_job(server, api, run):
+    response = api("POST", "/api/search/rebuild")
+    assert response.status_code == 202, response.text
+    job = response.json()
+    assert job["kind"] == "search.rebuild"
+    assert api("POST", "/api/search/rebuild", role="admin").status_code == 403
+
+    finished = _run_submitted(server, run, job)
+    assert finished["status"] == "succeeded", finished
+    assert set(finished["result"]["counts"]) == set(server.SEARCH_REPOS)